@@ -0,0 +1,76 @@
+"""
+Shared asyncio event loop for the async API layer.
+
+Flask handlers are synchronous, so async work is submitted to one background
+loop per process. Independent queries inside a coroutine (asyncio.gather) run
+concurrently on that loop instead of one round trip after another, and the
+async Mongo client stays bound to a single loop for the life of the process.
+
+run() blocks the calling handler until the coroutine is done, so a worker
+still serves one request per thread; the loop only shortens requests that
+issue several independent queries.
+"""
+import asyncio
+import contextvars
+import threading
+
+_loop = None
+_loop_thread = None
+_lock = threading.Lock()
+# Idents of the threads blocked in run(), so a profiler sampling one of them
+# knows to follow it onto the loop thread
+_waiting = set()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Return the background event loop, starting its thread on first use."""
+    global _loop, _loop_thread
+    if _loop is None:
+        with _lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="aio-loop", daemon=True)
+                thread.start()
+                _loop_thread = thread
+                _loop = loop
+    return _loop
+
+
+def loop_thread_id():
+    """Ident of the background loop's thread, or None before it starts."""
+    return _loop_thread.ident if _loop_thread is not None else None
+
+
+def is_waiting(thread_id: int) -> bool:
+    """Whether the thread is blocked in run() waiting on the loop."""
+    return thread_id in _waiting
+
+
+def run(coro, timeout: float = None):
+    """
+    Run a coroutine on the background loop and block until it finishes.
+
+    The caller's contextvars are copied into the task so request-scoped state
+    (e.g. per-request counters) is visible to the coroutine.
+
+    Args:
+        coro: The coroutine to run
+        timeout (float, optional): Seconds to wait before raising TimeoutError
+
+    Returns:
+        The coroutine's result
+    """
+    loop = get_loop()
+    ctx = contextvars.copy_context()
+    future = asyncio.run_coroutine_threadsafe(_run_in_context(coro, ctx), loop)
+    thread_id = threading.get_ident()
+    _waiting.add(thread_id)
+    try:
+        return future.result(timeout)
+    finally:
+        _waiting.discard(thread_id)
+
+
+async def _run_in_context(coro, ctx):
+    # Re-wrap in a task created with the caller's context
+    return await asyncio.get_running_loop().create_task(coro, context=ctx)
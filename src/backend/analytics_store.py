@@ -0,0 +1,587 @@
+"""
+Columnar analytics store for transactions.
+
+Transactions are held as NumPy column arrays instead of dicts:
+
+    property, company            int32 codes into per-column dictionaries
+    merchandise_type, service    int16 codes
+    amount_cents                 int64
+    barrels                      float64
+    date                         datetime64[s] (NaT when missing or unparseable)
+    month                        int32 months since 1970-01 (NO_MONTH when date is NaT)
+    live                         bool; updates and deletes tombstone the old row
+
+Rows live in segments. A snapshot written with save() is opened memory-mapped
+and read-only, so every worker on the host shares the same pages; writes made
+after that go to a small in-memory delta segment. This process's
+TransactionsAPI writes are applied as they happen (record_upsert/record_delete).
+
+Writes made by other processes are caught up two ways. Every
+ANALYTICS_REFRESH_SECONDS, refresh() pulls in recent inserts by _id. It
+re-reads the last REFRESH_OVERLAP_SECONDS of ids, because ObjectIds from
+different processes aren't ordered within a second and coalesced writes get
+their _id shortly before they land. Updates, deletes and inserts that land
+later than that (spool replays) are only caught by the full reload that runs
+in the background every ANALYTICS_RELOAD_SECONDS. The reload builds an
+in-memory store from the collection and swaps it in, replaying this process's
+writes made meanwhile. Run the CLI nightly to fold everything back into a
+fresh snapshot:
+
+    python -m analytics_store snapshot [--directory ...]
+"""
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import numpy as np
+from bson import ObjectId
+from flask import current_app, has_app_context
+import db
+from config import Config
+
+CODE_COLUMNS = {"property": np.int32, "company": np.int32, "merchandise_type": np.int16, "service": np.int16}
+VALUE_COLUMNS = {"amount_cents": np.int64, "barrels": np.float64, "date": "datetime64[s]", "month": np.int32}
+SOURCE_FIELDS = {"property": "property_id", "company": "company_id",
+                 "merchandise_type": "merchandise_type", "service": "service"}
+GROUP_KEYS = tuple(CODE_COLUMNS) + ("month", "year")
+METRICS = ("amount", "barrels", "count")
+# Above this many key combinations group_by() sorts keys instead of using a dense bincount
+DENSE_GROUP_LIMIT = 1 << 24
+BUILD_BATCH_SIZE = 50_000
+SNAPSHOTS_KEPT = 2
+NO_MONTH = np.iinfo(np.int32).min
+REFRESH_OVERLAP_SECONDS = 60
+
+_settings = {
+    "snapshot_dir": Config.ANALYTICS_SNAPSHOT_DIR,
+    "refresh_seconds": Config.ANALYTICS_REFRESH_SECONDS,
+    "reload_seconds": Config.ANALYTICS_RELOAD_SECONDS,
+}
+_store = None
+_store_lock = threading.Lock()
+# While a background reload runs: this process's writes, replayed onto the new store.
+# _reload_lock also covers applying a write and the swap, so none falls in between.
+_reload = {"pending": None}
+_reload_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+class Dictionary:
+    """Maps string values to dense integer codes."""
+
+    def __init__(self, values=()):
+        self.values = list(values)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+
+    def encode(self, value) -> int:
+        value = "" if value is None else str(value)
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value) -> Optional[int]:
+        return self.codes.get("" if value is None else str(value))
+
+    def __len__(self):
+        return len(self.values)
+
+
+class Segment:
+    """A block of rows. Read-only segments come from a memory-mapped snapshot."""
+
+    def __init__(self, columns: Dict, ids, size: int, writable: bool = True):
+        self.columns = columns
+        self.ids = ids
+        self.size = size
+        self.writable = writable
+
+    @classmethod
+    def empty(cls, capacity: int = 1024):
+        columns = {name: np.zeros(capacity, dtype) for name, dtype in {**CODE_COLUMNS, **VALUE_COLUMNS}.items()}
+        columns["live"] = np.zeros(capacity, bool)
+        return cls(columns, np.zeros(capacity, "S12"), 0)
+
+    def _grow(self, needed: int):
+        capacity = len(self.ids)
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2)
+        for name, array in self.columns.items():
+            grown = np.zeros(capacity, array.dtype)
+            grown[:self.size] = array[:self.size]
+            self.columns[name] = grown
+        ids = np.zeros(capacity, "S12")
+        ids[:self.size] = self.ids[:self.size]
+        self.ids = ids
+
+    def append(self, rows: Dict, ids) -> range:
+        """Append columns of equal length; returns the new row numbers."""
+        count = len(ids)
+        start = self.size
+        self._grow(start + count)
+        for name, values in rows.items():
+            self.columns[name][start:start + count] = values
+        self.columns["live"][start:start + count] = True
+        self.ids[start:start + count] = ids
+        self.size = start + count
+        return range(start, start + count)
+
+    def view(self, name: str):
+        return self.columns[name][:self.size]
+
+
+def _to_datetime64(value):
+    if isinstance(value, datetime):
+        return np.datetime64(value.replace(tzinfo=None), "s")
+    if isinstance(value, str):
+        try:
+            return np.datetime64(datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None), "s")
+        except ValueError:
+            pass
+    return np.datetime64("NaT")
+
+
+def _oid_key(value) -> bytes:
+    # NumPy "S" arrays drop trailing NUL bytes, so ids are compared in that form everywhere
+    return ObjectId(value).binary.rstrip(b"\0")
+
+
+def _oid_from_key(key: bytes) -> ObjectId:
+    return ObjectId(key.ljust(12, b"\0"))
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class TransactionStore:
+    def __init__(self):
+        self.dictionaries = {name: Dictionary() for name in CODE_COLUMNS}
+        self.segments = [Segment.empty()]
+        self.max_id = b""
+        self.snapshot = None
+        self.refreshed_at = self.loaded_at = time.time()
+        self._row_index = None
+        self._lock = threading.RLock()
+
+    # -- loading -----------------------------------------------------------
+
+    def _encode(self, docs) -> tuple:
+        rows = {name: np.fromiter((self.dictionaries[name].encode(doc.get(SOURCE_FIELDS[name])) for doc in docs),
+                                  dtype, count=len(docs))
+                for name, dtype in CODE_COLUMNS.items()}
+        rows["amount_cents"] = np.fromiter((round(_to_float(doc.get("amount")) * 100) for doc in docs),
+                                           np.int64, count=len(docs))
+        rows["barrels"] = np.fromiter((_to_float(doc.get("barrels_of_oil")) for doc in docs),
+                                      np.float64, count=len(docs))
+        rows["date"] = np.array([_to_datetime64(doc.get("transaction_date")) for doc in docs], "datetime64[s]")
+        rows["month"] = np.where(np.isnat(rows["date"]), NO_MONTH,
+                                 rows["date"].astype("datetime64[M]").astype(np.int64)).astype(np.int32)
+        ids = np.array([_oid_key(doc["_id"]) for doc in docs], "S12")
+        return rows, ids
+
+    def _append(self, docs: List[Dict]):
+        if not docs:
+            return
+        rows, ids = self._encode(docs)
+        delta = self.segments[-1]
+        positions = delta.append(rows, ids)
+        if self._row_index is not None:
+            segment_number = len(self.segments) - 1
+            for oid, row in zip(ids.tolist(), positions):
+                self._row_index[oid] = (segment_number, row)
+        self.max_id = max(self.max_id, max(ids.tolist()))
+
+    def load_from(self, collection, query: Dict = None, batch_size: int = BUILD_BATCH_SIZE,
+                  skip_known: bool = False):
+        """Append every transaction matching `query` from `collection` (except live rows already held, with skip_known)."""
+        projection = {"property_id": 1, "company_id": 1, "merchandise_type": 1, "service": 1,
+                      "amount": 1, "barrels_of_oil": 1, "transaction_date": 1}
+        batch = []
+        with self._lock:
+            for doc in collection.find(query or {}, projection).sort("_id", 1):
+                if skip_known and self._locate(_oid_key(doc["_id"])) is not None:
+                    continue
+                batch.append(doc)
+                if len(batch) >= batch_size:
+                    self._append(batch)
+                    batch = []
+            self._append(batch)
+            self.refreshed_at = time.time()
+
+    def refresh(self, collection) -> int:
+        """
+        Pull in transactions inserted since the newest one seen, re-reading the
+        last REFRESH_OVERLAP_SECONDS of _ids. Updates and deletes made by other
+        processes aren't seen; the periodic full reload picks those up.
+
+        Returns:
+            int: Rows added
+        """
+        with self._lock:
+            before = self.segments[-1].size
+            query = {}
+            if self.max_id:
+                since = _oid_from_key(self.max_id).generation_time - timedelta(seconds=REFRESH_OVERLAP_SECONDS)
+                query = {"_id": {"$gt": ObjectId.from_datetime(since)}}
+            self.load_from(collection, query, skip_known=True)
+            return self.segments[-1].size - before
+
+    # -- incremental writes ------------------------------------------------
+
+    def _locate(self, oid: bytes):
+        if self._row_index is None:
+            self._row_index = {}
+            for number, segment in enumerate(self.segments):
+                live = segment.view("live")
+                for row, key in enumerate(segment.ids[:segment.size].tolist()):
+                    if live[row]:
+                        self._row_index[key] = (number, row)
+        return self._row_index.get(oid)
+
+    def upsert(self, doc: Dict):
+        """Add a transaction, replacing any earlier row with the same _id."""
+        with self._lock:
+            self.delete(doc["_id"])
+            self._append([doc])
+
+    def delete(self, transaction_id) -> bool:
+        with self._lock:
+            oid = _oid_key(transaction_id)
+            location = self._locate(oid)
+            if location is None:
+                return False
+            number, row = location
+            self.segments[number].columns["live"][row] = False
+            del self._row_index[oid]
+            return True
+
+    # -- queries -----------------------------------------------------------
+
+    def _mask(self, segment: Segment, filters: Dict, need_month: bool):
+        """Boolean mask of the rows to aggregate, or None when every row qualifies."""
+        conditions = []
+        live = segment.view("live")
+        if not live.all():
+            conditions.append(live)
+        for name, field in SOURCE_FIELDS.items():
+            value = filters.get(field)
+            if value is None:
+                continue
+            code = self.dictionaries[name].lookup(value)
+            if code is None:
+                return np.zeros(segment.size, bool)
+            conditions.append(segment.view(name) == code)
+        dates = segment.view("date")
+        if filters.get("start_date") is not None:
+            conditions.append(dates >= _to_datetime64(filters["start_date"]))
+        if filters.get("end_date") is not None:
+            conditions.append(dates <= _to_datetime64(filters["end_date"]))
+        if need_month:
+            conditions.append(segment.view("month") != NO_MONTH)
+        if not conditions:
+            return None
+        mask = conditions[0].copy()
+        for condition in conditions[1:]:
+            mask &= condition
+        return mask
+
+    def _aggregate(self, by: List[str], filters: Dict):
+        """Returns (key columns, amount_cents, barrels, count) arrays, one entry per group."""
+        parts = []
+        need_month = "month" in by or "year" in by
+        for segment in self.segments:
+            if not segment.size:
+                continue
+            mask = self._mask(segment, filters, need_month)
+            if mask is not None and not mask.any():
+                continue
+
+            def column(name):
+                values = segment.view(name)
+                return values if mask is None else values[mask]
+            keys = []
+            for key in by:
+                if key == "year":
+                    keys.append(column("month").astype(np.int64) // 12)
+                else:
+                    keys.append(column(key).astype(np.int64))
+            parts.append((keys, column("amount_cents"), column("barrels")))
+        if not parts:
+            empty = np.zeros(0, np.int64)
+            return [empty for _ in by], empty, np.zeros(0), empty
+
+        def combine(arrays):
+            return arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+        keys = [combine([p[0][i] for p in parts]) for i in range(len(by))]
+        cents = combine([p[1] for p in parts])
+        barrels = combine([p[2] for p in parts])
+        if not by:
+            return [], np.array([cents.sum()]), np.array([barrels.sum()]), np.array([len(cents)])
+
+        offsets = [k.min() for k in keys]
+        dims = [int(k.max() - o) + 1 for k, o in zip(keys, offsets)]
+        flat = np.ravel_multi_index([k - o for k, o in zip(keys, offsets)], dims)
+        size = int(np.prod(dims, dtype=np.int64))
+        if size <= DENSE_GROUP_LIMIT:
+            counts = np.bincount(flat, minlength=size)
+            groups = np.flatnonzero(counts)
+            counts = counts[groups]
+            cents_sum = np.bincount(flat, weights=cents, minlength=size)[groups]
+            barrels_sum = np.bincount(flat, weights=barrels, minlength=size)[groups]
+        else:
+            groups, inverse = np.unique(flat, return_inverse=True)
+            counts = np.bincount(inverse)
+            cents_sum = np.bincount(inverse, weights=cents)
+            barrels_sum = np.bincount(inverse, weights=barrels)
+        key_columns = [k + o for k, o in zip(np.unravel_index(groups, dims), offsets)]
+        return key_columns, np.rint(cents_sum).astype(np.int64), barrels_sum, counts
+
+    def _rows(self, by, key_columns, cents, barrels, counts, order) -> List[Dict]:
+        columns = {}
+        for key, column in zip(by, key_columns):
+            column = column[order]
+            if key == "month":
+                columns["month"] = column.astype("datetime64[M]").astype(str).tolist()
+            elif key == "year":
+                columns["year"] = (column + 1970).tolist()
+            else:
+                values = np.array(self.dictionaries[key].values, dtype=object)
+                columns[SOURCE_FIELDS[key]] = values[column].tolist()
+        columns["amount"] = (cents[order] / 100).tolist()
+        columns["barrels"] = barrels[order].tolist()
+        columns["count"] = counts[order].tolist()
+        names = list(columns)
+        return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+    def group_by(self, by: List[str], **filters) -> List[Dict]:
+        """
+        Sum amount and barrels and count rows per group.
+
+        Args:
+            by (List[str]): Keys from GROUP_KEYS, e.g. ["property", "month"]; empty for a grand total
+            **filters: property_id, company_id, merchandise_type, service, start_date, end_date
+
+        Returns:
+            List[Dict]: One row per group, ordered by the group keys
+        """
+        with self._lock:
+            key_columns, cents, barrels, counts = self._aggregate(by, filters)
+            return self._rows(by, key_columns, cents, barrels, counts, np.arange(len(counts)))
+
+    def top(self, by: str, metric: str = "amount", limit: int = 10, **filters) -> List[Dict]:
+        """The `limit` groups of `by` with the largest `metric`."""
+        with self._lock:
+            key_columns, cents, barrels, counts = self._aggregate([by], filters)
+            values = {"amount": cents, "barrels": barrels, "count": counts}[metric]
+            if len(values) > limit:
+                candidates = np.argpartition(-values, limit - 1)[:limit]
+            else:
+                candidates = np.arange(len(values))
+            order = candidates[np.argsort(-values[candidates], kind="stable")]
+            return self._rows([by], key_columns, cents, barrels, counts, order)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            rows = sum(segment.size for segment in self.segments)
+            live = sum(int(segment.view("live").sum()) for segment in self.segments)
+            return {
+                "rows": rows,
+                "live_rows": live,
+                "segments": [{"rows": s.size, "memory_mapped": not s.writable} for s in self.segments],
+                "dictionary_sizes": {name: len(d) for name, d in self.dictionaries.items()},
+                "snapshot": self.snapshot,
+                "refreshed_at": datetime.fromtimestamp(self.refreshed_at).isoformat(),
+                "loaded_at": datetime.fromtimestamp(self.loaded_at).isoformat(),
+            }
+
+    # -- snapshots ---------------------------------------------------------
+
+    def save(self, directory: str) -> str:
+        """
+        Write the live rows as a new snapshot version under `directory`.
+
+        Each version is its own subdirectory; CURRENT is swapped atomically, so
+        workers that still map an older version keep working.
+
+        Returns:
+            str: Name of the snapshot version
+        """
+        with self._lock:
+            version = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+            path = os.path.join(directory, version)
+            os.makedirs(path)
+            masks = [segment.view("live") for segment in self.segments]
+            for name in list(CODE_COLUMNS) + list(VALUE_COLUMNS):
+                column = np.concatenate([s.view(name)[m] for s, m in zip(self.segments, masks)])
+                np.save(os.path.join(path, f"{name}.npy"), column)
+            ids = np.concatenate([s.ids[:s.size][m] for s, m in zip(self.segments, masks)])
+            np.save(os.path.join(path, "ids.npy"), ids)
+            with open(os.path.join(path, "meta.json"), "w") as f:
+                json.dump({
+                    "rows": int(len(ids)),
+                    "max_id": self.max_id.hex() if self.max_id else None,
+                    "dictionaries": {name: d.values for name, d in self.dictionaries.items()},
+                    "created_at": datetime.now().isoformat(),
+                }, f)
+            current_tmp = os.path.join(directory, f"CURRENT.{os.getpid()}")
+            with open(current_tmp, "w") as f:
+                f.write(version)
+            os.replace(current_tmp, os.path.join(directory, "CURRENT"))
+            _prune_snapshots(directory, keep=version)
+            self.snapshot = version
+            return version
+
+    @classmethod
+    def open(cls, directory: str) -> Optional["TransactionStore"]:
+        """Open the current snapshot memory-mapped, or return None if there is none."""
+        try:
+            with open(os.path.join(directory, "CURRENT")) as f:
+                version = f.read().strip()
+            path = os.path.join(directory, version)
+            with open(os.path.join(path, "meta.json")) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+
+        store = cls()
+        store.dictionaries = {name: Dictionary(values) for name, values in meta["dictionaries"].items()}
+        columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+                   for name in list(CODE_COLUMNS) + list(VALUE_COLUMNS)}
+        # Tombstones for snapshot rows are per process, so only this small array is copied
+        columns["live"] = np.ones(meta["rows"], bool)
+        ids = np.load(os.path.join(path, "ids.npy"), mmap_mode="r")
+        store.segments = [Segment(columns, ids, meta["rows"], writable=False), Segment.empty()]
+        store.max_id = bytes.fromhex(meta["max_id"]) if meta["max_id"] else b""
+        store.snapshot = version
+        return store
+
+
+def _prune_snapshots(directory: str, keep: str):
+    versions = sorted(name for name in os.listdir(directory)
+                      if os.path.isdir(os.path.join(directory, name)) and name != keep)
+    for name in versions[:max(0, len(versions) - (SNAPSHOTS_KEPT - 1))]:
+        shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+
+def build(collection=None) -> TransactionStore:
+    """Build a store from the transactions collection."""
+    store = TransactionStore()
+    store.load_from(collection or db.get_collection("transactions"))
+    return store
+
+
+def get_store() -> TransactionStore:
+    """
+    Return the process-wide store, loading it on first use from the snapshot
+    (plus anything inserted since) or, failing that, from the collection.
+    Starts a background full reload when the loaded store is older than
+    ANALYTICS_RELOAD_SECONDS; the current store keeps serving meanwhile.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if has_app_context():
+                    # Imported lazily, after create_app(), so the app's settings are picked up here
+                    init_app(current_app)
+                store = TransactionStore.open(_settings["snapshot_dir"])
+                if store is None:
+                    store = build()
+                else:
+                    store.refresh(db.get_collection("transactions"))
+                _store = store
+    elif time.time() - _store.loaded_at > _settings["reload_seconds"]:
+        _start_reload()
+    elif time.time() - _store.refreshed_at > _settings["refresh_seconds"]:
+        _store.refresh(db.get_collection("transactions"))
+    return _store
+
+
+def _start_reload():
+    with _reload_lock:
+        if _reload["pending"] is not None:
+            return
+        _reload["pending"] = []
+    threading.Thread(target=_run_reload, name="analytics-reload", daemon=True).start()
+
+
+def _run_reload():
+    global _store
+    try:
+        store = build()
+    except Exception:
+        logger.exception("Analytics store reload failed")
+        store = None
+    with _reload_lock:
+        pending, _reload["pending"] = _reload["pending"], None
+        if _store is None:
+            return  # reset() while reloading; the next get_store() loads afresh
+        if store is None:
+            _store.loaded_at = time.time()  # retry after another interval
+            return
+        for apply, arg in pending:
+            getattr(store, apply)(arg)
+        _store = store
+
+
+def reset():
+    """Forget the loaded store; the next get_store() reloads it."""
+    global _store
+    with _store_lock:
+        _store = None
+
+
+def _record(apply: str, arg):
+    with _reload_lock:
+        if _store is None:
+            return
+        getattr(_store, apply)(arg)
+        if _reload["pending"] is not None:
+            _reload["pending"].append((apply, arg))
+
+
+def record_upsert(doc: Dict):
+    """Apply a created or updated transaction to the loaded store (no-op when nothing is loaded)."""
+    _record("upsert", doc)
+
+
+def record_delete(transaction_id):
+    """Apply a deleted transaction to the loaded store (no-op when nothing is loaded)."""
+    _record("delete", transaction_id)
+
+
+def is_loaded() -> bool:
+    return _store is not None
+
+
+def init_app(app):
+    _settings["snapshot_dir"] = app.config["ANALYTICS_SNAPSHOT_DIR"]
+    _settings["refresh_seconds"] = app.config["ANALYTICS_REFRESH_SECONDS"]
+    _settings["reload_seconds"] = app.config["ANALYTICS_RELOAD_SECONDS"]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build a transactions analytics snapshot")
+    parser.add_argument("command", choices=["snapshot"])
+    parser.add_argument("--directory", default=Config.ANALYTICS_SNAPSHOT_DIR)
+    args = parser.parse_args()
+
+    os.makedirs(args.directory, exist_ok=True)
+    started = time.perf_counter()
+    store = build()
+    version = store.save(args.directory)
+    print(f"Wrote snapshot {version} ({store.stats()['live_rows']} rows) "
+          f"in {time.perf_counter() - started:.1f}s")
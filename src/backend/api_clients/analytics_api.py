@@ -0,0 +1,127 @@
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+from db import LazyCollection
+import analytics_store
+import geo
+
+# MongoDB collections (resolved on first use)
+properties_collection = LazyCollection("properties")
+
+
+class AnalyticsAPI:
+    @staticmethod
+    def _filters(filters: Optional[Dict]) -> Dict:
+        filters = dict(filters or {})
+        for field in ("start_date", "end_date"):
+            if isinstance(filters.get(field), str):
+                try:
+                    filters[field] = datetime.fromisoformat(filters[field])
+                except ValueError:
+                    raise ValueError(f"Invalid {field} format. Use ISO format (YYYY-MM-DD)")
+        return filters
+
+    @staticmethod
+    def group_by(by: List[str], filters: Dict = None) -> List[Dict]:
+        """
+        Aggregate transactions by one or more keys.
+        
+        Args:
+            by (List[str]): Group keys: property, company, merchandise_type, service, month, year
+            filters (Dict, optional): property_id, company_id, merchandise_type, service,
+                start_date, end_date (datetime or ISO string)
+                
+        Returns:
+            List[Dict]: One row per group with amount, barrels and count
+            
+        Raises:
+            ValueError: If a group key or date is invalid
+        """
+        invalid = [key for key in by if key not in analytics_store.GROUP_KEYS]
+        if invalid:
+            raise ValueError(f"Invalid group key(s): {', '.join(invalid)}. "
+                             f"Must be one of: {', '.join(analytics_store.GROUP_KEYS)}")
+        return analytics_store.get_store().group_by(by, **AnalyticsAPI._filters(filters))
+
+    @staticmethod
+    def top(by: str, metric: str = "amount", limit: int = 10, filters: Dict = None) -> List[Dict]:
+        """
+        Get the groups with the largest total, e.g. top companies by amount.
+        
+        Args:
+            by (str): property, company, merchandise_type or service
+            metric (str): amount, barrels or count
+            limit (int): Number of groups to return
+            filters (Dict, optional): Same filters as group_by
+            
+        Returns:
+            List[Dict]: Up to `limit` rows, largest first
+            
+        Raises:
+            ValueError: If the key, metric or limit is invalid
+        """
+        if by not in analytics_store.CODE_COLUMNS:
+            raise ValueError(f"Invalid key '{by}'. Must be one of: {', '.join(analytics_store.CODE_COLUMNS)}")
+        if metric not in analytics_store.METRICS:
+            raise ValueError(f"Invalid metric '{metric}'. Must be one of: {', '.join(analytics_store.METRICS)}")
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        return analytics_store.get_store().top(by, metric, limit, **AnalyticsAPI._filters(filters))
+
+    @staticmethod
+    def revenue_by_area(level: str = "state", state: str = None, filters: Dict = None) -> List[Dict]:
+        """
+        Transaction totals per state or county of the property.
+        
+        Per-property totals come from the analytics store; property areas are
+        read with one query on the "area" index.
+        
+        Args:
+            level (str): "state" or "county"
+            state (str, optional): Only properties in this state (name or USPS code)
+            filters (Dict, optional): Same filters as group_by
+            
+        Returns:
+            List[Dict]: {state[, county], amount, barrels, count, properties} per area,
+                largest amount first; properties without an area are grouped under None
+            
+        Raises:
+            ValueError: If the level or a filter is invalid
+        """
+        if level not in geo.AREA_LEVELS:
+            raise ValueError(f"Invalid level '{level}'. Must be one of: {', '.join(geo.AREA_LEVELS)}")
+        query = {"area.state": geo.normalize_state(state)} if state else {}
+        areas = {str(doc["_id"]): doc.get("area") or {}
+                 for doc in properties_collection.find(query, {"area": 1})}
+        keys = geo.AREA_LEVELS[:geo.AREA_LEVELS.index(level) + 1]
+
+        totals = {}
+        for row in analytics_store.get_store().group_by(["property"], **AnalyticsAPI._filters(filters)):
+            area = areas.get(row["property_id"])
+            if area is None:
+                continue
+            key = tuple(area.get(name) for name in keys)
+            total = totals.setdefault(key, {"amount": 0.0, "barrels": 0.0, "count": 0, "properties": 0})
+            total["amount"] += row["amount"]
+            total["barrels"] += row["barrels"]
+            total["count"] += row["count"]
+            total["properties"] += 1
+        rows = [dict(zip(keys, key), **dict(total, amount=round(total["amount"], 2)))
+                for key, total in totals.items()]
+        return sorted(rows, key=lambda row: row["amount"], reverse=True)
+
+    @staticmethod
+    def get_status() -> Dict:
+        """Row counts, segments and snapshot of the loaded store (loading it if needed)."""
+        return analytics_store.get_store().stats()
+
+    @staticmethod
+    def save_snapshot(directory: str) -> str:
+        """
+        Write the current store as a memory-mappable snapshot.
+        
+        Returns:
+            str: The snapshot version
+        """
+        os.makedirs(directory, exist_ok=True)
+        return analytics_store.get_store().save(directory)
@@ -0,0 +1,183 @@
+"""
+Async variants of the *API classes, backed by pymongo's AsyncMongoClient.
+
+Method names and return values match the synchronous classes. Coroutines here
+must run on the shared aio loop (use aio.run from a Flask handler). Where a
+request needs several independent queries they are issued together with
+asyncio.gather, so the request pays for one round trip instead of several.
+
+That is the only gain. The Flask workers are synchronous and block in aio.run
+until the coroutine finishes, so going async doesn't let a worker serve more
+requests at once; throughput still comes from the number of workers and
+threads. Only add methods here for requests that fan out into independent
+reads. Validation and document building stay in the synchronous classes and
+are shared from there.
+"""
+import asyncio
+from bson import ObjectId
+from typing import Dict, List, Optional
+from db import AsyncLazyCollection
+from utils import async_create_document, async_get_document, async_get_all_documents, convert_objectid_to_str
+from api_clients.company_ownership_api import CompanyOwnershipAPI
+import query_cache
+
+# Async MongoDB collections (resolved on first use, on the aio loop)
+properties_collection = AsyncLazyCollection("properties")
+companies_collection = AsyncLazyCollection("companies")
+transactions_collection = AsyncLazyCollection("transactions")
+company_ownership_collection = AsyncLazyCollection("company_ownership")
+entries_collection = AsyncLazyCollection("entries")
+memberships_collection = AsyncLazyCollection("entry_memberships")
+
+
+class AsyncPropertiesAPI:
+    @staticmethod
+    async def get_property(property_id: str) -> Optional[Dict]:
+        """Async version of PropertiesAPI.get_property."""
+        return await async_get_document(properties_collection, {"_id": ObjectId(property_id)})
+
+    @staticmethod
+    async def get_all_properties() -> List[Dict]:
+        """Async version of PropertiesAPI.get_all_properties."""
+        return await async_get_all_documents(properties_collection)
+
+
+class AsyncCompaniesAPI:
+    @staticmethod
+    async def get_company(company_id: str) -> Optional[Dict]:
+        """Async version of CompaniesAPI.get_company."""
+        return await async_get_document(companies_collection, {"_id": ObjectId(company_id)})
+
+    @staticmethod
+    async def get_all_companies() -> List[Dict]:
+        """Async version of CompaniesAPI.get_all_companies."""
+        return await async_get_all_documents(companies_collection)
+
+
+class AsyncTransactionsAPI:
+    @staticmethod
+    async def get_transaction(transaction_id: str) -> Optional[Dict]:
+        """Async version of TransactionsAPI.get_transaction."""
+        return await async_get_document(transactions_collection, {"_id": ObjectId(transaction_id)})
+
+    @staticmethod
+    async def get_all_transactions() -> List[Dict]:
+        """Async version of TransactionsAPI.get_all_transactions."""
+        return await async_get_all_documents(transactions_collection)
+
+    @staticmethod
+    async def get_transactions_by_ids(transaction_ids: List) -> List[Dict]:
+        """
+        Fetch several transactions with a single $in query.
+
+        Args:
+            transaction_ids (List): Transaction IDs (str or ObjectId)
+
+        Returns:
+            List[Dict]: The transactions that exist, in the order of transaction_ids
+        """
+        object_ids = [ObjectId(tid) if isinstance(tid, str) else tid for tid in transaction_ids]
+        if not object_ids:
+            return []
+        docs = await transactions_collection.find({"_id": {"$in": object_ids}}).to_list(None)
+        by_id = {doc["_id"]: doc for doc in docs}
+        return [convert_objectid_to_str(by_id[oid]) for oid in object_ids if oid in by_id]
+
+
+class AsyncCompanyOwnershipAPI:
+    @staticmethod
+    async def get_company_ownership(ownership_id: str) -> Optional[Dict]:
+        """Async version of CompanyOwnershipAPI.get_company_ownership."""
+        return await async_get_document(company_ownership_collection, {"_id": ObjectId(ownership_id)})
+
+    @staticmethod
+    async def get_all_company_ownerships() -> List[Dict]:
+        """Async version of CompanyOwnershipAPI.get_all_company_ownerships."""
+        return await async_get_all_documents(company_ownership_collection)
+
+    @staticmethod
+    async def create_company_ownership(ownership_data: Dict) -> str:
+        """
+        Async version of CompanyOwnershipAPI.create_company_ownership.
+
+        The company and property existence checks run concurrently.
+
+        Raises:
+            ValueError: If required fields are missing or if company_id/property_id don't exist
+        """
+        CompanyOwnershipAPI.validate_ownership_fields(ownership_data)
+        company, property_doc = await asyncio.gather(
+            companies_collection.find_one({"_id": ObjectId(ownership_data["company_id"])}, {"_id": 1}),
+            properties_collection.find_one({"_id": ObjectId(ownership_data["property_id"])}, {"_id": 1}),
+        )
+        document = CompanyOwnershipAPI.ownership_document(ownership_data, company is not None,
+                                                          property_doc is not None)
+
+        ownership_id = await async_create_document(company_ownership_collection, document)
+        query_cache.invalidate("company_ownership")
+        return str(ownership_id)
+
+
+class AsyncEntriesAPI:
+    @staticmethod
+    async def get_entry(entry_id: str) -> Optional[Dict]:
+        """Async version of EntriesAPI.get_entry."""
+        return await async_get_document(entries_collection, {"_id": ObjectId(entry_id)})
+
+    @staticmethod
+    async def get_all_entries() -> List[Dict]:
+        """Async version of EntriesAPI.get_all_entries."""
+        return await async_get_all_documents(entries_collection)
+
+    @staticmethod
+    async def get_entry_with_transactions(entry_id: str) -> Optional[Dict]:
+        """
+        Async version of EntriesAPI.get_entry_with_transactions.
+
+        Loads the entry and its member IDs concurrently, then all of its
+        transactions with one $in query.
+        """
+        entry, memberships = await asyncio.gather(
+            entries_collection.find_one({"_id": ObjectId(entry_id)}),
+            memberships_collection.find({"entry_id": ObjectId(entry_id)}, {"_id": 0, "transaction_id": 1})
+            .sort("transaction_id", 1).to_list(None),
+        )
+        if not entry:
+            return None
+        transactions = await AsyncTransactionsAPI.get_transactions_by_ids(
+            [membership["transaction_id"] for membership in memberships])
+        entry_dict = convert_objectid_to_str(entry)
+        entry_dict["transactions"] = transactions
+        return entry_dict
+
+
+class AsyncDashboardAPI:
+    @staticmethod
+    async def get_summary(recent_limit: int = 5) -> Dict:
+        """
+        Collection counts and the most recent transactions, fetched concurrently.
+
+        Args:
+            recent_limit (int): Number of recent transactions to include
+
+        Returns:
+            Dict: {"companies", "transactions", "company_ownerships", "entries", "properties",
+                   "recent_transactions"}
+        """
+        counts_and_recent = await asyncio.gather(
+            companies_collection.estimated_document_count(),
+            transactions_collection.estimated_document_count(),
+            company_ownership_collection.estimated_document_count(),
+            entries_collection.estimated_document_count(),
+            properties_collection.estimated_document_count(),
+            transactions_collection.find().sort("transaction_date", -1).limit(recent_limit).to_list(None),
+        )
+        companies, transactions, ownerships, entries, properties, recent = counts_and_recent
+        return {
+            "companies": companies,
+            "transactions": transactions,
+            "company_ownerships": ownerships,
+            "entries": entries,
+            "properties": properties,
+            "recent_transactions": [convert_objectid_to_str(doc) for doc in recent],
+        }
@@ -0,0 +1,27 @@
+from typing import Dict, List
+import autocomplete
+
+
+class AutocompleteAPI:
+    @staticmethod
+    def suggest(kind: str, q: str, limit: int = 10) -> List[Dict]:
+        """
+        Suggest companies or properties whose name starts with the typed text.
+
+        Args:
+            kind (str): "company" or "property"
+            q (str): Text typed so far; matched against the start of the name
+                and of each word in it, ignoring case, accents and punctuation
+            limit (int): Maximum number of suggestions (at most autocomplete.MAX_LIMIT)
+
+        Returns:
+            List[Dict]: {id, name} suggestions, whole-name matches first
+
+        Raises:
+            ValueError: If the type or limit is invalid
+        """
+        if kind not in autocomplete.SOURCES:
+            raise ValueError(f"Invalid type '{kind}'. Must be one of: {', '.join(autocomplete.SOURCES)}")
+        if not 1 <= limit <= autocomplete.MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {autocomplete.MAX_LIMIT}")
+        return autocomplete.get_index(kind).search(q or "", limit)
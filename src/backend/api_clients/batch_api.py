@@ -0,0 +1,69 @@
+from bson import ObjectId
+from typing import Dict, List, Optional
+from utils import convert_objectid_to_str
+from db import LazyCollection
+
+# Collections that can be read by ID list, keyed by their URL name (/api/<name>/batch-get)
+BATCH_COLLECTIONS = {
+    "properties": LazyCollection("properties"),
+    "companies": LazyCollection("companies"),
+    "transactions": LazyCollection("transactions"),
+    "company-ownership": LazyCollection("company_ownership"),
+    "accounts": LazyCollection("accounts"),
+    "entries": LazyCollection("entries"),
+}
+MAX_BATCH_SIZE = 5000
+
+
+def _projection(fields: Optional[List[str]]) -> Optional[Dict]:
+    if fields is None:
+        return None
+    if not isinstance(fields, list) or not all(isinstance(field, str) and field for field in fields):
+        raise ValueError("fields must be a list of field names")
+    invalid = [field for field in fields if field.startswith("$")]
+    if invalid:
+        raise ValueError(f"Invalid field name(s): {', '.join(invalid)}")
+    return {field: 1 for field in fields}
+
+
+class BatchAPI:
+    @staticmethod
+    def batch_get(collection: str, ids: List[str], fields: Optional[List[str]] = None) -> Dict:
+        """
+        Read a list of documents by ID with a single $in query.
+
+        Args:
+            collection (str): URL name of the collection (a key of BATCH_COLLECTIONS)
+            ids (List[str]): Document IDs; duplicates are allowed
+            fields (List[str], optional): Fields to return (plus _id); the whole document if omitted
+
+        Returns:
+            Dict: results in request order, each {"id", "found": True, "document"} or
+                {"id", "found": False}, and the found/missing counts
+
+        Raises:
+            ValueError: If the collection is unknown, or the IDs or fields are invalid
+        """
+        if collection not in BATCH_COLLECTIONS:
+            raise ValueError(f"Invalid collection '{collection}'. Must be one of: {', '.join(BATCH_COLLECTIONS)}")
+        if not isinstance(ids, list) or not all(isinstance(i, str) for i in ids):
+            raise ValueError("ids must be a list of ID strings")
+        if len(ids) > MAX_BATCH_SIZE:
+            raise ValueError(f"At most {MAX_BATCH_SIZE} ids can be read at once")
+        invalid = [i for i in ids if not ObjectId.is_valid(i)]
+        if invalid:
+            raise ValueError(f"Invalid ID(s): {', '.join(invalid[:10])}")
+        projection = _projection(fields)
+
+        object_ids = list(dict.fromkeys(ObjectId(i) for i in ids))
+        by_id = {}
+        if object_ids:
+            cursor = BATCH_COLLECTIONS[collection].find({"_id": {"$in": object_ids}}, projection)
+            by_id = {str(doc["_id"]): convert_objectid_to_str(doc) for doc in cursor}
+
+        results = [
+            {"id": i, "found": True, "document": by_id[i]} if i in by_id else {"id": i, "found": False}
+            for i in ids
+        ]
+        found = sum(result["found"] for result in results)
+        return {"results": results, "found": found, "missing": len(results) - found}
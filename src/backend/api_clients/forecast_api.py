@@ -0,0 +1,167 @@
+from typing import Dict, List, Optional
+from datetime import datetime
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from db import LazyCollection
+from config import Config
+
+# MongoDB collections (resolved on first use)
+forecasts_collection = LazyCollection("decline_forecasts")
+production_collection = LazyCollection("production")
+
+# One cached fit per property. Writes of new volume data mark it stale
+# (stale_since); a fit only clears the flag if nothing was invalidated after
+# the fit started reading data. analytics_store and decline pull in numpy, so
+# they're imported by the methods that fit, not by the writers that invalidate.
+DUPLICATE_KEY = 11000
+
+
+class ForecastAPI:
+    @staticmethod
+    def invalidate(property_ids: List[str]) -> int:
+        """
+        Mark the cached forecasts of these properties stale.
+
+        Args:
+            property_ids (List[str]): Properties that received new volume data
+
+        Returns:
+            int: Number of cached forecasts marked stale
+        """
+        property_ids = [str(property_id) for property_id in property_ids if property_id]
+        if not property_ids:
+            return 0
+        result = forecasts_collection.update_many(
+            {"property_id": {"$in": property_ids}},
+            {"$set": {"stale": True, "stale_since": datetime.now()}}
+        )
+        return result.modified_count
+
+    @staticmethod
+    def load_histories(property_ids: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """
+        Average daily oil rate per month for each property, from production data
+        where a property has any (volume / days reported, so partial months don't
+        look like a collapse) and otherwise from transactions' barrels_of_oil
+        spread over the calendar month.
+
+        Args:
+            property_ids (List[str], optional): Limit to these properties; all if omitted
+
+        Returns:
+            Dict: property_id -> {"source": str, "monthly": {month: barrels per day}}
+        """
+        import analytics_store
+        import decline
+        query = {"property_id": {"$in": list(property_ids)}} if property_ids is not None else {}
+        histories = {}
+        for bucket in production_collection.find(query, {"_id": 0, "property_id": 1, "month": 1, "days": 1}):
+            reported = [day["oil"] for day in bucket.get("days", {}).values() if day.get("oil") is not None]
+            oil = sum(reported)
+            if oil > 0:
+                history = histories.setdefault(bucket["property_id"], {"source": "production", "monthly": {}})
+                history["monthly"][bucket["month"]] = oil / len(reported)
+
+        wanted = None if property_ids is None else set(property_ids) - set(histories)
+        if wanted is None or wanted:
+            store = analytics_store.get_store()
+            filters = {"property_id": next(iter(wanted))} if wanted and len(wanted) == 1 else {}
+            for row in store.group_by(["property", "month"], **filters):
+                property_id = row["property_id"]
+                if row["barrels"] <= 0 or (wanted is not None and property_id not in wanted):
+                    continue
+                if histories.get(property_id, {}).get("source") == "production":
+                    continue
+                history = histories.setdefault(property_id, {"source": "transactions", "monthly": {}})
+                month = datetime.fromisoformat(row["month"] + "-01")
+                history["monthly"][month] = row["barrels"] / decline.days_in_month(month)
+        return histories
+
+    @staticmethod
+    def fit_forecasts(property_ids: Optional[List[str]] = None, stale_only: bool = True,
+                      workers: int = 1) -> Dict:
+        """
+        Fit decline curves and store them.
+
+        Args:
+            property_ids (List[str], optional): Properties to fit; defaults to every
+                property with volume data
+            stale_only (bool): Skip properties whose cached forecast is still fresh
+            workers (int): Worker processes for the fit
+
+        Returns:
+            Dict: Counts of properties fitted, not fittable (too few points or no
+                decline) and invalidated again while the fit was running
+        """
+        import decline
+        started = datetime.now()
+        histories = ForecastAPI.load_histories(property_ids)
+        if stale_only:
+            fresh = set(forecasts_collection.distinct("property_id", {"stale": False}))
+            histories = {pid: history for pid, history in histories.items() if pid not in fresh}
+
+        fits = decline.fit_histories({pid: history["monthly"] for pid, history in histories.items()},
+                                     workers=workers, chunk_size=Config.FORECAST_CHUNK_SIZE)
+        operations = []
+        for property_id, params in fits.items():
+            doc = dict(params or {"model": None}, source=histories[property_id]["source"],
+                       stale=False, fitted_at=datetime.now())
+            operations.append(UpdateOne(
+                {"property_id": property_id, "stale_since": {"$not": {"$gt": started}}},
+                {"$set": doc}, upsert=True
+            ))
+        raced = 0
+        if operations:
+            try:
+                forecasts_collection.bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                # Invalidated while fitting: the upsert collides with the existing
+                # document, which stays stale for the next run
+                errors = e.details.get("writeErrors", [])
+                if any(error.get("code") != DUPLICATE_KEY for error in errors):
+                    raise
+                raced = len(errors)
+        fitted = sum(1 for params in fits.values() if params)
+        return {"fitted": fitted, "not_fittable": len(fits) - fitted, "invalidated_during_fit": raced}
+
+    @staticmethod
+    def get_forecast(property_id: str, months: int = 60) -> Optional[Dict]:
+        """
+        Get a property's decline fit and forecast, fitting first if the cache is stale.
+
+        Args:
+            property_id (str): The property ID
+            months (int): Number of months to forecast
+
+        Returns:
+            Optional[Dict]: Fit parameters (qi in barrels per day, di per month) plus
+                a monthly forecast and its total volume, or None if the property has
+                no volume data
+
+        Raises:
+            ValueError: If months is not positive
+        """
+        import decline
+        if months < 1:
+            raise ValueError("months must be at least 1")
+        cached = forecasts_collection.find_one({"property_id": property_id}, {"_id": 0})
+        if cached is None or cached.get("stale"):
+            ForecastAPI.fit_forecasts([property_id], stale_only=False)
+            cached = forecasts_collection.find_one({"property_id": property_id}, {"_id": 0})
+        if cached is None:
+            return None
+        if cached.get("model"):
+            cached["forecast"] = decline.forecast(cached, months)
+            cached["forecast_total"] = round(sum(month["oil"] for month in cached["forecast"]), 4)
+        return cached
+
+    @staticmethod
+    def get_forecasts(stale: Optional[bool] = None) -> List[Dict]:
+        """
+        List cached fits (without forecasts).
+
+        Args:
+            stale (bool, optional): Only stale (True) or only fresh (False) fits
+        """
+        query = {} if stale is None else {"stale": stale}
+        return list(forecasts_collection.find(query, {"_id": 0}).sort("property_id", 1))
@@ -0,0 +1,186 @@
+from bson import ObjectId
+from typing import Dict, List, Optional
+from datetime import datetime
+from pymongo import UpdateOne
+from db import LazyCollection
+import dates
+from api_clients.forecast_api import ForecastAPI
+
+# MongoDB collections (resolved on first use)
+production_collection = LazyCollection("production")
+properties_collection = LazyCollection("properties")
+
+# Daily volumes are stored one document per property per month:
+#   {"property_id": str, "month": datetime(Y, M, 1),
+#    "days": {"01": {"oil": float, "gas": float, "water": float}, ...}, "updated_at": datetime}
+# Re-ingesting a day overwrites the volumes it includes, so ingest is idempotent.
+VOLUME_FIELDS = ["oil", "gas", "water"]
+INTERVALS = ["daily", "monthly"]
+
+
+def _parse_date(value, field: str) -> datetime:
+    if value is None:
+        raise ValueError(f"Invalid {field} format. Use ISO format (YYYY-MM-DD)")
+    return dates.to_datetime(value, field)
+
+
+def _month_start(day: datetime) -> datetime:
+    return datetime(day.year, day.month, 1)
+
+
+class ProductionAPI:
+    @staticmethod
+    def ingest_volumes(readings: List[Dict]) -> Dict:
+        """
+        Store daily production volumes, writing each property-month bucket once.
+
+        Args:
+            readings (List[Dict]): Daily readings, each with:
+                - property_id (str): ID of the property (MANDATORY)
+                - date (datetime or ISO str): Production day (MANDATORY)
+                - oil, gas, water (float, optional): Volumes; at least one is required
+
+        Returns:
+            Dict: Number of readings and buckets written and buckets created
+
+        Raises:
+            ValueError: If a reading is invalid or references an unknown property
+        """
+        if not isinstance(readings, list) or not readings:
+            raise ValueError("readings must be a non-empty list")
+
+        buckets = {}
+        for i, reading in enumerate(readings):
+            if "property_id" not in reading or "date" not in reading:
+                raise ValueError(f"Reading {i}: 'property_id' and 'date' are mandatory")
+            day = _parse_date(reading["date"], f"date in reading {i}")
+            volumes = {}
+            for field in VOLUME_FIELDS:
+                if reading.get(field) is None:
+                    continue
+                try:
+                    volumes[field] = float(reading[field])
+                except (ValueError, TypeError):
+                    raise ValueError(f"Reading {i}: {field} must be a valid number")
+                if volumes[field] < 0:
+                    raise ValueError(f"Reading {i}: {field} cannot be negative")
+            if not volumes:
+                raise ValueError(f"Reading {i}: at least one of {', '.join(VOLUME_FIELDS)} is required")
+            bucket = buckets.setdefault((str(reading["property_id"]), _month_start(day)), {})
+            for field, value in volumes.items():
+                bucket[f"days.{day.day:02d}.{field}"] = value
+
+        # Validate every property with one query
+        property_ids = {property_id for property_id, _ in buckets}
+        try:
+            object_ids = [ObjectId(property_id) for property_id in property_ids]
+        except Exception:
+            raise ValueError("Invalid property_id in readings")
+        found = {str(doc["_id"]) for doc in properties_collection.find({"_id": {"$in": object_ids}}, {"_id": 1})}
+        missing = sorted(property_ids - found)
+        if missing:
+            raise ValueError(f"Properties not found: {', '.join(missing)}")
+
+        now = datetime.now()
+        operations = [
+            UpdateOne({"property_id": property_id, "month": month},
+                      {"$set": dict(fields, updated_at=now)}, upsert=True)
+            for (property_id, month), fields in buckets.items()
+        ]
+        result = production_collection.bulk_write(operations, ordered=False)
+        ForecastAPI.invalidate(sorted(property_ids))
+        return {"readings": len(readings), "buckets": len(operations), "buckets_created": result.upserted_count}
+
+    @staticmethod
+    def _buckets(property_id: Optional[str], start_date: Optional[datetime], end_date: Optional[datetime]):
+        query = {}
+        if property_id is not None:
+            query["property_id"] = property_id
+        month_range = {}
+        if start_date is not None:
+            month_range["$gte"] = _month_start(start_date)
+        if end_date is not None:
+            month_range["$lte"] = _month_start(end_date)
+        if month_range:
+            query["month"] = month_range
+        return production_collection.find(query, {"_id": 0}).sort([("property_id", 1), ("month", 1)])
+
+    @staticmethod
+    def get_daily_volumes(property_id: str, start_date: datetime = None, end_date: datetime = None) -> List[Dict]:
+        """
+        Get daily volumes for a property.
+
+        Args:
+            property_id (str): The property ID
+            start_date (datetime, optional): First day (inclusive)
+            end_date (datetime, optional): Last day (inclusive)
+
+        Returns:
+            List[Dict]: {date, oil, gas, water} per reported day, oldest first
+        """
+        # Buckets hold naive UTC dates, so bounds are compared in the same terms
+        start_date = dates.to_datetime(start_date, "start_date")
+        end_date = dates.to_datetime(end_date, "end_date")
+        days = []
+        for bucket in ProductionAPI._buckets(property_id, start_date, end_date):
+            month = bucket["month"]
+            for key in sorted(bucket.get("days", {})):
+                day = month.replace(day=int(key))
+                if (start_date and day < start_date) or (end_date and day > end_date):
+                    continue
+                volumes = bucket["days"][key]
+                days.append(dict({field: volumes.get(field, 0.0) for field in VOLUME_FIELDS}, date=day))
+        return days
+
+    @staticmethod
+    def get_monthly_volumes(property_id: str = None, start_date: datetime = None,
+                            end_date: datetime = None) -> List[Dict]:
+        """
+        Get monthly volume totals, resampled from the monthly buckets.
+
+        Args:
+            property_id (str, optional): Limit to one property; all properties if omitted
+            start_date (datetime, optional): First month (inclusive)
+            end_date (datetime, optional): Last month (inclusive)
+
+        Returns:
+            List[Dict]: {property_id, month, oil, gas, water, days_reported} per bucket,
+                ordered by property and month
+        """
+        start_date = dates.to_datetime(start_date, "start_date")
+        end_date = dates.to_datetime(end_date, "end_date")
+        months = []
+        for bucket in ProductionAPI._buckets(property_id, start_date, end_date):
+            days = bucket.get("days", {})
+            totals = {field: sum(day.get(field, 0.0) for day in days.values()) for field in VOLUME_FIELDS}
+            months.append(dict(totals, property_id=bucket["property_id"], month=bucket["month"],
+                               days_reported=len(days)))
+        return months
+
+    @staticmethod
+    def get_volumes(property_id: str, interval: str = "daily", start_date: datetime = None,
+                    end_date: datetime = None) -> List[Dict]:
+        """
+        Get volumes for a property at the given interval.
+
+        Raises:
+            ValueError: If the interval is not one of INTERVALS
+        """
+        if interval not in INTERVALS:
+            raise ValueError(f"Invalid interval '{interval}'. Must be one of: {', '.join(INTERVALS)}")
+        if interval == "monthly":
+            return ProductionAPI.get_monthly_volumes(property_id, start_date, end_date)
+        return ProductionAPI.get_daily_volumes(property_id, start_date, end_date)
+
+    @staticmethod
+    def delete_volumes(property_id: str) -> int:
+        """
+        Delete all production data for a property.
+
+        Returns:
+            int: Number of monthly buckets deleted
+        """
+        deleted = production_collection.delete_many({"property_id": property_id}).deleted_count
+        if deleted:
+            ForecastAPI.invalidate([property_id])
+        return deleted
@@ -0,0 +1,89 @@
+import heapq
+from typing import Dict, List, Optional
+from db import LazyCollection
+import indexes
+
+# MongoDB collections (resolved on first use)
+entries_collection = LazyCollection("entries")
+transactions_collection = LazyCollection("transactions")
+companies_collection = LazyCollection("companies")
+properties_collection = LazyCollection("properties")
+
+# Searchable collection -> (collection, fields tried in order for the result title).
+# Each one needs the "search" text index from indexes.py.
+SEARCHABLE = {
+    "entries": (entries_collection, ("title",)),
+    "transactions": (transactions_collection, ("merchandise_transacted", "service", "merchandise_type")),
+    "companies": (companies_collection, ("name",)),
+    "properties": (properties_collection, ("name",)),
+}
+MAX_PAGE_SIZE = 100
+SCORE = {"score": {"$meta": "textScore"}}
+
+
+class SearchAPI:
+    @staticmethod
+    def search(q: str, collections: Optional[List[str]] = None, page: int = 1, page_size: int = 20) -> Dict:
+        """
+        Full-text search across collections, ranked by relevance.
+
+        Each collection is queried through its text index for only the top
+        page * page_size hits, and those are merged by score, so a page never
+        reads more than it can return.
+
+        Args:
+            q (str): Search terms; "quoted phrases" must match and -term excludes
+            collections (List[str], optional): Collections to search; all of SEARCHABLE if omitted
+            page (int): 1-based page number
+            page_size (int): Results per page (at most MAX_PAGE_SIZE)
+
+        Returns:
+            Dict: results ({collection, id, score, title, document}, best first),
+                total matches, per-collection totals, page and page_size
+
+        Raises:
+            ValueError: If the query is empty or a collection or page is invalid
+            MissingIndexError: If a collection's text index hasn't been created
+        """
+        q = (q or "").strip()
+        if not q:
+            raise ValueError("Search query 'q' is required")
+        collections = collections or list(SEARCHABLE)
+        invalid = [name for name in collections if name not in SEARCHABLE]
+        if invalid:
+            raise ValueError(f"Invalid collection(s): {', '.join(invalid)}. "
+                             f"Must be one of: {', '.join(SEARCHABLE)}")
+        if page < 1:
+            raise ValueError("page must be at least 1")
+        if not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise ValueError(f"page_size must be between 1 and {MAX_PAGE_SIZE}")
+
+        query = {"$text": {"$search": q}}
+        needed = page * page_size
+        hits = []
+        totals = {}
+        for name in collections:
+            collection, title_fields = SEARCHABLE[name]
+            with indexes.required(name, "search"):
+                totals[name] = collection.count_documents(query)
+                if not totals[name]:
+                    continue
+                docs = list(collection.find(query, SCORE).sort([("score", SCORE["score"])]).limit(needed))
+            for doc in docs:
+                score = doc.pop("score")
+                hits.append({
+                    "collection": name,
+                    "id": str(doc["_id"]),
+                    "score": round(score, 4),
+                    "title": next((doc[field] for field in title_fields if doc.get(field)), None),
+                    "document": doc,
+                })
+
+        ranked = heapq.nlargest(needed, hits, key=lambda hit: hit["score"])
+        return {
+            "results": ranked[(page - 1) * page_size:],
+            "total": sum(totals.values()),
+            "totals": totals,
+            "page": page,
+            "page_size": page_size,
+        }
@@ -0,0 +1,221 @@
+"""
+In-process prefix index for company and property name autocomplete.
+
+Names are normalized (accents folded, lowercased, punctuation collapsed to
+single spaces) and kept in two sorted lists searched with bisect:
+
+    names    the whole normalized name          "lone star petroleum"
+    words    the name from each later word on   "star petroleum", "petroleum"
+
+A lookup takes matches of the whole name first, then matches starting at a
+later word, so "lone" and "petro" both find "Lone Star Petroleum" and a page
+of k results costs O(log n + k).
+
+Each process loads an index on first use. CompaniesAPI/PropertiesAPI writes
+are applied as they happen (record_upsert/record_delete). Once an index is
+older than refresh_seconds, one background thread reloads it to pick up writes
+made by other processes; requests keep searching the old lists meanwhile, and
+writes recorded during the load are replayed onto the new ones.
+"""
+import logging
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional
+import db
+from config import Config
+
+# type -> collection
+SOURCES = {"company": "companies", "property": "properties"}
+MAX_LIMIT = 50
+
+_settings = {"refresh_seconds": Config.AUTOCOMPLETE_REFRESH_SECONDS}
+_indexes = {}
+# kind -> index being loaded for the first time, so writes recorded meanwhile reach it
+_loading = {}
+_indexes_lock = threading.Lock()
+_SEPARATORS = re.compile(r"[^0-9a-z]+")
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(name) -> str:
+    text = unicodedata.normalize("NFKD", str(name or ""))
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return _SEPARATORS.sub(" ", text.lower()).strip()
+
+
+class PrefixIndex:
+    def __init__(self):
+        # Sorted (normalized key, id) pairs
+        self.names = []
+        self.words = []
+        # id -> display name
+        self.labels = {}
+        self.loaded_at = time.time()
+        self._lock = threading.RLock()
+        # Writes recorded while load() scans the collection, replayed after the swap
+        self._pending = None
+        self._reloading = False
+
+    @staticmethod
+    def _word_keys(key: str) -> List[str]:
+        return [key[i + 1:] for i, char in enumerate(key) if char == " "]
+
+    def load(self, collection):
+        with self._lock:
+            self._pending = []
+        try:
+            names, words, labels = self._scan(collection)
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            self.names, self.words, self.labels = names, words, labels
+            self.loaded_at = time.time()
+            pending, self._pending = self._pending, None
+            for apply, args in pending:
+                apply(*args)
+
+    def _scan(self, collection):
+        names, words, labels = [], [], {}
+        for doc in collection.find({}, {"name": 1}):
+            key = normalize(doc.get("name"))
+            if not key:
+                continue
+            _id = str(doc["_id"])
+            labels[_id] = doc["name"]
+            names.append((key, _id))
+            words.extend((word, _id) for word in self._word_keys(key))
+        names.sort()
+        words.sort()
+        return names, words, labels
+
+    def reload_in_background(self, collection):
+        """Reload on a background thread unless a reload is already running."""
+        with self._lock:
+            if self._reloading:
+                return
+            self._reloading = True
+        threading.Thread(target=self._run_reload, args=(collection,), name="autocomplete-reload",
+                         daemon=True).start()
+
+    def _run_reload(self, collection):
+        try:
+            self.load(collection)
+        except Exception:
+            logger.exception("Autocomplete reload failed")
+        finally:
+            with self._lock:
+                self._reloading = False
+
+    def record(self, apply, *args):
+        # Applied now so searches see it, and again after a load in progress swaps its lists in
+        with self._lock:
+            apply(*args)
+            if self._pending is not None:
+                self._pending.append((apply, args))
+
+    def upsert(self, _id, name):
+        with self._lock:
+            self.delete(_id)
+            key = normalize(name)
+            if not key:
+                return
+            _id = str(_id)
+            self.labels[_id] = name
+            insort(self.names, (key, _id))
+            for word in self._word_keys(key):
+                insort(self.words, (word, _id))
+
+    def delete(self, _id):
+        _id = str(_id)
+        with self._lock:
+            name = self.labels.pop(_id, None)
+            if name is None:
+                return
+            key = normalize(name)
+            for entries, entry_key in [(self.names, key)] + [(self.words, word) for word in self._word_keys(key)]:
+                position = bisect_left(entries, (entry_key, _id))
+                if position < len(entries) and entries[position] == (entry_key, _id):
+                    del entries[position]
+
+    def search(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """Up to `limit` {id, name} whose name, or a later word of it, starts with the prefix."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        results = []
+        seen = set()
+        with self._lock:
+            for entries in (self.names, self.words):
+                position = bisect_left(entries, (prefix, ""))
+                while len(results) < limit and position < len(entries):
+                    key, _id = entries[position]
+                    if not key.startswith(prefix):
+                        break
+                    if _id not in seen:
+                        seen.add(_id)
+                        results.append({"id": _id, "name": self.labels[_id]})
+                    position += 1
+        return results
+
+    def __len__(self):
+        return len(self.labels)
+
+
+def get_index(kind: str) -> PrefixIndex:
+    """
+    Return the process-wide index for "company" or "property".
+
+    The first call loads it; once it's older than refresh_seconds a background
+    reload starts and the current index keeps being served until it finishes.
+    """
+    index = _indexes.get(kind)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(kind)
+            if index is None:
+                index = PrefixIndex()
+                _loading[kind] = index
+                try:
+                    index.load(db.get_collection(SOURCES[kind]))
+                    _indexes[kind] = index
+                finally:
+                    _loading.pop(kind, None)
+    elif time.time() - index.loaded_at > _settings["refresh_seconds"]:
+        index.reload_in_background(db.get_collection(SOURCES[kind]))
+    return index
+
+
+def _loaded(kind: str) -> Optional[PrefixIndex]:
+    # _loading first: a first load publishes to _indexes before leaving _loading
+    index = _loading.get(kind)
+    return index if index is not None else _indexes.get(kind)
+
+
+def reset():
+    """Forget the loaded indexes; the next get_index() reloads them."""
+    with _indexes_lock:
+        _indexes.clear()
+
+
+def record_upsert(kind: str, _id, name: Optional[str]):
+    """Apply a created or renamed company/property (no-op when its index isn't loaded)."""
+    index = _loaded(kind)
+    if index is not None:
+        index.record(index.upsert, _id, name)
+
+
+def record_delete(kind: str, _id):
+    """Apply a deleted company/property (no-op when its index isn't loaded)."""
+    index = _loaded(kind)
+    if index is not None:
+        index.record(index.delete, _id)
+
+
+def init_app(app):
+    _settings["refresh_seconds"] = app.config["AUTOCOMPLETE_REFRESH_SECONDS"]
@@ -0,0 +1,54 @@
+"""
+Measure application cold start: importing the app module and building the
+Flask app in a fresh interpreter, the way a new worker or test session does.
+
+Usage:
+    python -m benchmarks.cold_start [--runs 10]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import os
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the child interpreter; prints import and create_app timings in ms
+_CHILD = """
+import time, json
+t0 = time.perf_counter()
+from app import create_app
+t1 = time.perf_counter()
+app = create_app("testing")
+t2 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "create_app_ms": (t2 - t1) * 1000}))
+"""
+
+
+def measure(runs: int = 10) -> dict:
+    """Spawn `runs` fresh interpreters and summarize the cold start timings."""
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _CHILD],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        )
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    summary = {"runs": runs}
+    for key in ("import_ms", "create_app_ms"):
+        values = [s[key] for s in samples]
+        summary[key] = {
+            "median": round(statistics.median(values), 2),
+            "min": round(min(values), 2),
+            "max": round(max(values), 2),
+        }
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    print(json.dumps(measure(args.runs), indent=2))
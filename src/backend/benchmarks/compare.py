@@ -0,0 +1,61 @@
+"""
+Compare two benchmark result files (from benchmarks.run).
+
+Usage:
+    python -m benchmarks.compare baseline.json candidate.json [--threshold 10]
+
+Prints per-scenario throughput and latency changes and exits non-zero when any
+p95 latency regressed by more than --threshold percent.
+"""
+import argparse
+import json
+import sys
+
+METRICS = ("throughput_ops", "p50_ms", "p95_ms", "p99_ms")
+
+
+def _change(old, new):
+    if not old:
+        return None
+    return (new - old) / old * 100
+
+
+def compare(baseline: dict, candidate: dict) -> list:
+    """Rows of (scenario, metric, baseline, candidate, percent change) for scenarios in both files."""
+    rows = []
+    for name, new in candidate["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        for metric in METRICS:
+            rows.append((name, metric, old[metric], new[metric], _change(old[metric], new[metric])))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed p95 regression in percent")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    regressions = []
+    for name, metric, old, new, change in compare(baseline, candidate):
+        change_text = "n/a" if change is None else f"{change:+.1f}%"
+        print(f"{name:<70} {metric:<15} {old:>12} -> {new:>12}  {change_text}")
+        if metric == "p95_ms" and change is not None and change > args.threshold:
+            regressions.append(name)
+
+    if regressions:
+        print(f"\np95 regressions over {args.threshold}%: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
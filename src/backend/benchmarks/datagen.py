@@ -0,0 +1,287 @@
+"""
+Synthetic oil & gas dataset generator.
+
+Builds properties, companies, overlapping ownership intervals, transactions,
+monthly entries grouping those transactions and daily production volumes that
+follow a noisy Arps decline per property. Field values are deterministic for
+a given seed and scale (only ObjectIds differ), so runs against different
+releases see the same data.
+
+Usage:
+    python -m benchmarks.datagen --scale small [--mongo-uri ...] [--db-name oil_app_bench]
+
+With --backend memory the data only lives in this process, which is useful for
+checking the generator itself; benchmarks.run seeds in-process instead.
+"""
+import argparse
+import math
+import random
+from datetime import datetime, timedelta
+from bson import ObjectId
+import entry_totals
+import geo
+import indexes
+
+SCALES = {
+    "small": {"properties": 100, "companies": 50, "transactions": 10_000, "months": 24},
+    "medium": {"properties": 1_000, "companies": 500, "transactions": 250_000, "months": 60},
+    "large": {"properties": 5_000, "companies": 2_000, "transactions": 2_000_000, "months": 120},
+}
+
+STATES = {
+    "TX": ["Midland", "Ector", "Reeves", "Loving", "Karnes"],
+    "ND": ["McKenzie", "Williams", "Mountrail", "Dunn"],
+    "NM": ["Lea", "Eddy", "San Juan"],
+    "OK": ["Kingfisher", "Canadian", "Grady"],
+    "CO": ["Weld", "Garfield"],
+}
+# Approximate county centroids (lng, lat); property locations are scattered around them
+COUNTY_CENTERS = {
+    "Midland": (-102.03, 31.87), "Ector": (-102.54, 31.87), "Reeves": (-103.69, 31.32),
+    "Loving": (-103.58, 31.85), "Karnes": (-97.86, 28.91), "McKenzie": (-103.40, 47.74),
+    "Williams": (-103.48, 48.34), "Mountrail": (-102.36, 48.20), "Dunn": (-102.62, 47.36),
+    "Lea": (-103.41, 32.79), "Eddy": (-104.30, 32.47), "San Juan": (-108.32, 36.51),
+    "Kingfisher": (-97.94, 35.95), "Canadian": (-97.98, 35.54), "Grady": (-97.89, 35.02),
+    "Weld": (-104.39, 40.55), "Garfield": (-107.90, 39.60),
+}
+MERCHANDISE_TYPES = ["crude_oil", "natural_gas", "ngl", "condensate"]
+SERVICES = ["oil_sale", "gas_sale", "royalty_payment", "lease_operating_expense", "workover", "transport"]
+INTEREST_TYPES = ["royalty", "working", "overriding_royalty"]
+WELL_TYPES = ["vertical", "horizontal", "directional"]
+BATCH_SIZE = 5_000
+
+
+def _month_start(start: datetime, offset: int) -> datetime:
+    year = start.year + (start.month - 1 + offset) // 12
+    month = (start.month - 1 + offset) % 12 + 1
+    return datetime(year, month, 1)
+
+
+def generate_properties(rng, count):
+    properties = []
+    for i in range(count):
+        state = rng.choice(list(STATES))
+        address = {
+            "street": f"{rng.randint(1, 9999)} County Road {rng.randint(1, 400)}",
+            "city": rng.choice(STATES[state]),
+            "state": state,
+            "zip_code": f"{rng.randint(10000, 99999)}",
+        }
+        address["county"] = address["city"]
+        # Separate stream so adding locations didn't change the other fields
+        scatter = random.Random(i)
+        lng, lat = COUNTY_CENTERS[address["county"]]
+        properties.append({
+            "_id": ObjectId(),
+            "name": f"{rng.choice(['Eagle', 'Permian', 'Bakken', 'Wolfcamp', 'Spraberry', 'Niobrara'])} "
+                    f"{rng.choice(['Unit', 'Lease', 'Ranch', 'Field'])} {i + 1}",
+            "address": address,
+            "location": {"type": "Point", "coordinates": [round(lng + scatter.uniform(-0.3, 0.3), 5),
+                                                          round(lat + scatter.uniform(-0.3, 0.3), 5)]},
+            "area": geo.area_for(address),
+            "created_at": datetime(2015, 1, 1),
+        })
+    return properties
+
+
+def generate_companies(rng, count):
+    suffixes = ["Energy", "Operating", "Resources", "Petroleum", "Minerals", "Royalty Trust", "Midstream"]
+    return [{
+        "_id": ObjectId(),
+        "name": f"{rng.choice(['Red', 'Lone Star', 'High Plains', 'Caprock', 'Pecos', 'Basin', 'Mesa'])} "
+                f"{rng.choice(suffixes)} {i + 1}",
+        "description": "Synthetic benchmark company",
+        "created_at": datetime(2015, 1, 1),
+    } for i in range(count)]
+
+
+def generate_ownerships(rng, properties, companies, start, months):
+    """Each property gets 2-6 owners per period; some periods end and hand over to new owners."""
+    ownerships = []
+    end = _month_start(start, months)
+    for prop in properties:
+        period_start = start
+        while period_start < end:
+            period_end = min(end, period_start + timedelta(days=rng.randint(180, 1500)))
+            is_current = period_end >= end
+            owners = rng.sample(companies, rng.randint(2, 6))
+            cuts = sorted(rng.uniform(0, 100) for _ in range(len(owners) - 1))
+            shares = [b - a for a, b in zip([0.0] + cuts, cuts + [100.0])]
+            for company, share in zip(owners, shares):
+                ownerships.append({
+                    "company_id": str(company["_id"]),
+                    "property_id": str(prop["_id"]),
+                    "interest_type": rng.choice(INTEREST_TYPES),
+                    "percentage": round(share, 4),
+                    "is_current_owner": is_current,
+                    "date_from": period_start,
+                    "date_to": None if is_current else period_end,
+                    "well_type": rng.choice(WELL_TYPES),
+                    "created_at": period_start,
+                })
+            period_start = period_end
+    return ownerships
+
+
+def generate_transactions(rng, properties, companies, start, months, count):
+    """Yields batches of transactions spread across the months."""
+    batch = []
+    for _ in range(count):
+        merchandise_type = rng.choice(MERCHANDISE_TYPES)
+        barrels = round(rng.lognormvariate(5, 1), 2) if merchandise_type in ("crude_oil", "condensate") else 0.0
+        month = _month_start(start, rng.randrange(months))
+        batch.append({
+            "_id": ObjectId(),
+            "property_id": str(rng.choice(properties)["_id"]),
+            "company_id": str(rng.choice(companies)["_id"]),
+            "transaction_date": month + timedelta(days=rng.randrange(28), hours=rng.randrange(24)),
+            "amount": round(rng.uniform(-25_000, 150_000), 2),
+            "merchandise_type": merchandise_type,
+            "barrels_of_oil": barrels,
+            "service": rng.choice(SERVICES),
+            "created_at": month,
+        })
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate_production(rng, properties, start, months):
+    """Yields batches of monthly production buckets (see api_clients.production_api)."""
+    batch = []
+    for prop in properties:
+        first_month = rng.randrange(max(1, months // 3))
+        qi = rng.lognormvariate(5, 0.6)
+        di = rng.uniform(0.03, 0.15)
+        b = rng.choice([0.0, rng.uniform(0.3, 1.2), 1.0])
+        gor = rng.uniform(0.5, 3.0)
+        for offset in range(first_month, months):
+            month = _month_start(start, offset)
+            t = offset - first_month
+            rate = qi * math.exp(-di * t) if b == 0 else qi / (1 + b * di * t) ** (1 / b)
+            days_in_month = (_month_start(start, offset + 1) - month).days
+            days = {}
+            for day in range(1, days_in_month + 1):
+                if rng.random() < 0.03:
+                    continue
+                oil = round(rate * rng.uniform(0.9, 1.1), 2)
+                days[f"{day:02d}"] = {"oil": oil, "gas": round(oil * gor, 2),
+                                      "water": round(oil * (0.2 + 0.02 * t), 2)}
+            batch.append({"property_id": str(prop["_id"]), "month": month, "days": days, "updated_at": month})
+            if len(batch) >= BATCH_SIZE // 10:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def generate(database, scale: str = "small", seed: int = 42, overrides: dict = None, drop: bool = True) -> dict:
+    """
+    Fill `database` with a synthetic dataset.
+
+    Args:
+        database: A pymongo Database (or anything with the same collection interface)
+        scale (str): One of SCALES
+        seed (int): Random seed; the same seed and scale give the same data
+        overrides (dict, optional): Per-count overrides, e.g. {"transactions": 50000}
+        drop (bool): Drop the collections first
+
+    Returns:
+        dict: Number of documents written per collection
+    """
+    sizes = dict(SCALES[scale], **(overrides or {}))
+    rng = random.Random(seed)
+    start = datetime(2015, 1, 1)
+    collections = ["properties", "companies", "company_ownership", "transactions", "entries", "entry_memberships",
+                   "production"]
+    if drop:
+        for name in collections:
+            database[name].drop()
+
+    properties = generate_properties(rng, sizes["properties"])
+    companies = generate_companies(rng, sizes["companies"])
+    database["properties"].insert_many(properties)
+    database["companies"].insert_many(companies)
+
+    ownerships = generate_ownerships(rng, properties, companies, start, sizes["months"])
+    for i in range(0, len(ownerships), BATCH_SIZE):
+        database["company_ownership"].insert_many(ownerships[i:i + BATCH_SIZE])
+
+    # Group transactions into one monthly entry per calendar month
+    monthly_ids = {}
+    monthly_totals = {}
+    written = 0
+    for batch in generate_transactions(rng, properties, companies, start, sizes["months"], sizes["transactions"]):
+        database["transactions"].insert_many(batch, ordered=False)
+        written += len(batch)
+        for doc in batch:
+            key = (doc["transaction_date"].year, doc["transaction_date"].month)
+            monthly_ids.setdefault(key, []).append(doc["_id"])
+            entry_totals.accumulate(monthly_totals.setdefault(key, entry_totals.empty()), doc)
+
+    months = sorted(monthly_ids.items())
+    entries = [{
+        "_id": ObjectId(),
+        "title": f"{year}-{month:02d} revenue & expenses",
+        "description": "Synthetic monthly entry",
+        "transaction_count": len(ids),
+        "totals": monthly_totals[(year, month)],
+        "entry_date": datetime(year, month, 1),
+        "entry_type": "monthly",
+        "status": rng.choice(["draft", "submitted", "approved"]),
+        "created_at": datetime(year, month, 1),
+    } for (year, month), ids in months]
+    if entries:
+        database["entries"].insert_many(entries)
+    memberships = [{"entry_id": entry["_id"], "transaction_id": transaction_id, "added_at": entry["created_at"]}
+                   for entry, (_, ids) in zip(entries, months) for transaction_id in ids]
+    for i in range(0, len(memberships), BATCH_SIZE):
+        database["entry_memberships"].insert_many(memberships[i:i + BATCH_SIZE], ordered=False)
+
+    buckets = 0
+    for batch in generate_production(rng, properties, start, sizes["months"]):
+        database["production"].insert_many(batch, ordered=False)
+        buckets += len(batch)
+    indexes.ensure_indexes(database)
+
+    return {
+        "properties": len(properties),
+        "companies": len(companies),
+        "company_ownership": len(ownerships),
+        "transactions": written,
+        "entries": len(entries),
+        "entry_memberships": len(memberships),
+        "production": buckets,
+    }
+
+
+def add_arguments(parser):
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--properties", type=int)
+    parser.add_argument("--companies", type=int)
+    parser.add_argument("--transactions", type=int)
+    parser.add_argument("--months", type=int)
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db-name", default="oil_app_bench")
+    parser.add_argument("--backend", choices=["mongo", "memory"], default="mongo",
+                        help="Storage backend; memory needs no database server")
+
+
+def overrides_from_args(args) -> dict:
+    return {key: getattr(args, key) for key in ("properties", "companies", "transactions", "months")
+            if getattr(args, key) is not None}
+
+
+if __name__ == "__main__":
+    import json
+    import db
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    db.configure(uri=args.mongo_uri, db_name=args.db_name, backend=args.backend)
+    counts = generate(db.get_db(), args.scale, args.seed, overrides_from_args(args))
+    print(json.dumps(counts, indent=2))
@@ -0,0 +1,85 @@
+"""
+Concurrent load generator.
+
+A scenario is a name plus a callable that performs one operation (an HTTP
+request, a Flask test-client call or an *API method). run_scenarios() runs each
+scenario from `concurrency` threads for a fixed duration or number of
+operations and reports throughput and latency percentiles.
+"""
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values), math.ceil(pct / 100 * len(sorted_values))) - 1)
+    return sorted_values[rank]
+
+
+def summarize(latencies, errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        "count": count,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_ops": round(count / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / count * 1000, 3) if count else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if count else 0.0,
+    }
+
+
+def run_scenario(operation, concurrency: int = 8, duration: float = 10.0, max_ops: int = None,
+                 warmup_ops: int = 10) -> dict:
+    """
+    Call `operation` from `concurrency` threads until `duration` seconds pass
+    (or `max_ops` operations complete). An operation fails if it raises.
+    """
+    for _ in range(warmup_ops):
+        try:
+            operation()
+        except Exception:
+            pass
+
+    lock = threading.Lock()
+    latencies = []
+    errors = [0]
+    remaining = [max_ops]
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        local_latencies = []
+        local_errors = 0
+        while time.perf_counter() < deadline:
+            if max_ops is not None:
+                with lock:
+                    if remaining[0] <= 0:
+                        break
+                    remaining[0] -= 1
+            start = time.perf_counter()
+            try:
+                operation()
+                local_latencies.append(time.perf_counter() - start)
+            except Exception:
+                local_errors += 1
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    return summarize(latencies, errors[0], time.perf_counter() - started)
+
+
+def run_scenarios(scenarios: dict, **options) -> dict:
+    """Run each named scenario in turn; returns {name: summary}."""
+    return {name: run_scenario(operation, **options) for name, operation in scenarios.items()}
@@ -0,0 +1,206 @@
+"""
+Benchmark runner.
+
+Optionally seeds a synthetic dataset, then drives the API endpoints (through
+HTTP or an in-process Flask test client) and/or the *API methods directly with
+a concurrent load generator. Results are written as JSON so two releases can
+be compared with benchmarks.compare.
+
+Usage:
+    python -m benchmarks.run --scale small --seed-data --target app --target api \\
+        --concurrency 16 --duration 10 --output results.json
+    python -m benchmarks.run --target http --base-url http://localhost:5001
+    python -m benchmarks.run --backend memory --seed-data --target app --target api
+
+The memory backend keeps the dataset in this process, so it always needs
+--seed-data and cannot be combined with --target http.
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import urllib.request
+from datetime import datetime
+import db
+from benchmarks import datagen
+from benchmarks.load import run_scenarios
+
+SAMPLE_SIZE = 1000
+
+
+def sample_ids(database) -> dict:
+    """A pool of existing IDs per collection to parameterize requests."""
+    pools = {}
+    for name in ("properties", "companies", "transactions", "entries", "company_ownership"):
+        pools[name] = [str(doc["_id"]) for doc in database[name].find({}, {"_id": 1}).limit(SAMPLE_SIZE)]
+    return pools
+
+
+def endpoint_requests(ids: dict, include_full_scans: bool = False) -> dict:
+    """Named (method, path-factory, body-factory) triples for the HTTP/app targets."""
+    pick = random.choice
+    requests = {
+        "GET /api/properties/<id>": ("GET", lambda: f"/api/properties/{pick(ids['properties'])}", None),
+        "GET /api/companies/<id>": ("GET", lambda: f"/api/companies/{pick(ids['companies'])}", None),
+        "GET /api/transactions/<id>": ("GET", lambda: f"/api/transactions/{pick(ids['transactions'])}", None),
+        "GET /api/company-ownership/<id>": (
+            "GET", lambda: f"/api/company-ownership/{pick(ids['company_ownership'])}", None),
+        "GET /api/entries/<id>": ("GET", lambda: f"/api/entries/{pick(ids['entries'])}", None),
+        "GET /api/entries/<id>?include_transactions=true": (
+            "GET", lambda: f"/api/entries/{pick(ids['entries'])}?include_transactions=true", None),
+        "GET /api/entries?status=approved": ("GET", lambda: "/api/entries?status=approved", None),
+        "GET /api/dashboard": ("GET", lambda: "/api/dashboard", None),
+        "GET /api/companies": ("GET", lambda: "/api/companies", None),
+        "POST /api/transactions": ("POST", lambda: "/api/transactions", lambda: {
+            "property_id": pick(ids["properties"]),
+            "company_id": pick(ids["companies"]),
+            "transaction_date": datetime.now().isoformat(),
+            "amount": round(random.uniform(100, 10000), 2),
+            "merchandise_type": "crude_oil",
+            "barrels_of_oil": round(random.uniform(1, 500), 2),
+        }),
+    }
+    if include_full_scans:
+        requests["GET /api/transactions"] = ("GET", lambda: "/api/transactions", None)
+        requests["GET /api/company-ownership"] = ("GET", lambda: "/api/company-ownership", None)
+    return requests
+
+
+def app_scenarios(app, requests: dict) -> dict:
+    """Scenarios that call the Flask app in-process through the test client."""
+    client = app.test_client()
+
+    def make(method, path, body):
+        def operation():
+            response = client.open(path(), method=method, json=body() if body else None)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{response.status_code}")
+        return operation
+
+    return {name: make(*spec) for name, spec in requests.items()}
+
+
+def http_scenarios(base_url: str, requests: dict) -> dict:
+    """Scenarios that call a running server over HTTP."""
+    def make(method, path, body):
+        def operation():
+            data = json.dumps(body()).encode() if body else None
+            req = urllib.request.Request(base_url.rstrip("/") + path(), data=data, method=method,
+                                         headers={"Content-Type": "application/json"})
+            with urllib.request.urlopen(req, timeout=30) as response:
+                response.read()
+        return operation
+
+    return {name: make(*spec) for name, spec in requests.items()}
+
+
+def api_scenarios(ids: dict) -> dict:
+    """Scenarios that call the *API classes directly, bypassing HTTP."""
+    from api_clients.properties_api import PropertiesAPI
+    from api_clients.transactions_api import TransactionsAPI
+    from api_clients.company_ownership_api import CompanyOwnershipAPI
+    from api_clients.entries_api import EntriesAPI
+
+    pick = random.choice
+
+    def date_range():
+        start = datetime(2015 + random.randrange(2), random.randrange(1, 13), 1)
+        return start, start.replace(day=28)
+
+    return {
+        "PropertiesAPI.get_property": lambda: PropertiesAPI.get_property(pick(ids["properties"])),
+        "PropertiesAPI.get_properties_by_state": lambda: PropertiesAPI.get_properties_by_state(
+            pick(list(datagen.STATES))),
+        "TransactionsAPI.get_transactions_by_property": lambda: TransactionsAPI.get_transactions_by_property(
+            pick(ids["properties"])),
+        "TransactionsAPI.get_transactions_by_date_range": lambda: TransactionsAPI.get_transactions_by_date_range(
+            *date_range()),
+        "TransactionsAPI.get_total_transactions_by_property":
+            lambda: TransactionsAPI.get_total_transactions_by_property(pick(ids["properties"])),
+        "CompanyOwnershipAPI.get_ownerships_by_property": lambda: CompanyOwnershipAPI.get_ownerships_by_property(
+            pick(ids["properties"])),
+        "CompanyOwnershipAPI.get_ownerships_by_date_range": lambda: CompanyOwnershipAPI.get_ownerships_by_date_range(
+            *date_range()),
+        "EntriesAPI.get_entry_with_transactions": lambda: EntriesAPI.get_entry_with_transactions(
+            pick(ids["entries"])),
+    }
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    datagen.add_arguments(parser)
+    parser.add_argument("--seed-data", action="store_true", help="Generate the dataset before running")
+    parser.add_argument("--target", action="append", choices=["app", "http", "api"],
+                        help="What to drive (repeatable); defaults to app")
+    parser.add_argument("--base-url", default="http://localhost:5001", help="Server for --target http")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per scenario")
+    parser.add_argument("--max-ops", type=int, help="Stop each scenario after this many operations")
+    parser.add_argument("--include-full-scans", action="store_true",
+                        help="Also benchmark full-collection GETs (slow at large scales)")
+    parser.add_argument("--only", action="append", help="Only run scenarios whose name contains this text")
+    parser.add_argument("--output", help="Write results JSON here instead of stdout")
+    args = parser.parse_args(argv)
+    targets = args.target or ["app"]
+    if args.backend == "memory" and ("http" in targets or not args.seed_data):
+        parser.error("--backend memory requires --seed-data and cannot drive --target http")
+
+    db.configure(uri=args.mongo_uri, db_name=args.db_name, backend=args.backend)
+    database = db.get_db()
+
+    dataset = None
+    if args.seed_data:
+        dataset = datagen.generate(database, args.scale, args.seed, datagen.overrides_from_args(args))
+        print(f"Seeded dataset: {dataset}", file=sys.stderr)
+    ids = sample_ids(database)
+
+    scenarios = {}
+    requests = endpoint_requests(ids, args.include_full_scans)
+    if "app" in targets:
+        from app import create_app
+        app = create_app({"MONGO_URI": args.mongo_uri, "MONGO_DB_NAME": args.db_name,
+                          "STORAGE_BACKEND": args.backend})
+        scenarios.update({f"app {name}": op for name, op in app_scenarios(app, requests).items()})
+    if "http" in targets:
+        scenarios.update({f"http {name}": op for name, op in http_scenarios(args.base_url, requests).items()})
+    if "api" in targets:
+        scenarios.update({f"api {name}": op for name, op in api_scenarios(ids).items()})
+    if args.only:
+        scenarios = {name: op for name, op in scenarios.items() if any(text in name for text in args.only)}
+
+    results = run_scenarios(scenarios, concurrency=args.concurrency, duration=args.duration, max_ops=args.max_ops)
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "backend": args.backend,
+            "scale": args.scale,
+            "seed": args.seed,
+            "dataset": dataset,
+            "targets": targets,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Date fields stored as BSON dates.
+
+Clients send dates as ISO strings ("2024-03-01", "2024-03-01T12:00:00Z") and
+older writes stored them as they came. MongoDB only compares values of the same
+BSON type, so {"transaction_date": {"$gte": <datetime>}} silently skips every
+document holding a string, and a date index can't serve the range for them.
+Every *API write path runs normalize() over the collection's DATE_FIELDS, and
+
+    python -m migrations normalize_dates
+
+rewrites the documents stored before.
+
+Timezone-aware values are converted to UTC and stored naive, as pymongo does
+when it encodes them; date-only values become midnight.
+"""
+from datetime import date, datetime, time, timezone
+from typing import Dict
+
+# collection -> fields holding dates
+DATE_FIELDS = {
+    "transactions": ("transaction_date", "created_at"),
+    "company_ownership": ("date_from", "date_to", "created_at"),
+    "entries": ("entry_date", "created_at"),
+    "properties": ("created_at",),
+    "companies": ("created_at",),
+    "accounts": ("created_at",),
+}
+
+
+def to_datetime(value, field: str = "date"):
+    """
+    Coerce a datetime, date or ISO string to a naive UTC datetime; None stays None.
+
+    Raises:
+        ValueError: If the value isn't a date or an ISO date string
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time())
+    if isinstance(value, str):
+        try:
+            return to_datetime(datetime.fromisoformat(value.strip()), field)
+        except ValueError:
+            raise ValueError(f"Invalid {field} format. Use ISO format (YYYY-MM-DD)")
+    raise ValueError(f"{field} must be a date or an ISO date string")
+
+
+def normalize(collection: str, data: Dict) -> Dict:
+    """
+    Coerce the collection's date fields present in data to datetimes, in place.
+
+    Args:
+        collection (str): Collection name, a key of DATE_FIELDS
+        data (Dict): A document or the fields of an update
+
+    Returns:
+        Dict: data
+
+    Raises:
+        ValueError: If a date field holds something that isn't a date
+    """
+    for field in DATE_FIELDS.get(collection, ()):
+        if field in data:
+            data[field] = to_datetime(data[field], field)
+    return data
@@ -0,0 +1,157 @@
+import threading
+from pymongo import MongoClient, AsyncMongoClient
+from config import Config
+from storage import BACKENDS, AsyncMemoryCollection, MemoryClient
+
+# Connection settings; create_app() overrides them through configure()
+_settings = {
+    "uri": Config.MONGO_URI,
+    "db_name": Config.MONGO_DB_NAME,
+    "async_max_pool_size": Config.MONGO_ASYNC_MAX_POOL_SIZE,
+    "event_listeners": [],
+    "backend": Config.STORAGE_BACKEND,
+}
+_client = None
+# In-memory databases outlive configure() so seeded data survives create_app();
+# they share the listener list, so add_event_listener() reaches them too
+_memory_client = MemoryClient(_settings["event_listeners"])
+_async_client = None
+_lock = threading.Lock()
+
+
+def configure(uri: str = None, db_name: str = None, async_max_pool_size: int = None, backend: str = None):
+    """
+    Set the connection settings used by get_db(). No connection is opened here.
+
+    Args:
+        uri (str, optional): MongoDB connection string
+        db_name (str, optional): Name of the database to use
+        async_max_pool_size (int, optional): Connection pool size for the async client
+        backend (str, optional): Storage backend, "mongo" or "memory"
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    global _client, _async_client
+    if backend is not None and backend not in BACKENDS:
+        raise ValueError(f"Unknown storage backend '{backend}'. Must be one of: {', '.join(BACKENDS)}")
+    with _lock:
+        if backend is not None:
+            _settings["backend"] = backend
+        if uri is not None:
+            _settings["uri"] = uri
+        if db_name is not None:
+            _settings["db_name"] = db_name
+        if async_max_pool_size is not None:
+            _settings["async_max_pool_size"] = async_max_pool_size
+        # Drop any existing clients so the next access uses the new settings
+        if _client is not None:
+            _client.close()
+            _client = None
+        # The async client is bound to the aio loop; just let it be recreated
+        _async_client = None
+
+
+def add_event_listener(listener):
+    """
+    Register a pymongo event listener (command, pool, ...) for the clients.
+
+    Listeners only attach when a client is created, so any existing clients are
+    dropped and rebuilt on next use. Adding the same listener twice is a no-op.
+    """
+    global _client, _async_client
+    with _lock:
+        if any(existing is listener for existing in _settings["event_listeners"]):
+            return
+        _settings["event_listeners"].append(listener)
+        if _client is not None:
+            _client.close()
+            _client = None
+        _async_client = None
+
+
+def get_client() -> MongoClient:
+    """Return the process-wide MongoClient, creating it on first use."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = MongoClient(_settings["uri"], event_listeners=list(_settings["event_listeners"]))
+    return _client
+
+
+def get_backend() -> str:
+    """Name of the active storage backend."""
+    return _settings["backend"]
+
+
+def get_db():
+    """Return the configured database, connecting on first use."""
+    if _settings["backend"] == "memory":
+        return _memory_client[_settings["db_name"]]
+    return get_client()[_settings["db_name"]]
+
+
+def reset_memory():
+    """Drop every in-memory database (no-op for the mongo backend)."""
+    global _memory_client
+    with _lock:
+        _memory_client = MemoryClient(_settings["event_listeners"])
+
+
+def get_collection(name: str):
+    """Return a collection from the configured database."""
+    return get_db()[name]
+
+
+def get_async_client() -> AsyncMongoClient:
+    """
+    Return the process-wide AsyncMongoClient, creating it on first use.
+
+    Only use it from coroutines running on the aio loop (see aio.run).
+    """
+    global _async_client
+    if _async_client is None:
+        with _lock:
+            if _async_client is None:
+                _async_client = AsyncMongoClient(
+                    _settings["uri"],
+                    maxPoolSize=_settings["async_max_pool_size"],
+                    event_listeners=list(_settings["event_listeners"]),
+                )
+    return _async_client
+
+
+def get_async_collection(name: str):
+    """Return an async collection from the configured database."""
+    if _settings["backend"] == "memory":
+        return AsyncMemoryCollection(get_collection(name))
+    return get_async_client()[_settings["db_name"]][name]
+
+
+class LazyCollection:
+    """
+    Module-level stand-in for a collection.
+
+    The api_clients keep their `xxx_collection` globals, but nothing is resolved
+    (no DNS lookup, no connection) until the first attribute access.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def _resolve(self):
+        return get_collection(self.name)
+
+    def __getattr__(self, attr):
+        return getattr(self._resolve(), attr)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r})"
+
+
+class AsyncLazyCollection(LazyCollection):
+    """Same as LazyCollection, but resolves to the async client's collection."""
+
+    def _resolve(self):
+        return get_async_collection(self.name)
@@ -0,0 +1,221 @@
+"""
+Vectorized Arps decline-curve fitting.
+
+Each well's history of average daily rate per month is a row of a
+(wells x months) matrix, NaN where nothing was reported. Fitting starts at each well's peak month (t = 0)
+and is done for all rows at once:
+
+    exponential  q = qi * exp(-Di * t)              ln q is linear in t
+    hyperbolic   q = qi / (1 + b * Di * t) ** (1/b) q ** -b is linear in t for a fixed b,
+                                                    so every b on B_GRID is a
+                                                    closed-form weighted fit
+    harmonic     b = 1
+
+The candidate with the lowest squared error in log space wins. fit_matrix()
+fits one chunk; fit_histories() splits many wells into chunks and spreads them
+over a process pool.
+
+Nightly refit of stale or missing forecasts:
+
+    python -m decline fit [--all] [--workers N]
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+
+B_GRID = np.append(np.round(np.arange(0.1, 1.0, 0.1), 2), 1.0)
+MIN_POINTS = 3
+MODELS = ("exponential", "hyperbolic", "harmonic")
+
+
+def _weighted_line(t, y, w):
+    """Per-row weighted least squares y = intercept + slope * t over the last axis."""
+    sw = w.sum(-1)
+    st = (w * t).sum(-1)
+    sy = (w * y).sum(-1)
+    stt = (w * t * t).sum(-1)
+    sty = (w * t * y).sum(-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (sw * sty - st * sy) / (sw * stt - st * st)
+        intercept = (sy - slope * st) / sw
+    return slope, intercept
+
+
+def fit_matrix(rates: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Fit every row of `rates` (wells x months, NaN for missing).
+
+    Returns:
+        Dict[str, np.ndarray]: Per-row arrays: model (index into MODELS, -1 when
+            there are too few points or no decline), qi, di (per month), b,
+            peak (column of t = 0), points and rmse (of ln q)
+    """
+    rates = np.asarray(rates, dtype=np.float64)
+    wells, months = rates.shape
+    valid = np.isfinite(rates) & (rates > 0)
+    peak = np.argmax(np.where(valid, rates, -np.inf), axis=1)
+    t = np.arange(months)[None, :] - peak[:, None]
+    weight = (valid & (t >= 0)).astype(np.float64)
+    t = np.maximum(t, 0).astype(np.float64)
+    points = weight.sum(1)
+    log_q = np.log(np.where(weight > 0, rates, 1.0))
+
+    # Exponential: ln q = ln qi - Di t
+    slope, intercept = _weighted_line(t, log_q, weight)
+    exp_di = -slope
+    exp_qi = np.exp(intercept)
+    exp_sse = (weight * (log_q - (intercept[:, None] + slope[:, None] * t)) ** 2).sum(1)
+    exp_sse = np.where(np.isfinite(exp_di) & (exp_di > 0), exp_sse, np.inf)
+
+    # Hyperbolic and harmonic: q^-b = qi^-b + b Di qi^-b t, for every b at once
+    b = B_GRID[None, :, None]
+    tb, wb = t[:, None, :], weight[:, None, :]
+    y = np.exp(-b * log_q[:, None, :])
+    slope_b, intercept_b = _weighted_line(tb, y, wb)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hyp_qi = intercept_b ** (-1 / B_GRID[None, :])
+        hyp_di = slope_b / (B_GRID[None, :] * intercept_b)
+        predicted = np.log(hyp_qi[:, :, None]) - np.log1p(b * hyp_di[:, :, None] * tb) / b
+        hyp_sse = np.nansum(wb * (log_q[:, None, :] - predicted) ** 2, axis=-1)
+    ok = (intercept_b > 0) & (hyp_di > 0) & np.isfinite(hyp_sse) & np.isfinite(hyp_qi)
+    hyp_sse = np.where(ok, hyp_sse, np.inf)
+    best_b = np.argmin(hyp_sse, axis=1)
+    rows = np.arange(wells)
+    best_hyp_sse = hyp_sse[rows, best_b]
+
+    use_exp = exp_sse <= best_hyp_sse
+    b_value = np.where(use_exp, 0.0, B_GRID[best_b])
+    model = np.where(use_exp, 0, np.where(b_value >= 1.0, 2, 1))
+    sse = np.where(use_exp, exp_sse, best_hyp_sse)
+    model = np.where((points >= MIN_POINTS) & np.isfinite(sse), model, -1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rmse = np.sqrt(sse / points)
+    return {
+        "model": model,
+        "qi": np.where(use_exp, exp_qi, hyp_qi[rows, best_b]),
+        "di": np.where(use_exp, exp_di, hyp_di[rows, best_b]),
+        "b": b_value,
+        "peak": peak,
+        "points": points.astype(np.int64),
+        "rmse": rmse,
+    }
+
+
+def rate(qi: float, di: float, b: float, t):
+    """Arps rate at months t after the peak."""
+    t = np.asarray(t, dtype=np.float64)
+    if b == 0:
+        return qi * np.exp(-di * t)
+    return qi / (1 + b * di * t) ** (1 / b)
+
+
+def _month_offset(month: datetime, offset: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + offset
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def days_in_month(month: datetime) -> int:
+    return (_month_offset(month, 1) - datetime(month.year, month.month, 1)).days
+
+
+def _months_between(start: datetime, end: datetime) -> int:
+    return (end.year - start.year) * 12 + end.month - start.month
+
+
+def _fit_chunk(chunk: List[tuple]) -> List[Optional[Dict]]:
+    """Fit [(first_month, [rate per month])]; runs in a worker process."""
+    width = max(len(rates) for _, rates in chunk)
+    matrix = np.full((len(chunk), width), np.nan)
+    for row, (_, rates) in enumerate(chunk):
+        matrix[row, :len(rates)] = rates
+    fit = fit_matrix(matrix)
+    results = []
+    for row, (first_month, rates) in enumerate(chunk):
+        model = int(fit["model"][row])
+        if model < 0:
+            results.append(None)
+            continue
+        results.append({
+            "model": MODELS[model],
+            "qi": float(fit["qi"][row]),
+            "di": float(fit["di"][row]),
+            "b": float(fit["b"][row]),
+            "peak_month": _month_offset(first_month, int(fit["peak"][row])),
+            "last_month": _month_offset(first_month, len(rates) - 1),
+            "points": int(fit["points"][row]),
+            "rmse_log": float(fit["rmse"][row]),
+        })
+    return results
+
+
+def to_series(monthly: Dict[datetime, float]) -> tuple:
+    """{month: rate} -> (first month, rates for each consecutive month, NaN for gaps)."""
+    months = sorted(monthly)
+    first = months[0]
+    rates = [np.nan] * (_months_between(first, months[-1]) + 1)
+    for month in months:
+        rates[_months_between(first, month)] = monthly[month]
+    return first, rates
+
+
+def fit_histories(histories: Dict[str, Dict[datetime, float]], workers: int = 1,
+                  chunk_size: int = 2000) -> Dict[str, Optional[Dict]]:
+    """
+    Fit many wells.
+
+    Args:
+        histories (Dict): property_id -> {month: average daily rate}
+        workers (int): Processes to use; 1 fits in this process
+        chunk_size (int): Wells per vectorized batch
+
+    Returns:
+        Dict: property_id -> fit parameters, or None when a well can't be fitted
+    """
+    ids = [property_id for property_id, monthly in histories.items() if monthly]
+    series = [to_series(histories[property_id]) for property_id in ids]
+    chunks = [series[i:i + chunk_size] for i in range(0, len(series), chunk_size)]
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            fitted = [fit for chunk_fits in pool.map(_fit_chunk, chunks) for fit in chunk_fits]
+    else:
+        fitted = [fit for chunk in chunks for fit in _fit_chunk(chunk)]
+    results = dict(zip(ids, fitted))
+    for property_id in histories:
+        results.setdefault(property_id, None)
+    return results
+
+
+def forecast(params: Dict, months: int, start_month: datetime = None) -> List[Dict]:
+    """
+    Monthly forecast from fit parameters: average daily rate and volume per month.
+
+    Args:
+        params (Dict): Output of fit_histories for one well
+        months (int): Number of months to forecast
+        start_month (datetime, optional): First forecast month; defaults to the
+            month after the last history month
+    """
+    start_month = start_month or _month_offset(params["last_month"], 1)
+    offset = _months_between(params["peak_month"], start_month)
+    rates = rate(params["qi"], params["di"], params["b"], np.arange(offset, offset + months))
+    forecast_months = [_month_offset(start_month, i) for i in range(months)]
+    return [{"month": month, "rate": round(float(q), 4), "oil": round(float(q) * days_in_month(month), 4)}
+            for month, q in zip(forecast_months, rates)]
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from config import Config
+    from api_clients.forecast_api import ForecastAPI
+
+    parser = argparse.ArgumentParser(description="Fit decline curves")
+    parser.add_argument("command", choices=["fit"])
+    parser.add_argument("--all", action="store_true", help="Refit every property, not just stale or missing ones")
+    parser.add_argument("--workers", type=int, default=Config.FORECAST_WORKERS)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    summary = ForecastAPI.fit_forecasts(stale_only=not args.all, workers=args.workers)
+    print(f"{summary} in {time.perf_counter() - started:.1f}s")
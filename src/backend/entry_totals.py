@@ -0,0 +1,182 @@
+"""
+Running totals on entries.
+
+Each entry carries the sums of its transactions next to transaction_count, so
+list views can show them without reading a single transaction:
+
+    transaction_count   392
+    totals              {"amount": 1250310.5, "barrels_of_oil": 8210.25,
+                         "by_merchandise_type": {
+                             "crude_oil": {"count": 97, "amount": 611020.0, "barrels_of_oil": 8010.0},
+                             ...}}
+
+EntriesAPI keeps them current with $inc deltas as transactions join or leave
+an entry, and TransactionsAPI applies the difference when a member
+transaction's amount, barrels_of_oil or merchandise_type changes. A delta is
+computed from the transaction as read around the write, so a membership change
+racing an edit of the same transaction can leave a total off; verify() finds
+and repairs such drift (and fills in entries created before totals existed):
+
+    python -m entry_totals verify [--repair]
+"""
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+from bson import ObjectId
+
+# Transaction fields the totals are computed from
+TRACKED_FIELDS = {"amount", "barrels_of_oil", "merchandise_type"}
+SUMMED_FIELDS = ("amount", "barrels_of_oil")
+UNSPECIFIED_TYPE = "unspecified"
+# Floating-point $inc deltas accumulate rounding error; differences below this aren't drift
+TOLERANCE = 0.005
+BATCH_SIZE = 5_000
+
+
+def _number(value) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return number if math.isfinite(number) else 0.0
+
+
+def type_key(merchandise_type) -> str:
+    """The by_merchandise_type key for a merchandise type (dots and a leading $ aren't allowed in field names)."""
+    key = str(merchandise_type or "").strip().replace(".", "_").lstrip("$")
+    return key or UNSPECIFIED_TYPE
+
+
+def empty() -> Dict:
+    return {"amount": 0.0, "barrels_of_oil": 0.0, "by_merchandise_type": {}}
+
+
+def accumulate(totals: Dict, transaction: Dict, sign: int = 1) -> Dict:
+    """Add (or with sign=-1, subtract) a transaction to totals in place."""
+    bucket = totals["by_merchandise_type"].setdefault(
+        type_key(transaction.get("merchandise_type")), {"count": 0, "amount": 0.0, "barrels_of_oil": 0.0}
+    )
+    bucket["count"] += sign
+    for field in SUMMED_FIELDS:
+        value = sign * _number(transaction.get(field))
+        totals[field] += value
+        bucket[field] += value
+    return totals
+
+
+def increments(transactions: Iterable[Dict], sign: int = 1) -> Dict:
+    """
+    The $inc that adds transactions to (or with sign=-1, removes them from) an entry.
+
+    Returns:
+        Dict: Field path -> increment under totals; empty if there are no transactions
+    """
+    inc = {}
+    for transaction in transactions:
+        bucket = f"totals.by_merchandise_type.{type_key(transaction.get('merchandise_type'))}"
+        inc[f"{bucket}.count"] = inc.get(f"{bucket}.count", 0) + sign
+        for field in SUMMED_FIELDS:
+            value = sign * _number(transaction.get(field))
+            inc[f"totals.{field}"] = inc.get(f"totals.{field}", 0.0) + value
+            inc[f"{bucket}.{field}"] = inc.get(f"{bucket}.{field}", 0.0) + value
+    return inc
+
+
+def change(before: Dict, after: Dict) -> Dict:
+    """
+    The $inc that moves an entry's totals from one version of a member transaction to another.
+
+    Returns:
+        Dict: Field path -> non-zero increment; empty if the tracked fields didn't change
+    """
+    if all(before.get(field) == after.get(field) for field in TRACKED_FIELDS):
+        return {}
+    inc = increments([before], -1)
+    for path, value in increments([after]).items():
+        inc[path] = inc.get(path, 0) + value
+    return {path: value for path, value in inc.items() if value}
+
+
+def compute(memberships, transactions, entry_id: ObjectId) -> Tuple[int, Dict]:
+    """
+    Recompute an entry's transaction_count (its memberships) and totals (its transactions that exist).
+
+    Args:
+        memberships: The entry_memberships collection
+        transactions: The transactions collection
+        entry_id (ObjectId): The ID of the entry
+
+    Returns:
+        Tuple[int, Dict]: The transaction count and totals
+    """
+    totals = empty()
+    projection = {field: 1 for field in TRACKED_FIELDS}
+    member_ids = [doc["transaction_id"] for doc in memberships.find({"entry_id": entry_id}, {"transaction_id": 1})]
+    for i in range(0, len(member_ids), BATCH_SIZE):
+        for transaction in transactions.find({"_id": {"$in": member_ids[i:i + BATCH_SIZE]}}, projection):
+            accumulate(totals, transaction)
+    return len(member_ids), totals
+
+
+def _drifted(stored: Optional[Dict], expected: Dict) -> bool:
+    if not stored:
+        return True
+    if any(abs(_number(stored.get(field)) - expected[field]) > TOLERANCE for field in SUMMED_FIELDS):
+        return True
+    # Buckets emptied by removals stay behind with a zero count
+    stored_buckets = {key: bucket for key, bucket in (stored.get("by_merchandise_type") or {}).items()
+                      if bucket.get("count")}
+    expected_buckets = expected["by_merchandise_type"]
+    if stored_buckets.keys() != expected_buckets.keys():
+        return True
+    return any(
+        stored_buckets[key].get("count") != bucket["count"]
+        or any(abs(_number(stored_buckets[key].get(field)) - bucket[field]) > TOLERANCE for field in SUMMED_FIELDS)
+        for key, bucket in expected_buckets.items()
+    )
+
+
+def verify(database, repair: bool = False, entry_ids: Optional[List[ObjectId]] = None) -> Dict:
+    """
+    Compare each entry's stored count and totals with its memberships, optionally rewriting the ones that drifted.
+
+    Args:
+        database: The database holding entries, entry_memberships and transactions
+        repair (bool): Rewrite drifted entries
+        entry_ids (List[ObjectId], optional): Only these entries; all if omitted
+
+    Returns:
+        Dict: {"checked": n, "drifted": [entry IDs], "repaired": n}
+    """
+    entries = database["entries"]
+    query = {"_id": {"$in": entry_ids}} if entry_ids is not None else {}
+    checked = repaired = 0
+    drifted = []
+    for entry in entries.find(query, {"transaction_count": 1, "totals": 1}):
+        checked += 1
+        count, totals = compute(database["entry_memberships"], database["transactions"], entry["_id"])
+        if entry.get("transaction_count") == count and not _drifted(entry.get("totals"), totals):
+            continue
+        drifted.append(str(entry["_id"]))
+        if repair:
+            entries.update_one({"_id": entry["_id"]}, {"$set": {"transaction_count": count, "totals": totals}})
+            repaired += 1
+    return {"checked": checked, "drifted": drifted, "repaired": repaired}
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    """Command-line entry point; prints and returns the verify() report."""
+    import argparse
+    import json
+    import db
+
+    parser = argparse.ArgumentParser(description="Entry totals maintenance")
+    parser.add_argument("command", choices=["verify"])
+    parser.add_argument("--repair", action="store_true", help="Rewrite the totals of drifted entries")
+    args = parser.parse_args(argv)
+    report = verify(db.get_db(), repair=args.repair)
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Server-side expansion of property and company references.
+
+List views used to download every property and company just to turn
+property_id/company_id into names. Endpoints that accept
+?expand=property,company call expand_references() instead, which reads the
+referenced names with one $in query per referenced collection, however many
+documents are being expanded, and adds them next to the ids:
+
+    {"property_id": "...", "property_name": "Eagle Unit 1",
+     "company_id": "...",  "company_name": "Red Energy 4"}
+
+A reference that doesn't resolve gets None as its name.
+"""
+from typing import Dict, List, Optional
+from bson import ObjectId
+from db import LazyCollection
+
+# MongoDB collections (resolved on first use)
+properties_collection = LazyCollection("properties")
+companies_collection = LazyCollection("companies")
+
+# expansion -> (reference field, field added, referenced collection)
+EXPANSIONS = {
+    "property": ("property_id", "property_name", properties_collection),
+    "company": ("company_id", "company_name", companies_collection),
+}
+
+
+def parse_expand(value: Optional[str]) -> List[str]:
+    """
+    Parse an ?expand= value such as "property,company".
+
+    Raises:
+        ValueError: If an expansion is unknown
+    """
+    expansions = [name.strip() for name in (value or "").split(",") if name.strip()]
+    invalid = [name for name in expansions if name not in EXPANSIONS]
+    if invalid:
+        raise ValueError(f"Invalid expand value(s): {', '.join(invalid)}. "
+                         f"Must be one of: {', '.join(EXPANSIONS)}")
+    return expansions
+
+
+def _names(collection, ids) -> Dict[str, str]:
+    object_ids = [ObjectId(i) for i in ids if ObjectId.is_valid(i)]
+    if not object_ids:
+        return {}
+    return {str(doc["_id"]): doc.get("name") for doc in collection.find({"_id": {"$in": object_ids}}, {"name": 1})}
+
+
+def expand_references(docs: List[Dict], expansions: List[str]) -> List[Dict]:
+    """
+    Add the names of referenced properties and/or companies to each document, in place.
+
+    Args:
+        docs (List[Dict]): Documents holding property_id/company_id as strings
+        expansions (List[str]): Names from EXPANSIONS
+
+    Returns:
+        List[Dict]: The same documents
+    """
+    for name in expansions:
+        field, target, collection = EXPANSIONS[name]
+        ids = {str(doc[field]) for doc in docs if doc.get(field)}
+        names = _names(collection, ids)
+        for doc in docs:
+            doc[target] = names.get(str(doc.get(field))) if doc.get(field) else None
+    return docs
@@ -0,0 +1,145 @@
+"""
+Property locations and areas.
+
+Properties carry two geo fields next to their address:
+
+    location   GeoJSON Point {"type": "Point", "coordinates": [lng, lat]}
+               (2dsphere index "location")
+    area       {"state": "TX", "county": "midland"}: the address state as a
+               USPS code and the county lowercased without a "County" or
+               "Parish" suffix (compound index "area")
+
+so state/county lookups are equality matches on an index instead of
+case-insensitive regex scans. Properties created before these fields existed
+are filled in by the property_areas migration:
+
+    python -m migrations property_areas
+"""
+import math
+import re
+from typing import Dict, List, Optional
+from pymongo import UpdateOne
+
+STATE_CODES = {
+    "alabama": "AL", "alaska": "AK", "arizona": "AZ", "arkansas": "AR", "california": "CA",
+    "colorado": "CO", "connecticut": "CT", "delaware": "DE", "district of columbia": "DC",
+    "florida": "FL", "georgia": "GA", "hawaii": "HI", "idaho": "ID", "illinois": "IL",
+    "indiana": "IN", "iowa": "IA", "kansas": "KS", "kentucky": "KY", "louisiana": "LA",
+    "maine": "ME", "maryland": "MD", "massachusetts": "MA", "michigan": "MI", "minnesota": "MN",
+    "mississippi": "MS", "missouri": "MO", "montana": "MT", "nebraska": "NE", "nevada": "NV",
+    "new hampshire": "NH", "new jersey": "NJ", "new mexico": "NM", "new york": "NY",
+    "north carolina": "NC", "north dakota": "ND", "ohio": "OH", "oklahoma": "OK", "oregon": "OR",
+    "pennsylvania": "PA", "rhode island": "RI", "south carolina": "SC", "south dakota": "SD",
+    "tennessee": "TN", "texas": "TX", "utah": "UT", "vermont": "VT", "virginia": "VA",
+    "washington": "WA", "west virginia": "WV", "wisconsin": "WI", "wyoming": "WY",
+}
+AREA_LEVELS = ["state", "county"]
+EARTH_RADIUS_METERS = 6378100.0
+_COUNTY_SUFFIX = re.compile(r"\s+(county|parish|borough)$")
+
+
+def _clean(value) -> str:
+    return " ".join(str(value or "").replace(".", "").split()).lower()
+
+
+def normalize_state(state) -> Optional[str]:
+    """USPS code for a state name or code ("texas", "Tx", "TX" -> "TX"); None if empty."""
+    state = _clean(state)
+    if not state:
+        return None
+    return STATE_CODES.get(state, state.upper())
+
+
+def normalize_county(county) -> Optional[str]:
+    """Lowercased county name without its suffix ("Midland County" -> "midland"); None if empty."""
+    county = _COUNTY_SUFFIX.sub("", _clean(county))
+    return county or None
+
+
+def area_for(address: Optional[Dict]) -> Dict:
+    """The normalized area of an address."""
+    address = address or {}
+    return {"state": normalize_state(address.get("state")), "county": normalize_county(address.get("county"))}
+
+
+def to_point(value) -> Dict:
+    """
+    Validate a location as a GeoJSON Point.
+
+    Args:
+        value: A GeoJSON Point or {"lat": ..., "lng": ...}
+
+    Returns:
+        Dict: {"type": "Point", "coordinates": [lng, lat]}
+
+    Raises:
+        ValueError: If the location is malformed or out of range
+    """
+    if isinstance(value, dict) and value.get("type") == "Point":
+        coordinates = value.get("coordinates")
+    elif isinstance(value, dict) and "lat" in value and "lng" in value:
+        coordinates = [value["lng"], value["lat"]]
+    else:
+        raise ValueError("location must be a GeoJSON Point or {\"lat\": ..., \"lng\": ...}")
+    try:
+        lng, lat = (float(v) for v in coordinates)
+    except (TypeError, ValueError):
+        raise ValueError("location coordinates must be [longitude, latitude]")
+    if not (-180 <= lng <= 180 and -90 <= lat <= 90):
+        raise ValueError("location is out of range: longitude must be within ±180 and latitude within ±90")
+    return {"type": "Point", "coordinates": [lng, lat]}
+
+
+def to_polygon(value) -> Dict:
+    """
+    Validate a GeoJSON Polygon/MultiPolygon, or build a Polygon from a list of
+    [lng, lat] points (closed automatically).
+
+    Raises:
+        ValueError: If the shape is malformed
+    """
+    if isinstance(value, list):
+        ring = [to_point({"type": "Point", "coordinates": point})["coordinates"] for point in value]
+        if len(ring) < 3:
+            raise ValueError("A polygon needs at least 3 points")
+        if ring[0] != ring[-1]:
+            ring.append(ring[0])
+        return {"type": "Polygon", "coordinates": [ring]}
+    if isinstance(value, dict) and value.get("type") in ("Polygon", "MultiPolygon") and value.get("coordinates"):
+        return value
+    raise ValueError("polygon must be a GeoJSON Polygon/MultiPolygon or a list of [lng, lat] points")
+
+
+def distance_meters(a: List[float], b: List[float]) -> float:
+    """Great-circle distance between two [lng, lat] points."""
+    lng1, lat1, lng2, lat2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * math.asin(min(1.0, math.sqrt(h)))
+
+
+def backfill(collection) -> int:
+    """
+    Set area on properties whose stored area doesn't match their address.
+
+    Returns:
+        int: Number of properties updated
+    """
+    operations = []
+    for doc in collection.find({}, {"address": 1, "area": 1}):
+        area = area_for(doc.get("address"))
+        if doc.get("area") != area:
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"area": area}}))
+    if not operations:
+        return 0
+    return collection.bulk_write(operations, ordered=False).modified_count
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import migrations
+
+    parser = argparse.ArgumentParser(description="Property area maintenance (same as: python -m migrations property_areas)")
+    parser.add_argument("command", choices=["backfill"])
+    parser.parse_args()
+    print(json.dumps(migrations.run("property_areas"), indent=2))
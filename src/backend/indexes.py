@@ -0,0 +1,123 @@
+"""
+Index definitions for the application's collections.
+
+    python -m indexes        create any missing indexes in the configured database
+
+create_index is idempotent, so this is safe to run on every deploy. create_app
+also runs it on startup (ENSURE_INDEXES_ON_STARTUP), in a background thread for
+the mongo backend so a slow or unreachable database doesn't hold up the app.
+Queries that can't run without an index ($text, $near) raise MissingIndexError
+until it exists.
+"""
+import logging
+import threading
+from contextlib import contextmanager
+from pymongo import ASCENDING, GEOSPHERE, TEXT
+from pymongo.errors import OperationFailure
+import db
+
+# collection -> list of (keys, options)
+INDEXES = {
+    "production": [
+        ([("property_id", ASCENDING), ("month", ASCENDING)], {"unique": True, "name": "property_month"}),
+        ([("month", ASCENDING)], {"name": "month"}),
+    ],
+    "entry_memberships": [
+        ([("entry_id", ASCENDING), ("transaction_id", ASCENDING)], {"unique": True, "name": "entry_transaction"}),
+        ([("transaction_id", ASCENDING)], {"name": "transaction_id"}),
+    ],
+    "decline_forecasts": [
+        ([("property_id", ASCENDING)], {"unique": True, "name": "property_id"}),
+    ],
+    # Date-range reads, here and first in entries/transactions (dates.py keeps these
+    # fields BSON dates)
+    "company_ownership": [
+        ([("date_from", ASCENDING), ("date_to", ASCENDING)], {"name": "date_range"}),
+    ],
+    "entries": [
+        ([("entry_date", ASCENDING)], {"name": "entry_date"}),
+        # Full-text search (one text index per collection); weights rank title-like
+        # fields above descriptions
+        ([("title", TEXT), ("description", TEXT)],
+         {"name": "search", "weights": {"title": 5, "description": 1}}),
+    ],
+    "transactions": [
+        ([("transaction_date", ASCENDING)], {"name": "transaction_date"}),
+        ([("merchandise_transacted", TEXT), ("merchandise_type", TEXT), ("service", TEXT)],
+         {"name": "search", "weights": {"merchandise_transacted": 3, "merchandise_type": 2, "service": 2}}),
+    ],
+    "companies": [
+        ([("name", TEXT), ("description", TEXT)],
+         {"name": "search", "weights": {"name": 5, "description": 1}}),
+    ],
+    "properties": [
+        ([("location", GEOSPHERE)], {"name": "location"}),
+        ([("area.state", ASCENDING), ("area.county", ASCENDING)], {"name": "area"}),
+        ([("name", TEXT), ("address.street", TEXT), ("address.city", TEXT), ("address.state", TEXT)],
+         {"name": "search", "weights": {"name": 5, "address.street": 2, "address.city": 1, "address.state": 1}}),
+    ],
+}
+
+
+# Server error codes for "this query needs an index that doesn't exist"
+# (27: IndexNotFound, $text; 291: NoQueryExecutionPlans, $near)
+MISSING_INDEX_CODES = (27, 291)
+
+logger = logging.getLogger(__name__)
+
+
+class MissingIndexError(RuntimeError):
+    """A query needs an index from INDEXES that hasn't been created yet."""
+
+
+def ensure_indexes(database=None) -> dict:
+    """
+    Create the indexes in INDEXES.
+
+    Args:
+        database: Database to use; defaults to db.get_db()
+
+    Returns:
+        dict: Index names created (or confirmed) per collection
+    """
+    database = database if database is not None else db.get_db()
+    created = {}
+    for collection, specs in INDEXES.items():
+        created[collection] = [database[collection].create_index(keys, **options) for keys, options in specs]
+    return created
+
+
+def ensure_indexes_in_background():
+    """Run ensure_indexes() on a daemon thread, logging a failure instead of raising it."""
+    def run():
+        try:
+            ensure_indexes()
+        except Exception:
+            logger.exception("Creating indexes failed; run `python -m indexes` once the database is reachable")
+    threading.Thread(target=run, name="ensure-indexes", daemon=True).start()
+
+
+@contextmanager
+def required(collection: str, index: str):
+    """
+    Turn the server's missing-index failure inside the block into a MissingIndexError.
+
+    Args:
+        collection (str): Collection being queried
+        index (str): Name of the INDEXES entry the query needs
+
+    Raises:
+        MissingIndexError: If the query failed because the index doesn't exist
+    """
+    try:
+        yield
+    except OperationFailure as e:
+        if e.code not in MISSING_INDEX_CODES:
+            raise
+        raise MissingIndexError(f"The {collection} collection has no '{index}' index yet; "
+                                f"create it with `python -m indexes`") from e
+
+
+if __name__ == "__main__":
+    import json
+    print(json.dumps(ensure_indexes(), indent=2))
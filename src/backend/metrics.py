@@ -0,0 +1,267 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Request metrics are recorded by hooks installed with init_app(); MongoDB command
+and connection pool metrics come from pymongo event listeners registered on the
+client in db.py. Everything is exposed at /api/metrics (routes/metrics_routes.py).
+
+Recording is a dict lookup plus a few additions under a per-metric lock, so it
+is cheap enough to leave on for every request.
+"""
+import threading
+import time
+from bisect import bisect_left
+from flask import g, request
+from pymongo import monitoring
+import db
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Response size buckets in bytes
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def collect(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        for label_values, value in items:
+            lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, *label_values, value):
+        with self._lock:
+            self._values[label_values] = value
+
+    def dec(self, *label_values, amount=1):
+        self.inc(*label_values, amount=-amount)
+
+    def collect(self):
+        lines = super().collect()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [bucket counts..., +Inf count, sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, *label_values, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = self._values[label_values] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def collect(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        for label_values, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                labels = _format_labels(self.label_names, label_values, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self.register(Counter(name, help_text, labels))
+
+    def gauge(self, name, help_text, labels=()):
+        return self.register(Gauge(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help_text, labels, buckets))
+
+    def render(self) -> str:
+        """Render every registered metric in Prometheus text format."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.counter(
+    "http_requests_total", "HTTP requests handled", ("method", "route", "status"))
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+http_response_size_bytes = registry.histogram(
+    "http_response_size_bytes", "HTTP response body size", ("method", "route"), SIZE_BUCKETS)
+
+mongo_commands_total = registry.counter(
+    "mongo_commands_total", "MongoDB commands issued", ("collection", "command", "outcome"))
+mongo_command_duration_seconds = registry.histogram(
+    "mongo_command_duration_seconds", "MongoDB command duration", ("collection", "command"))
+mongo_pool_checkout_wait_seconds = registry.histogram(
+    "mongo_pool_checkout_wait_seconds", "Time spent waiting to check out a pooled connection", ("address",))
+mongo_pool_connections = registry.gauge(
+    "mongo_pool_connections", "Open connections in the pool", ("address",))
+mongo_pool_connections_in_use = registry.gauge(
+    "mongo_pool_connections_in_use", "Connections currently checked out", ("address",))
+
+
+def _route_label():
+    # Use the URL rule (e.g. /api/entries/<entry_id>) so label cardinality stays bounded
+    rule = request.url_rule
+    return rule.rule if rule is not None else "unmatched"
+
+
+def _start_timer():
+    g._metrics_start = time.perf_counter()
+
+
+def _record_request(response):
+    start = g.pop("_metrics_start", None)
+    if start is None:
+        return response
+    route = _route_label()
+    method = request.method
+    http_requests_total.inc(method, route, str(response.status_code))
+    http_request_duration_seconds.observe(method, route, value=time.perf_counter() - start)
+    size = response.content_length
+    if size is not None:
+        http_response_size_bytes.observe(method, route, value=size)
+    return response
+
+
+def init_app(app):
+    """Install the request timing hooks on a Flask app and the Mongo listeners on the client."""
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+    db.add_event_listener(command_listener)
+    db.add_event_listener(pool_listener)
+
+
+def command_collection(event) -> str:
+    """Collection name for a CommandStartedEvent (the value of the command's first key)."""
+    value = event.command.get(event.command_name)
+    return value if isinstance(value, str) else "-"
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Records per-collection, per-command durations for every MongoDB command."""
+
+    def __init__(self):
+        # (connection_id, request_id) -> collection, filled at start and popped at finish
+        self._in_flight = {}
+
+    def started(self, event):
+        self._in_flight[(event.connection_id, event.request_id)] = command_collection(event)
+
+    def _finish(self, event, outcome):
+        collection = self._in_flight.pop((event.connection_id, event.request_id), "-")
+        seconds = event.duration_micros / 1e6
+        mongo_commands_total.inc(collection, event.command_name, outcome)
+        mongo_command_duration_seconds.observe(collection, event.command_name, value=seconds)
+
+    def succeeded(self, event):
+        self._finish(event, "success")
+
+    def failed(self, event):
+        self._finish(event, "failure")
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Tracks pool sizes and connection checkout waits."""
+
+    @staticmethod
+    def _address(event):
+        host, port = event.address
+        return f"{host}:{port}"
+
+    def pool_created(self, event):
+        mongo_pool_connections.set(self._address(event), value=0)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        mongo_pool_connections.inc(self._address(event))
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        mongo_pool_connections.dec(self._address(event))
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        if event.duration is not None:
+            mongo_pool_checkout_wait_seconds.observe(self._address(event), value=event.duration)
+
+    def connection_checked_out(self, event):
+        if event.duration is not None:
+            mongo_pool_checkout_wait_seconds.observe(self._address(event), value=event.duration)
+        mongo_pool_connections_in_use.inc(self._address(event))
+
+    def connection_checked_in(self, event):
+        mongo_pool_connections_in_use.dec(self._address(event))
+
+
+command_listener = CommandMetricsListener()
+pool_listener = PoolMetricsListener()
@@ -0,0 +1,123 @@
+"""
+One-off data migrations. Each one is idempotent, so re-running it (or running
+it against data that is already migrated) is safe.
+
+    python -m migrations <name>
+    python -m migrations --list
+"""
+from datetime import datetime
+from pymongo import UpdateOne
+import dates
+import db
+import entry_totals
+import geo
+import indexes
+import query_cache
+
+BATCH_SIZE = 5_000
+
+
+def entry_memberships(database) -> dict:
+    """
+    Move each entry's transaction_ids array into entry_memberships and record
+    transaction_count and totals on the entry.
+    """
+    entries = database["entries"]
+    memberships = database["entry_memberships"]
+    migrated = members = 0
+    for entry in entries.find({"transaction_ids": {"$exists": True}}, {"transaction_ids": 1, "created_at": 1}):
+        added_at = entry.get("created_at") or datetime.now()
+        operations = [
+            UpdateOne({"entry_id": entry["_id"], "transaction_id": transaction_id},
+                      {"$setOnInsert": {"added_at": added_at}}, upsert=True)
+            for transaction_id in entry["transaction_ids"]
+        ]
+        for i in range(0, len(operations), BATCH_SIZE):
+            memberships.bulk_write(operations[i:i + BATCH_SIZE], ordered=False)
+        count, totals = entry_totals.compute(memberships, database["transactions"], entry["_id"])
+        entries.update_one({"_id": entry["_id"]},
+                           {"$set": {"transaction_count": count, "totals": totals}, "$unset": {"transaction_ids": ""}})
+        migrated += 1
+        members += len(operations)
+    return {"entries": migrated, "memberships": members}
+
+
+def normalize_dates(database) -> dict:
+    """
+    Rewrite date fields stored as ISO strings as BSON dates, so date-range
+    queries match them and can use the date indexes. Strings that don't parse
+    are left as they are and counted as invalid.
+    """
+    report = {}
+    for collection_name, fields in dates.DATE_FIELDS.items():
+        collection = database[collection_name]
+        converted = invalid = 0
+        operations = []
+        query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+        for doc in collection.find(query, dict.fromkeys(fields, 1)):
+            values = {}
+            for field in fields:
+                if not isinstance(doc.get(field), str):
+                    continue
+                try:
+                    values[field] = dates.to_datetime(doc[field], field)
+                except ValueError:
+                    invalid += 1
+            if values:
+                operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": values}))
+                converted += 1
+            if len(operations) >= BATCH_SIZE:
+                collection.bulk_write(operations, ordered=False)
+                operations = []
+        if operations:
+            collection.bulk_write(operations, ordered=False)
+        report[collection_name] = {"converted": converted, "invalid": invalid}
+    return report
+
+
+def property_areas(database) -> dict:
+    """
+    Set area (state code and county) on properties from their address, for
+    properties created before the field existed or whose address changed.
+    """
+    return {"properties": geo.backfill(database["properties"])}
+
+
+MIGRATIONS = {
+    "entry_memberships": entry_memberships,
+    "normalize_dates": normalize_dates,
+    "property_areas": property_areas,
+}
+
+
+def run(name: str, database=None) -> dict:
+    """
+    Run a migration after making sure the indexes it relies on exist.
+
+    Raises:
+        ValueError: If the migration is unknown
+    """
+    if name not in MIGRATIONS:
+        raise ValueError(f"Unknown migration '{name}'. Must be one of: {', '.join(MIGRATIONS)}")
+    database = database if database is not None else db.get_db()
+    indexes.ensure_indexes(database)
+    try:
+        return MIGRATIONS[name](database)
+    finally:
+        # Migrations write behind the *API classes, so nothing cached in this process is current
+        query_cache.clear()
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Run a data migration")
+    parser.add_argument("name", nargs="?", choices=sorted(MIGRATIONS))
+    parser.add_argument("--list", action="store_true", help="List the migrations")
+    args = parser.parse_args()
+    if args.list or not args.name:
+        for name, migration in MIGRATIONS.items():
+            print(f"{name}: {' '.join(migration.__doc__.split())}")
+    else:
+        print(json.dumps(run(args.name), indent=2))
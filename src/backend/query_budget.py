@@ -0,0 +1,157 @@
+"""
+Per-request database round-trip budget and N+1 detector.
+
+Every MongoDB command issued while handling a request is counted against that
+request (getMore batches of the same cursor are not separate operations, but
+the documents they return are counted). Routes declare a budget with
+@db_budget(max_ops=..., max_docs=...). When a request goes over its budget, or
+issues the same query shape more than DB_N_PLUS_ONE_THRESHOLD times, a warning
+is logged; with DB_BUDGET_STRICT (on in testing) DbBudgetExceeded is raised
+instead so the regression fails the test.
+
+In debug mode the counts are returned as X-DB-Operations / X-DB-Docs-Read headers.
+"""
+import contextvars
+import logging
+from flask import current_app, g, request
+from pymongo import monitoring
+import db
+from metrics import command_collection
+
+logger = logging.getLogger(__name__)
+
+_usage = contextvars.ContextVar("db_request_usage", default=None)
+
+# Commands whose repeated shape points at a query inside a loop
+_SHAPE_FILTERS = {"find": "filter", "count": "query", "aggregate": "pipeline", "distinct": "query"}
+
+
+class DbBudgetExceeded(RuntimeError):
+    """Raised in strict mode when a request goes over its database budget."""
+
+
+class RequestUsage:
+    def __init__(self):
+        self.ops = 0
+        self.docs_read = 0
+        self.shapes = {}
+
+    def record_shape(self, key):
+        self.shapes[key] = self.shapes.get(key, 0) + 1
+
+
+def current_usage():
+    """The RequestUsage of the request being handled, or None outside a request."""
+    return _usage.get()
+
+
+def db_budget(max_ops: int = None, max_docs: int = None):
+    """
+    Declare the database budget of a route.
+
+    Args:
+        max_ops (int, optional): Maximum number of database operations
+        max_docs (int, optional): Maximum number of documents read
+    """
+    def decorator(view):
+        view._db_budget = (max_ops, max_docs)
+        return view
+    return decorator
+
+
+def _shape_key(event):
+    # Field names only: two finds that differ by value share a shape
+    spec = event.command.get(_SHAPE_FILTERS[event.command_name])
+    if isinstance(spec, dict):
+        fields = tuple(sorted(spec))
+    elif isinstance(spec, list):
+        fields = tuple(next(iter(stage), "") for stage in spec if isinstance(stage, dict))
+    else:
+        fields = ()
+    return (command_collection(event), event.command_name, fields)
+
+
+def _batch_size(reply):
+    cursor = reply.get("cursor")
+    if cursor:
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or [])
+    if "values" in reply:
+        return len(reply["values"])
+    return 0
+
+
+class BudgetListener(monitoring.CommandListener):
+    """Counts operations and documents read against the current request."""
+
+    def started(self, event):
+        usage = _usage.get()
+        if usage is None or event.command_name == "getMore":
+            return
+        usage.ops += 1
+        if event.command_name in _SHAPE_FILTERS:
+            usage.record_shape(_shape_key(event))
+
+    def succeeded(self, event):
+        usage = _usage.get()
+        if usage is not None:
+            usage.docs_read += _batch_size(event.reply)
+
+    def failed(self, event):
+        pass
+
+
+listener = BudgetListener()
+
+
+def _begin_request():
+    g._db_usage_token = _usage.set(RequestUsage())
+
+
+def _violations(usage, budget, n_plus_one_threshold):
+    problems = []
+    if budget is not None:
+        max_ops, max_docs = budget
+        if max_ops is not None and usage.ops > max_ops:
+            problems.append(f"{usage.ops} database operations (budget {max_ops})")
+        if max_docs is not None and usage.docs_read > max_docs:
+            problems.append(f"{usage.docs_read} documents read (budget {max_docs})")
+    for (collection, command, fields), count in usage.shapes.items():
+        if count > n_plus_one_threshold:
+            problems.append(
+                f"possible N+1: {command} on {collection} by {list(fields)} repeated {count} times"
+            )
+    return problems
+
+
+def _end_request(response):
+    usage = _usage.get()
+    if usage is None:
+        return response
+    config = current_app.config
+    if current_app.debug or config["DB_BUDGET_HEADERS"]:
+        response.headers["X-DB-Operations"] = str(usage.ops)
+        response.headers["X-DB-Docs-Read"] = str(usage.docs_read)
+
+    view = current_app.view_functions.get(request.endpoint)
+    budget = getattr(view, "_db_budget", None)
+    problems = _violations(usage, budget, config["DB_N_PLUS_ONE_THRESHOLD"])
+    if problems:
+        message = f"{request.method} {request.path}: " + "; ".join(problems)
+        if config["DB_BUDGET_STRICT"]:
+            raise DbBudgetExceeded(message)
+        logger.warning(message)
+    return response
+
+
+def _teardown(exc=None):
+    token = g.pop("_db_usage_token", None)
+    if token is not None:
+        _usage.reset(token)
+
+
+def init_app(app):
+    """Install the per-request counters on a Flask app and the listener on the clients."""
+    app.before_request(_begin_request)
+    app.after_request(_end_request)
+    app.teardown_request(_teardown)
+    db.add_event_listener(listener)
@@ -0,0 +1,225 @@
+"""
+Process-wide cache of filtered read results.
+
+Filter and search reads such as TransactionsAPI.get_transactions_by_date_range
+or CompanyOwnershipAPI.search_company_ownerships are repeated constantly with
+the same arguments. Read methods opt in with @cached naming the collections
+their result depends on, and the *API write methods on those collections are
+marked @invalidates:
+
+    @staticmethod
+    @query_cache.cached("transactions")
+    def get_transactions_by_date_range(start_date, end_date): ...
+
+    @staticmethod
+    @query_cache.invalidates("transactions", "entries")
+    def update_transaction(transaction_id, update_data): ...
+
+Entries are keyed by the method and its arguments normalized to canonical
+Extended JSON (so {"a": 1, "b": 2} and {"b": 2, "a": 1} share an entry) and
+stored pickled, which gives every hit its own copy to mutate and a byte size to
+bound the cache by. The least recently used entries are evicted beyond
+QUERY_CACHE_MAX_ENTRIES or QUERY_CACHE_MAX_BYTES.
+
+A write drops only the entries that depend on the collections it touches. A
+read that overlaps a write to its collections isn't stored, so a result
+computed before the write can't outlive it. Writes made by other processes
+aren't seen, so entries also expire after QUERY_CACHE_TTL_SECONDS.
+
+Hit ratio and memory use are reported by stats() at /api/admin/query-cache.
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Dict
+from bson import json_util
+from config import Config
+
+_settings = {
+    "enabled": Config.QUERY_CACHE_ENABLED,
+    "max_entries": Config.QUERY_CACHE_MAX_ENTRIES,
+    "max_bytes": Config.QUERY_CACHE_MAX_BYTES,
+    "ttl_seconds": Config.QUERY_CACHE_TTL_SECONDS,
+}
+_KEY_OPTIONS = json_util.JSONOptions(json_mode=json_util.JSONMode.CANONICAL)
+
+
+class _Entry:
+    __slots__ = ("value", "collections", "expires_at")
+
+    def __init__(self, value: bytes, collections, expires_at: float):
+        self.value = value
+        self.collections = collections
+        self.expires_at = expires_at
+
+
+class QueryCache:
+    """Size-bounded LRU of pickled results, indexed by the collections each depends on."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        # collection -> keys of the entries depending on it
+        self._by_collection = {}
+        # collection -> writes so far; a read only stores its result if these (and the
+        # number of clears) didn't move
+        self._generations = {}
+        self._clears = 0
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def _generation(self, collections):
+        return (self._clears,) + tuple(self._generations.get(name, 0) for name in collections)
+
+    def generation(self, collections):
+        with self._lock:
+            return self._generation(collections)
+
+    def get(self, key):
+        """The cached result (a fresh copy), or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at < time.monotonic():
+                self._drop(key)
+                self._stats["expirations"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            value = entry.value
+        return pickle.loads(value)
+
+    def put(self, key, result, collections, generation):
+        value = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        # One result that would take over the cache isn't worth keeping
+        if len(value) > _settings["max_bytes"] // 4:
+            return
+        with self._lock:
+            if generation != self._generation(collections):
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = _Entry(value, collections, time.monotonic() + _settings["ttl_seconds"])
+            self._bytes += len(value)
+            for name in collections:
+                self._by_collection.setdefault(name, set()).add(key)
+            while self._entries and (len(self._entries) > _settings["max_entries"]
+                                     or self._bytes > _settings["max_bytes"]):
+                self._drop(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.value)
+        for name in entry.collections:
+            keys = self._by_collection.get(name)
+            if keys is not None:
+                keys.discard(key)
+
+    def invalidate(self, collections) -> int:
+        """Drop every entry depending on any of the collections; returns how many were dropped."""
+        with self._lock:
+            keys = set()
+            for name in collections:
+                self._generations[name] = self._generations.get(name, 0) + 1
+                keys |= self._by_collection.pop(name, set())
+            for key in keys:
+                if key in self._entries:
+                    self._drop(key)
+            self._stats["invalidations"] += len(keys)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._clears += 1
+            self._entries.clear()
+            self._by_collection.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            by_collection = {name: len(keys) for name, keys in self._by_collection.items() if keys}
+            return dict(
+                self._stats,
+                hit_ratio=round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+                entries=len(self._entries),
+                bytes=self._bytes,
+                entries_by_collection=by_collection,
+            )
+
+
+_cache = QueryCache()
+
+
+def _key(fn, args, kwargs):
+    try:
+        return f"{fn.__module__}.{fn.__qualname__}:" + json_util.dumps(
+            [list(args), kwargs], sort_keys=True, json_options=_KEY_OPTIONS)
+    except TypeError:
+        return None  # arguments without a canonical form aren't cached
+
+
+def cached(*collections):
+    """Cache the decorated read's results until a write to one of the collections (or the TTL)."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _settings["enabled"]:
+                return fn(*args, **kwargs)
+            key = _key(fn, args, kwargs)
+            if key is None:
+                return fn(*args, **kwargs)
+            result = _cache.get(key)
+            if result is not None:
+                return result
+            generation = _cache.generation(collections)
+            result = fn(*args, **kwargs)
+            _cache.put(key, result, collections, generation)
+            return result
+        return wrapper
+    return decorator
+
+
+def invalidates(*collections):
+    """Drop the cached reads of the collections whenever the decorated write runs (even if it fails)."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _cache.invalidate(collections)
+        return wrapper
+    return decorator
+
+
+def invalidate(*collections) -> int:
+    """Drop the cached reads of the collections, for writes made outside the *API write methods."""
+    return _cache.invalidate(collections)
+
+
+def clear():
+    _cache.clear()
+
+
+def stats() -> Dict:
+    """Settings plus hit ratio, entry count and memory use."""
+    return dict(
+        _cache.stats(),
+        enabled=_settings["enabled"],
+        max_entries=_settings["max_entries"],
+        max_bytes=_settings["max_bytes"],
+        ttl_seconds=_settings["ttl_seconds"],
+    )
+
+
+def init_app(app):
+    _settings["enabled"] = app.config["QUERY_CACHE_ENABLED"]
+    _settings["max_entries"] = app.config["QUERY_CACHE_MAX_ENTRIES"]
+    _settings["max_bytes"] = app.config["QUERY_CACHE_MAX_BYTES"]
+    _settings["ttl_seconds"] = app.config["QUERY_CACHE_TTL_SECONDS"]
@@ -0,0 +1,181 @@
+"""
+On-demand profiling of individual requests.
+
+A request is profiled when it carries `X-Profile-Request: <PROFILE_TOKEN>` or is
+picked by PROFILE_SAMPLE_RATE. While it runs, a sampler thread records the
+handling thread's stack every PROFILE_INTERVAL_MS and tracemalloc tracks
+allocations. While the handler waits in aio.run, the aio-loop thread's stack is
+sampled too and appended under the handler's, so time spent in async queries
+shows up in the same flame graph. Two artifacts are written to PROFILE_DIR per
+profiled request:
+
+    <id>.folded  collapsed stacks ("frame;frame;frame count"), ready for
+                 flamegraph.pl / speedscope
+    <id>.json    request info, sample counts and the top allocations
+
+Requests that are not profiled only pay for a header lookup (and a random()
+call when sampling is enabled).
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+from flask import current_app, g, request
+import aio
+
+PROFILE_HEADER = "X-Profile-Request"
+TOP_ALLOCATIONS = 25
+
+# tracemalloc is process-wide, so only one request at a time gets allocation tracking
+_tracemalloc_lock = threading.Lock()
+
+
+def _stack(frame) -> list:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+class StackSampler(threading.Thread):
+    """Samples one thread's Python stack at a fixed interval, following it onto the aio loop."""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="request-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self.loop_samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            frame = frames.get(self.thread_id)
+            if frame is None:
+                continue
+            stack = _stack(frame)
+            # The loop is shared, so it may be running another request's coroutine
+            # too; it's still what this request is waiting on
+            loop_frame = frames.get(aio.loop_thread_id()) if aio.is_waiting(self.thread_id) else None
+            if loop_frame is not None:
+                stack.append("aio-loop")
+                stack.extend(_stack(loop_frame))
+                self.loop_samples += 1
+            key = ";".join(stack)
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def _should_profile(config) -> bool:
+    token = config["PROFILE_TOKEN"]
+    if token and request.headers.get(PROFILE_HEADER) == token:
+        return True
+    rate = config["PROFILE_SAMPLE_RATE"]
+    return rate > 0 and random.random() < rate
+
+
+def _start_profile():
+    if not _should_profile(current_app.config):
+        return
+    sampler = StackSampler(threading.get_ident(), current_app.config["PROFILE_INTERVAL_MS"] / 1000)
+    tracks_memory = _tracemalloc_lock.acquire(blocking=False)
+    if tracks_memory:
+        tracemalloc.start()
+    g._profile = {
+        "sampler": sampler,
+        "tracks_memory": tracks_memory,
+        "memory_start": tracemalloc.take_snapshot() if tracks_memory else None,
+        "started": time.perf_counter(),
+    }
+    sampler.start()
+
+
+def _finish_profile(response):
+    profile = g.pop("_profile", None)
+    if profile is None:
+        return response
+    duration = time.perf_counter() - profile["started"]
+    sampler = profile["sampler"]
+    sampler.stop()
+
+    allocations = []
+    if profile["tracks_memory"]:
+        try:
+            diff = tracemalloc.take_snapshot().compare_to(profile["memory_start"], "lineno")
+        finally:
+            tracemalloc.stop()
+            _tracemalloc_lock.release()
+        allocations = [
+            {"location": str(stat.traceback), "size_diff_bytes": stat.size_diff, "count_diff": stat.count_diff}
+            for stat in diff[:TOP_ALLOCATIONS]
+        ]
+
+    profile_id = f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+    directory = current_app.config["PROFILE_DIR"]
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, f"{profile_id}.folded"), "w") as f:
+        for stack, count in sorted(sampler.stacks.items(), key=lambda item: -item[1]):
+            f.write(f"{stack} {count}\n")
+    with open(os.path.join(directory, f"{profile_id}.json"), "w") as f:
+        json.dump({
+            "id": profile_id,
+            "method": request.method,
+            "path": request.full_path,
+            "endpoint": request.endpoint,
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 3),
+            "samples": sampler.samples,
+            "loop_samples": sampler.loop_samples,
+            "interval_ms": current_app.config["PROFILE_INTERVAL_MS"],
+            "top_allocations": allocations,
+        }, f, indent=2)
+
+    response.headers["X-Profile-Id"] = profile_id
+    return response
+
+
+def _abort_profile(exc=None):
+    # after_request is skipped when a request fails; don't leak the sampler or tracemalloc
+    profile = g.pop("_profile", None)
+    if profile is None:
+        return
+    profile["sampler"].stop()
+    if profile["tracks_memory"]:
+        tracemalloc.stop()
+        _tracemalloc_lock.release()
+
+
+def list_profiles(directory: str) -> list:
+    """Summaries of the stored profiles, newest first."""
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(directory, name)) as f:
+            info = json.load(f)
+        info.pop("top_allocations", None)
+        profiles.append(info)
+    return profiles
+
+
+def init_app(app):
+    """Install the profiling hooks on a Flask app."""
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+    app.teardown_request(_abort_profile)
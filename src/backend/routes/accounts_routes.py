@@ -0,0 +1,90 @@
+from flask import Blueprint, request, jsonify
+from api_clients.accounts_api import AccountsAPI
+from query_budget import db_budget
+
+accounts_bp = Blueprint('accounts', __name__)
+
+@accounts_bp.route('/api/accounts', methods=['GET'])
+def get_accounts():
+    try:
+        accounts = AccountsAPI.get_all_accounts()
+        return jsonify(accounts)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@accounts_bp.route('/api/accounts/<account_id>', methods=['GET'])
+@db_budget(max_ops=1)
+def get_account(account_id):
+    try:
+        account_data = AccountsAPI.get_account(account_id)
+        if account_data:
+            return jsonify(account_data)
+        return jsonify({"error": "Account not found"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@accounts_bp.route('/api/accounts', methods=['POST'])
+def create_account():
+    try:
+        account_data = request.json
+        account_id = AccountsAPI.create_account(account_data)
+        return jsonify({"id": account_id, "message": "Account created successfully"}), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@accounts_bp.route('/api/accounts/<account_id>', methods=['PUT'])
+def update_account(account_id):
+    try:
+        update_data = request.json
+        result = AccountsAPI.update_account(account_id, update_data)
+        if result:
+            return jsonify({"message": "Account updated successfully"})
+        return jsonify({"error": "Account not found"}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@accounts_bp.route('/api/accounts/<account_id>', methods=['DELETE'])
+def delete_account(account_id):
+    try:
+        result = AccountsAPI.delete_account(account_id)
+        if result:
+            return jsonify({"message": "Account deleted successfully"})
+        return jsonify({"error": "Account not found"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@accounts_bp.route('/api/accounts/type/<account_type>', methods=['GET'])
+def get_accounts_by_type(account_type):
+    try:
+        accounts = AccountsAPI.get_accounts_by_type(account_type)
+        return jsonify(accounts)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@accounts_bp.route('/api/accounts/bank/<bank_name>', methods=['GET'])
+def get_accounts_by_bank(bank_name):
+    try:
+        accounts = AccountsAPI.get_accounts_by_bank(bank_name)
+        return jsonify(accounts)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@accounts_bp.route('/api/accounts/active', methods=['GET'])
+def get_active_accounts():
+    try:
+        accounts = AccountsAPI.get_active_accounts()
+        return jsonify(accounts)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@accounts_bp.route('/api/accounts/inactive', methods=['GET'])
+def get_inactive_accounts():
+    try:
+        accounts = AccountsAPI.get_inactive_accounts()
+        return jsonify(accounts)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,85 @@
+import hmac
+from flask import Blueprint, current_app, request, jsonify, send_from_directory
+import slow_query_log
+import request_profiler
+import write_coalescer
+import write_spool
+import query_cache
+
+admin_bp = Blueprint('admin', __name__)
+
+ADMIN_HEADER = "X-Admin-Token"
+
+
+@admin_bp.before_request
+def require_admin_token():
+    """Every admin endpoint needs `X-Admin-Token: <ADMIN_TOKEN>`; with no token configured they're all closed"""
+    token = current_app.config["ADMIN_TOKEN"]
+    supplied = request.headers.get(ADMIN_HEADER, "")
+    if not token or not hmac.compare_digest(supplied.encode(), token.encode()):
+        return jsonify({"error": "Admin token required"}), 403
+
+
+@admin_bp.route('/api/admin/slow-queries', methods=['GET'])
+def get_slow_queries():
+    """List recent slow queries, newest first"""
+    try:
+        limit = request.args.get('limit', 50, type=int)
+        collection = request.args.get('collection')
+        return jsonify(slow_query_log.get_slow_queries(limit, collection)), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@admin_bp.route('/api/admin/write-coalescer', methods=['GET'])
+def get_write_coalescer_stats():
+    """Group-commit settings and per-collection flush statistics"""
+    try:
+        return jsonify(write_coalescer.stats()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@admin_bp.route('/api/admin/write-spool', methods=['GET'])
+def get_write_spool_stats():
+    """Whether writes are being journaled, how many are waiting and replay counts"""
+    try:
+        return jsonify(write_spool.stats()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@admin_bp.route('/api/admin/write-spool/replay', methods=['POST'])
+def replay_write_spool():
+    """Replay journaled writes now instead of waiting for the next attempt"""
+    try:
+        return jsonify(write_spool.replay()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@admin_bp.route('/api/admin/query-cache', methods=['GET'])
+def get_query_cache_stats():
+    """Query cache hit ratio, memory use and entries per collection"""
+    try:
+        return jsonify(query_cache.stats()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@admin_bp.route('/api/admin/query-cache/clear', methods=['POST'])
+def clear_query_cache():
+    """Drop every cached query result"""
+    try:
+        query_cache.clear()
+        return jsonify(query_cache.stats()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@admin_bp.route('/api/admin/profiles', methods=['GET'])
+def get_profiles():
+    """List stored request profiles, newest first"""
+    try:
+        return jsonify(request_profiler.list_profiles(current_app.config['PROFILE_DIR'])), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@admin_bp.route('/api/admin/profiles/<path:filename>', methods=['GET'])
+def get_profile_artifact(filename):
+    """Download a profile artifact (<id>.folded or <id>.json)"""
+    return send_from_directory(current_app.config['PROFILE_DIR'], filename)
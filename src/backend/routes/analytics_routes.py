@@ -0,0 +1,68 @@
+from flask import Blueprint, current_app, request, jsonify
+
+analytics_bp = Blueprint('analytics', __name__)
+
+FILTER_PARAMS = ['property_id', 'company_id', 'merchandise_type', 'service', 'start_date', 'end_date']
+
+
+def _api():
+    # analytics_store pulls in numpy; load it with the first analytics request, not at app start
+    from api_clients.analytics_api import AnalyticsAPI
+    return AnalyticsAPI
+
+
+def _filters():
+    return {name: request.args[name] for name in FILTER_PARAMS if request.args.get(name)}
+
+
+@analytics_bp.route('/api/analytics/group-by', methods=['GET'])
+def group_by():
+    """Transaction totals grouped by ?by=property,month (comma separated keys)"""
+    try:
+        by = [key for key in request.args.get('by', '').split(',') if key]
+        return jsonify(_api().group_by(by, _filters())), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@analytics_bp.route('/api/analytics/top', methods=['GET'])
+def top():
+    """Largest groups, e.g. ?by=company&metric=amount&limit=10"""
+    try:
+        by = request.args.get('by', 'company')
+        metric = request.args.get('metric', 'amount')
+        limit = request.args.get('limit', 10, type=int)
+        return jsonify(_api().top(by, metric, limit, _filters())), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@analytics_bp.route('/api/analytics/revenue-by-area', methods=['GET'])
+def revenue_by_area():
+    """Transaction totals per area, e.g. ?level=county&state=TX"""
+    try:
+        level = request.args.get('level', 'state')
+        return jsonify(_api().revenue_by_area(level, request.args.get('state'), _filters())), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@analytics_bp.route('/api/analytics/status', methods=['GET'])
+def status():
+    """Size and snapshot of the analytics store"""
+    try:
+        return jsonify(_api().get_status()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@analytics_bp.route('/api/analytics/snapshot', methods=['POST'])
+def save_snapshot():
+    """Write a snapshot that other workers can memory-map"""
+    try:
+        version = _api().save_snapshot(current_app.config['ANALYTICS_SNAPSHOT_DIR'])
+        return jsonify({"snapshot": version}), 201
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
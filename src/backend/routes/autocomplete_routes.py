@@ -0,0 +1,19 @@
+from flask import Blueprint, request, jsonify
+from api_clients.autocomplete_api import AutocompleteAPI
+
+autocomplete_bp = Blueprint('autocomplete', __name__)
+
+@autocomplete_bp.route('/api/autocomplete', methods=['GET'])
+def autocomplete():
+    """Name suggestions for pickers: ?type=company|property&q=...&limit=10"""
+    try:
+        suggestions = AutocompleteAPI.suggest(
+            request.args.get('type', ''),
+            request.args.get('q', ''),
+            request.args.get('limit', 10, type=int),
+        )
+        return jsonify(suggestions), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,23 @@
+from flask import Blueprint, request, jsonify
+from api_clients.batch_api import BatchAPI, BATCH_COLLECTIONS
+from query_budget import db_budget
+
+batch_bp = Blueprint('batch', __name__)
+
+@db_budget(max_ops=1)
+def batch_get(collection):
+    """Read documents by ID: {"ids": [...], "fields": ["name", ...]} -> results in request order"""
+    try:
+        data = request.get_json(silent=True) or {}
+        if 'ids' not in data:
+            return jsonify({"error": "ids is required"}), 400
+        return jsonify(BatchAPI.batch_get(collection, data['ids'], data.get('fields'))), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# One static rule per collection, so /api/<name>/batch-get never competes with /api/<name>/<id> routes
+for name in BATCH_COLLECTIONS:
+    batch_bp.add_url_rule(f'/api/{name}/batch-get', f'batch_get_{name.replace("-", "_")}', batch_get,
+                          methods=['POST'], defaults={'collection': name})
@@ -0,0 +1,60 @@
+from flask import Blueprint, request, jsonify
+from api_clients.companies_api import CompaniesAPI
+from query_budget import db_budget
+from single_flight import coalesce
+
+companies_bp = Blueprint('companies', __name__)
+
+@companies_bp.route('/api/companies', methods=['GET'])
+@coalesce
+def get_companies():
+    try:
+        companies = CompaniesAPI.get_all_companies()
+        return jsonify(companies)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@companies_bp.route('/api/companies/<company_id>', methods=['GET'])
+@db_budget(max_ops=1)
+def get_company(company_id):
+    try:
+        company_data = CompaniesAPI.get_company(company_id)
+        if company_data:
+            return jsonify(company_data)
+        return jsonify({"error": "Company not found"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@companies_bp.route('/api/companies', methods=['POST'])
+def create_company():
+    try:
+        company_data = request.json
+        company_id = CompaniesAPI.create_company(company_data)
+        return jsonify({"id": company_id, "message": "Company created successfully"}), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@companies_bp.route('/api/companies/<company_id>', methods=['PUT'])
+def update_company(company_id):
+    try:
+        update_data = request.json
+        result = CompaniesAPI.update_company(company_id, update_data)
+        if result:
+            return jsonify({"message": "Company updated successfully"})
+        return jsonify({"error": "Company not found"}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@companies_bp.route('/api/companies/<company_id>', methods=['DELETE'])
+def delete_company(company_id):
+    try:
+        result = CompaniesAPI.delete_company(company_id)
+        if result:
+            return jsonify({"message": "Company deleted successfully"})
+        return jsonify({"error": "Company not found"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
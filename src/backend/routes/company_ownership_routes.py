@@ -0,0 +1,71 @@
+from flask import Blueprint, request, jsonify
+from api_clients.company_ownership_api import CompanyOwnershipAPI
+from api_clients.async_api import AsyncCompanyOwnershipAPI
+import aio
+from query_budget import db_budget
+from expand import parse_expand, expand_references
+from single_flight import coalesce
+
+company_ownership_bp = Blueprint('company_ownership', __name__)
+
+@company_ownership_bp.route('/api/company-ownership', methods=['GET'])
+@coalesce
+def get_company_ownerships():
+    """All ownership records; ?expand=property,company adds property_name/company_name"""
+    try:
+        expansions = parse_expand(request.args.get('expand'))
+        ownerships = CompanyOwnershipAPI.get_all_company_ownerships()
+        return jsonify(expand_references(ownerships, expansions))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@company_ownership_bp.route('/api/company-ownership/<ownership_id>', methods=['GET'])
+@db_budget(max_ops=3)
+def get_company_ownership(ownership_id):
+    try:
+        expansions = parse_expand(request.args.get('expand'))
+        ownership_data = CompanyOwnershipAPI.get_company_ownership(ownership_id)
+        if ownership_data:
+            return jsonify(expand_references([ownership_data], expansions)[0])
+        return jsonify({"error": "Company ownership record not found"}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@company_ownership_bp.route('/api/company-ownership', methods=['POST'])
+@db_budget(max_ops=3)
+def create_company_ownership():
+    try:
+        ownership_data = request.json
+        ownership_id = aio.run(AsyncCompanyOwnershipAPI.create_company_ownership(ownership_data))
+        return jsonify({"id": ownership_id, "message": "Company ownership record created successfully"}), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@company_ownership_bp.route('/api/company-ownership/<ownership_id>', methods=['PUT'])
+def update_company_ownership(ownership_id):
+    try:
+        update_data = request.json
+        result = CompanyOwnershipAPI.update_company_ownership(ownership_id, update_data)
+        if result:
+            return jsonify({"message": "Company ownership record updated successfully"})
+        return jsonify({"error": "Company ownership record not found"}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@company_ownership_bp.route('/api/company-ownership/<ownership_id>', methods=['DELETE'])
+def delete_company_ownership(ownership_id):
+    try:
+        result = CompanyOwnershipAPI.delete_company_ownership(ownership_id)
+        if result:
+            return jsonify({"message": "Company ownership record deleted successfully"})
+        return jsonify({"error": "Company ownership record not found"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,19 @@
+from flask import Blueprint, request, jsonify
+from api_clients.async_api import AsyncDashboardAPI
+import aio
+from query_budget import db_budget
+from single_flight import coalesce
+
+dashboard_bp = Blueprint('dashboard', __name__)
+
+@dashboard_bp.route('/api/dashboard', methods=['GET'])
+@coalesce
+@db_budget(max_ops=6)
+def get_dashboard():
+    """Collection counts and recent transactions in one request"""
+    try:
+        recent_limit = request.args.get('recent_limit', 5, type=int)
+        summary = aio.run(AsyncDashboardAPI.get_summary(recent_limit))
+        return jsonify(summary), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
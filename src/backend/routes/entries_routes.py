@@ -1,13 +1,26 @@
 from flask import Blueprint, request, jsonify
 from api_clients.entries_api import EntriesAPI
-from datetime import datetime
+from api_clients.async_api import AsyncEntriesAPI
+import aio
+import dates
+from query_budget import db_budget
+from expand import parse_expand, expand_references
+from utils import BulkValidationError
+from single_flight import coalesce
 
 entries_bp = Blueprint('entries', __name__)
 
 @entries_bp.route('/api/entries', methods=['GET'])
+@coalesce
 def get_entries():
     """Get all entries or filter by query parameters"""
     try:
+        # Check if we need the entries holding a transaction
+        transaction_id = request.args.get('transaction_id')
+        if transaction_id:
+            entries = EntriesAPI.get_entries_for_transaction(transaction_id)
+            return jsonify(entries), 200
+        
         # Check if we need to filter by type
         entry_type = request.args.get('type')
         if entry_type:
@@ -25,8 +38,8 @@ def get_entries():
         end_date = request.args.get('end_date')
         if start_date and end_date:
             try:
-                start = datetime.fromisoformat(start_date)
-                end = datetime.fromisoformat(end_date)
+                start = dates.to_datetime(start_date, "start_date")
+                end = dates.to_datetime(end_date, "end_date")
                 entries = EntriesAPI.get_entries_by_date_range(start, end)
                 return jsonify(entries), 200
             except ValueError:
@@ -39,21 +52,27 @@ def get_entries():
         return jsonify({"error": str(e)}), 500
 
 @entries_bp.route('/api/entries/<entry_id>', methods=['GET'])
+@db_budget(max_ops=5)
 def get_entry(entry_id):
-    """Get a specific entry by ID"""
+    """Get a specific entry by ID; ?include_transactions=true&expand=property,company names its transactions' references"""
     try:
         # Check if we want to include transactions
         include_transactions = request.args.get('include_transactions', 'false').lower() == 'true'
+        expansions = parse_expand(request.args.get('expand'))
         
         if include_transactions:
-            entry = EntriesAPI.get_entry_with_transactions(entry_id)
+            entry = aio.run(AsyncEntriesAPI.get_entry_with_transactions(entry_id))
         else:
             entry = EntriesAPI.get_entry(entry_id)
             
         if not entry:
             return jsonify({"error": "Entry not found"}), 404
+        if include_transactions:
+            expand_references(entry["transactions"], expansions)
             
         return jsonify(entry), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -72,12 +91,55 @@ def create_entry():
         # Convert entry_date string to datetime if needed
         if isinstance(entry_data["entry_date"], str):
             try:
-                entry_data["entry_date"] = datetime.fromisoformat(entry_data["entry_date"])
+                entry_data["entry_date"] = dates.to_datetime(entry_data["entry_date"], "entry_date")
             except ValueError:
                 return jsonify({"error": "Invalid date format. Use ISO format (YYYY-MM-DD)"}), 400
         
         entry_id = EntriesAPI.create_entry(entry_data)
-        return jsonify({"id": entry_id, "message": "Entry created successfully"}), 201
+        return jsonify({"_id": entry_id, "message": "Entry created successfully"}), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@entries_bp.route('/api/entries/bulk-update', methods=['POST'])
+@db_budget(max_ops=2)
+def bulk_update_entries():
+    """Update many entries: {"updates": [{"_id": ..., "status": "approved"}, ...]}"""
+    try:
+        data = request.get_json(silent=True) or {}
+        return jsonify(EntriesAPI.bulk_update_entries(data.get("updates"))), 200
+    except BulkValidationError as e:
+        return jsonify({"error": str(e), "errors": e.errors}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@entries_bp.route('/api/entries/bulk-delete', methods=['POST'])
+def bulk_delete_entries():
+    """Delete many entries: {"ids": [...]}"""
+    try:
+        data = request.get_json(silent=True) or {}
+        return jsonify(EntriesAPI.bulk_delete_entries(data.get("ids"))), 200
+    except BulkValidationError as e:
+        return jsonify({"error": str(e), "errors": e.errors}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@entries_bp.route('/api/entries/bulk-status', methods=['POST'])
+@db_budget(max_ops=3)
+def transition_entries_status():
+    """Move many entries to a status: {"ids": [...], "status": "approved", "from_status": "submitted"}"""
+    try:
+        data = request.get_json(silent=True) or {}
+        if not data.get("status"):
+            return jsonify({"error": "status is required"}), 400
+        return jsonify(EntriesAPI.transition_status(data.get("ids"), data["status"], data.get("from_status"))), 200
+    except BulkValidationError as e:
+        return jsonify({"error": str(e), "errors": e.errors}), 400
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
@@ -92,7 +154,7 @@ def update_entry(entry_id):
         # Convert entry_date string to datetime if needed
         if "entry_date" in update_data and isinstance(update_data["entry_date"], str):
             try:
-                update_data["entry_date"] = datetime.fromisoformat(update_data["entry_date"])
+                update_data["entry_date"] = dates.to_datetime(update_data["entry_date"], "entry_date")
             except ValueError:
                 return jsonify({"error": "Invalid date format. Use ISO format (YYYY-MM-DD)"}), 400
         
@@ -118,6 +180,62 @@ def delete_entry(entry_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@entries_bp.route('/api/entries/<entry_id>/transactions', methods=['GET'])
+@db_budget(max_ops=2)
+def get_entry_transactions(entry_id):
+    """Page through an entry's transactions: ?limit=100&after=<next_after of the previous page>"""
+    try:
+        page = EntriesAPI.get_entry_transactions_page(
+            entry_id,
+            after=request.args.get('after'),
+            limit=request.args.get('limit', 100, type=int),
+        )
+        return jsonify(page), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@entries_bp.route('/api/entries/<entry_id>/transactions/<transaction_id>', methods=['GET'])
+@db_budget(max_ops=1)
+def check_membership(entry_id, transaction_id):
+    """200 if the entry holds the transaction, 404 otherwise"""
+    try:
+        if EntriesAPI.is_member(entry_id, transaction_id):
+            return jsonify({"member": True}), 200
+        return jsonify({"member": False}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@entries_bp.route('/api/entries/<entry_id>/transactions', methods=['POST'])
+def create_transaction_in_entry(entry_id):
+    """Create a transaction and add it to the entry in one request"""
+    try:
+        transaction_id = EntriesAPI.create_transaction_in_entry(entry_id, request.get_json())
+        if transaction_id is None:
+            return jsonify({"error": "Entry not found"}), 404
+            
+        return jsonify({"_id": transaction_id, "message": "Transaction created in entry successfully"}), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@entries_bp.route('/api/entries/<entry_id>/transactions/<transaction_id>/move', methods=['POST'])
+def move_transaction(entry_id, transaction_id):
+    """Move a transaction into this entry; {"from_entry_id": ...} limits the move to one source entry"""
+    try:
+        data = request.get_json(silent=True) or {}
+        moved = EntriesAPI.move_transaction(transaction_id, entry_id, data.get("from_entry_id"))
+        if not moved:
+            return jsonify({"error": "Entry not found"}), 404
+            
+        return jsonify({"message": "Transaction moved successfully"}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @entries_bp.route('/api/entries/<entry_id>/transactions/<transaction_id>', methods=['POST'])
 def add_transaction_to_entry(entry_id, transaction_id):
     """Add a transaction to an entry"""
@@ -127,6 +245,8 @@ def add_transaction_to_entry(entry_id, transaction_id):
             return jsonify({"error": "Entry not found"}), 404
             
         return jsonify({"message": "Transaction added to entry successfully"}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
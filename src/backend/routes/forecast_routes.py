@@ -0,0 +1,42 @@
+from flask import Blueprint, current_app, request, jsonify
+from api_clients.forecast_api import ForecastAPI
+
+forecast_bp = Blueprint('forecast', __name__)
+
+@forecast_bp.route('/api/forecasts', methods=['GET'])
+def get_forecasts():
+    """List cached decline fits; ?stale=true|false to filter"""
+    try:
+        stale = request.args.get('stale')
+        stale = None if stale is None else stale.lower() == 'true'
+        return jsonify(ForecastAPI.get_forecasts(stale)), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@forecast_bp.route('/api/forecasts/<property_id>', methods=['GET'])
+def get_forecast(property_id):
+    """Decline fit and monthly forecast for a property; ?months=60"""
+    try:
+        months = request.args.get('months', 60, type=int)
+        forecast = ForecastAPI.get_forecast(property_id, months)
+        if forecast is None:
+            return jsonify({"error": "No volume data for this property"}), 404
+        return jsonify(forecast), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@forecast_bp.route('/api/forecasts/fit', methods=['POST'])
+def fit_forecasts():
+    """Refit forecasts: {"property_ids": [...]} or {"all": true}; stale ones only by default"""
+    try:
+        data = request.get_json(silent=True) or {}
+        summary = ForecastAPI.fit_forecasts(
+            data.get('property_ids'),
+            stale_only=not data.get('all', False),
+            workers=current_app.config['FORECAST_WORKERS'],
+        )
+        return jsonify(summary), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,9 @@
+from flask import Blueprint, Response
+from metrics import registry
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Expose collected metrics in Prometheus text format"""
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
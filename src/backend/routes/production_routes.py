@@ -0,0 +1,61 @@
+from flask import Blueprint, request, jsonify
+import dates
+from api_clients.production_api import ProductionAPI
+
+production_bp = Blueprint('production', __name__)
+
+
+def _date_range():
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    return (dates.to_datetime(start_date, 'start_date') if start_date else None,
+            dates.to_datetime(end_date, 'end_date') if end_date else None)
+
+
+@production_bp.route('/api/production', methods=['POST'])
+def ingest_production():
+    """Bulk ingest daily volumes: {"readings": [{property_id, date, oil, gas, water}, ...]}"""
+    try:
+        data = request.get_json()
+        readings = data.get('readings') if isinstance(data, dict) else data
+        result = ProductionAPI.ingest_volumes(readings)
+        return jsonify(result), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@production_bp.route('/api/production/monthly', methods=['GET'])
+def get_monthly_production():
+    """Monthly totals for every property"""
+    try:
+        start, end = _date_range()
+        return jsonify(ProductionAPI.get_monthly_volumes(None, start, end)), 200
+    except ValueError:
+        return jsonify({"error": "Invalid date format. Use ISO format (YYYY-MM-DD)"}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@production_bp.route('/api/production/<property_id>', methods=['GET'])
+def get_property_production(property_id):
+    """Volumes for one property; ?interval=daily|monthly&start_date=...&end_date=..."""
+    try:
+        try:
+            start, end = _date_range()
+        except ValueError:
+            return jsonify({"error": "Invalid date format. Use ISO format (YYYY-MM-DD)"}), 400
+        interval = request.args.get('interval', 'daily')
+        return jsonify(ProductionAPI.get_volumes(property_id, interval, start, end)), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@production_bp.route('/api/production/<property_id>', methods=['DELETE'])
+def delete_property_production(property_id):
+    """Delete all production data for a property"""
+    try:
+        deleted = ProductionAPI.delete_volumes(property_id)
+        return jsonify({"message": f"Deleted {deleted} monthly buckets"}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
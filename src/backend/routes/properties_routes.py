@@ -0,0 +1,99 @@
+from flask import Blueprint, request, jsonify
+from api_clients.properties_api import PropertiesAPI
+from query_budget import db_budget
+from single_flight import coalesce
+
+properties_bp = Blueprint('properties', __name__)
+
+@properties_bp.route('/api/properties', methods=['GET'])
+@coalesce
+def get_properties():
+    try:
+        properties = PropertiesAPI.get_all_properties()
+        return jsonify(properties)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@properties_bp.route('/api/properties/by-state/<state>', methods=['GET'])
+def get_properties_by_state(state):
+    try:
+        return jsonify(PropertiesAPI.get_properties_by_state(state))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@properties_bp.route('/api/properties/near', methods=['GET'])
+def get_properties_near():
+    """Nearest properties: ?lng=...&lat=...&max_distance=meters&limit=20"""
+    try:
+        lng = request.args.get('lng', type=float)
+        lat = request.args.get('lat', type=float)
+        if lng is None or lat is None:
+            return jsonify({"error": "lng and lat are required"}), 400
+        properties = PropertiesAPI.get_properties_near(
+            lng, lat,
+            max_distance=request.args.get('max_distance', type=float),
+            limit=request.args.get('limit', 20, type=int),
+        )
+        return jsonify(properties)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@properties_bp.route('/api/properties/within', methods=['POST'])
+def get_properties_within():
+    """Properties inside {"polygon": GeoJSON Polygon or [[lng, lat], ...]}"""
+    try:
+        data = request.get_json(silent=True) or {}
+        if 'polygon' not in data:
+            return jsonify({"error": "polygon is required"}), 400
+        return jsonify(PropertiesAPI.get_properties_within(data['polygon'], data.get('limit', 1000)))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@properties_bp.route('/api/properties/<property_id>', methods=['GET'])
+@db_budget(max_ops=1)
+def get_property(property_id):
+    try:
+        property_data = PropertiesAPI.get_property(property_id)
+        if property_data:
+            return jsonify(property_data)
+        return jsonify({"error": "Property not found"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@properties_bp.route('/api/properties', methods=['POST'])
+def create_property():
+    try:
+        property_data = request.json
+        property_id = PropertiesAPI.create_property(property_data)
+        return jsonify({"id": property_id, "message": "Property created successfully"}), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@properties_bp.route('/api/properties/<property_id>', methods=['PUT'])
+def update_property(property_id):
+    try:
+        update_data = request.json
+        result = PropertiesAPI.update_property(property_id, update_data)
+        if result:
+            return jsonify({"message": "Property updated successfully"})
+        return jsonify({"error": "Property not found"}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@properties_bp.route('/api/properties/<property_id>', methods=['DELETE'])
+def delete_property(property_id):
+    try:
+        result = PropertiesAPI.delete_property(property_id)
+        if result:
+            return jsonify({"message": "Property deleted successfully"})
+        return jsonify({"error": "Property not found"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,21 @@
+from flask import Blueprint, request, jsonify
+from api_clients.search_api import SearchAPI
+
+search_bp = Blueprint('search', __name__)
+
+@search_bp.route('/api/search', methods=['GET'])
+def search():
+    """Full-text search: ?q=...&type=entries,companies&page=1&page_size=20"""
+    try:
+        collections = [name for name in request.args.get('type', '').split(',') if name]
+        results = SearchAPI.search(
+            request.args.get('q', ''),
+            collections or None,
+            page=request.args.get('page', 1, type=int),
+            page_size=request.args.get('page_size', 20, type=int),
+        )
+        return jsonify(results), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
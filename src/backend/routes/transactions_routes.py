@@ -0,0 +1,127 @@
+from flask import Blueprint, request, jsonify
+from api_clients.transactions_api import TransactionsAPI
+from query_budget import db_budget
+from expand import parse_expand, expand_references
+from single_flight import coalesce
+from utils import BulkValidationError
+import write_spool
+
+transactions_bp = Blueprint('transactions', __name__)
+
+@transactions_bp.route('/api/transactions', methods=['GET'])
+@coalesce
+def get_transactions():
+    """All transactions; ?expand=property,company adds property_name/company_name"""
+    try:
+        expansions = parse_expand(request.args.get('expand'))
+        transactions = TransactionsAPI.get_all_transactions()
+        return jsonify(expand_references(transactions, expansions))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@transactions_bp.route('/api/transactions/<transaction_id>', methods=['GET'])
+@db_budget(max_ops=3)
+def get_transaction(transaction_id):
+    try:
+        expansions = parse_expand(request.args.get('expand'))
+        transaction_data = TransactionsAPI.get_transaction(transaction_id)
+        if transaction_data:
+            return jsonify(expand_references([transaction_data], expansions)[0])
+        return jsonify({"error": "Transaction not found"}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@transactions_bp.route('/api/transactions', methods=['POST'])
+def create_transaction():
+    try:
+        data = request.get_json()
+        
+        # Validate required fields
+        required_fields = ['property_id', 'company_id', 'transaction_date', 'amount']
+        for field in required_fields:
+            if field not in data:
+                return jsonify({'error': f'Missing required field: {field}'}), 400
+                
+        # Validate amount is a number
+        try:
+            amount = float(data['amount'])
+        except (ValueError, TypeError):
+            return jsonify({'error': 'amount must be a valid number'}), 400
+            
+        # Create transaction
+        transaction_id = TransactionsAPI.create_transaction(data)
+        if write_spool.spooled():
+            # Journaled while the database is unreachable; written when it recovers
+            return jsonify({'_id': transaction_id, 'spooled': True}), 202
+        return jsonify({'_id': transaction_id}), 201
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@transactions_bp.route('/api/transactions/bulk-update', methods=['POST'])
+@db_budget(max_ops=6)
+def bulk_update_transactions():
+    """Update many transactions: {"updates": [{"_id": ..., "amount": 120.5}, ...]}"""
+    try:
+        data = request.get_json(silent=True) or {}
+        return jsonify(TransactionsAPI.bulk_update_transactions(data.get('updates'))), 200
+    except BulkValidationError as e:
+        return jsonify({'error': str(e), 'errors': e.errors}), 400
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@transactions_bp.route('/api/transactions/bulk-delete', methods=['POST'])
+def bulk_delete_transactions():
+    """Delete many transactions: {"ids": [...]}"""
+    try:
+        data = request.get_json(silent=True) or {}
+        return jsonify(TransactionsAPI.bulk_delete_transactions(data.get('ids'))), 200
+    except BulkValidationError as e:
+        return jsonify({'error': str(e), 'errors': e.errors}), 400
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@transactions_bp.route('/api/transactions/<transaction_id>', methods=['PUT'])
+def update_transaction(transaction_id):
+    try:
+        data = request.get_json()
+        
+        # Validate amount is a number if it's being updated
+        if 'amount' in data:
+            try:
+                amount = float(data['amount'])
+            except (ValueError, TypeError):
+                return jsonify({'error': 'amount must be a valid number'}), 400
+                
+        # Update transaction
+        result = TransactionsAPI.update_transaction(transaction_id, data)
+        if result == 0:
+            return jsonify({'error': 'Transaction not found'}), 404
+        if write_spool.spooled():
+            return jsonify({'message': 'Transaction update accepted', 'spooled': True}), 202
+        return jsonify({'message': 'Transaction updated successfully'}), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@transactions_bp.route('/api/transactions/<transaction_id>', methods=['DELETE'])
+def delete_transaction(transaction_id):
+    try:
+        result = TransactionsAPI.delete_transaction(transaction_id)
+        if result:
+            return jsonify({"message": "Transaction deleted successfully"})
+        return jsonify({"error": "Transaction not found"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,125 @@
+"""
+Single-flight coalescing of identical concurrent reads.
+
+When many clients ask for the same expensive read at once (a dozen dashboards
+opening GET /api/transactions together), only the first request runs it; the
+others wait for that one and get a copy of its serialized response, headers
+included. Routes opt in with @coalesce, keyed by method, path and query string:
+
+    @transactions_bp.route('/api/transactions', methods=['GET'])
+    @coalesce
+    def get_transactions(): ...
+
+Sharing happens at the response rather than at the *API methods, so waiting
+requests never share mutable documents (expand_references() edits them in
+place) and the result is serialized once, not once per caller. Only requests
+that overlap in time are merged: nothing is cached after the response is
+built, and any successful write request (POST/PUT/PATCH/DELETE) detaches the
+reads in flight, so requests arriving after a write start a fresh read.
+
+Disable with SINGLE_FLIGHT_ENABLED=false.
+"""
+import threading
+from functools import wraps
+from typing import Any, Callable, Hashable, Tuple
+from flask import current_app, request
+from config import Config
+from metrics import registry
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+_settings = {"enabled": Config.SINGLE_FLIGHT_ENABLED}
+
+single_flight_requests_total = registry.counter(
+    "single_flight_requests_total", "Coalesced route requests by role", ("route", "role"))
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class Group:
+    """Runs at most one call per key at a time; concurrent callers with the same key share its outcome."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn(), or wait for the call already running under key.
+
+        Returns:
+            Tuple[Any, bool]: fn()'s result and whether it came from another caller's call
+
+        Raises:
+            Exception: Whatever fn() raised, in every caller that shared the call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def forget(self):
+        """Detach the calls in flight: they finish for their current callers, new callers start new calls."""
+        with self._lock:
+            self._calls.clear()
+
+    def __len__(self):
+        return len(self._calls)
+
+
+_group = Group()
+
+
+def coalesce(view):
+    """Route decorator: identical concurrent requests share one execution and its response."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not _settings["enabled"]:
+            return view(*args, **kwargs)
+        key = (request.method, request.path, tuple(sorted(request.args.items(multi=True))))
+
+        def run():
+            response = current_app.make_response(view(*args, **kwargs))
+            return response.status_code, list(response.headers.items()), response.get_data()
+
+        (status, headers, body), shared = _group.do(key, run)
+        single_flight_requests_total.inc(request.url_rule.rule, "follower" if shared else "leader")
+        # Each caller gets its own copy of the view's headers (ETag, Cache-Control, ...);
+        # after_request hooks then add this request's own, such as X-Profile-Id
+        return current_app.response_class(body, status=status, headers=headers)
+    return wrapper
+
+
+def _forget_after_write(response):
+    if request.method in WRITE_METHODS and response.status_code < 400:
+        _group.forget()
+    return response
+
+
+def init_app(app):
+    _settings["enabled"] = app.config["SINGLE_FLIGHT_ENABLED"]
+    app.after_request(_forget_after_write)
@@ -0,0 +1,218 @@
+"""
+Slow-query log.
+
+A pymongo CommandListener times every read/write command. Commands slower than
+SLOW_QUERY_THRESHOLD_MS are handed to a background thread, which captures an
+explain() plan for reads and stores a record in the capped `slow_queries`
+collection. Filter values are redacted so only the query shape is kept. The
+memory backend has no explain, and an explain can fail on its own; either way
+the record is still stored, with the plan fields left None.
+
+Records look like:
+    {
+        "ts": datetime, "collection": "properties", "command": "find",
+        "shape": {"address.state": {"$regex": "?", "$options": "?"}},
+        "duration_ms": 412.5, "docs_returned": 3, "docs_examined": 120344,
+        "keys_examined": 0, "plan": ["COLLSCAN"]
+    }
+"""
+import logging
+import queue
+import threading
+from datetime import datetime
+from pymongo import monitoring
+from pymongo.errors import CollectionInvalid, PyMongoError
+import db
+from metrics import command_collection
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERIES_COLLECTION = "slow_queries"
+
+# Commands worth timing, and where each one keeps its filter
+_FILTER_FIELDS = {
+    "find": "filter",
+    "aggregate": "pipeline",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+    "update": "updates",
+    "delete": "deletes",
+}
+# Commands that explain() can run without side effects
+_EXPLAINABLE = {"find", "aggregate", "count", "distinct"}
+# Arguments copied into the explained command
+_EXPLAIN_ARGS = ("filter", "sort", "projection", "limit", "skip", "hint", "collation",
+                 "pipeline", "query", "key")
+
+_settings = {
+    "threshold_ms": 100.0,
+    "explain": True,
+    "capped_bytes": 10 * 1024 * 1024,
+    "collection_ready": False,
+}
+
+
+def redact(value):
+    """Replace every literal in a filter with "?", keeping field names and operators."""
+    if isinstance(value, dict):
+        return {key: redact(val) for key, val in value.items()}
+    if isinstance(value, (list, tuple)):
+        # Collapse lists of literals ($in arrays, etc.) to a single placeholder
+        redacted = [redact(item) for item in value]
+        if all(item == "?" for item in redacted):
+            return ["?"] if redacted else []
+        return redacted
+    return "?"
+
+
+def _docs_returned(command_name, reply):
+    if command_name in ("find", "aggregate"):
+        return len(reply.get("cursor", {}).get("firstBatch", []))
+    if command_name == "distinct":
+        return len(reply.get("values", []))
+    return reply.get("n")
+
+
+class SlowQueryListener(monitoring.CommandListener):
+    """Times commands and queues the slow ones for explain/recording."""
+
+    def __init__(self):
+        # (connection_id, request_id) -> started command
+        self._in_flight = {}
+        self._queue = queue.Queue(maxsize=1000)
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    def started(self, event):
+        if event.command_name not in _FILTER_FIELDS:
+            return
+        collection = command_collection(event)
+        if collection == SLOW_QUERIES_COLLECTION:
+            return
+        self._in_flight[(event.connection_id, event.request_id)] = (event.database_name, collection, event.command)
+
+    def succeeded(self, event):
+        started = self._in_flight.pop((event.connection_id, event.request_id), None)
+        if started is None:
+            return
+        duration_ms = event.duration_micros / 1000
+        if duration_ms < _settings["threshold_ms"]:
+            return
+        database_name, collection, command = started
+        record = {
+            "ts": datetime.now(),
+            "database": database_name,
+            "collection": collection,
+            "command": event.command_name,
+            "shape": redact(command.get(_FILTER_FIELDS[event.command_name])),
+            "duration_ms": round(duration_ms, 3),
+            "docs_returned": _docs_returned(event.command_name, event.reply),
+        }
+        self._enqueue(record, command)
+
+    def failed(self, event):
+        self._in_flight.pop((event.connection_id, event.request_id), None)
+
+    def _enqueue(self, record, command):
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((record, command))
+        except queue.Full:
+            logger.warning("Slow query queue full; dropping record for %s", record["collection"])
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._worker_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="slow-query-log", daemon=True)
+                    self._worker.start()
+
+    def _run(self):
+        while True:
+            record, command = self._queue.get()
+            record.update(docs_examined=None, keys_examined=None, plan=None)
+            if (_settings["explain"] and record["command"] in _EXPLAINABLE
+                    and db.get_backend() != "memory"):
+                try:
+                    record.update(explain(record["database"], record["command"], command))
+                except PyMongoError as e:
+                    logger.warning("Could not explain slow query on %s: %s", record["collection"], e)
+            try:
+                _ensure_capped_collection()
+                db.get_collection(SLOW_QUERIES_COLLECTION).insert_one(record)
+            except PyMongoError as e:
+                logger.warning("Could not record slow query on %s: %s", record["collection"], e)
+
+
+def explain(database_name: str, command_name: str, command: dict) -> dict:
+    """
+    Run explain with executionStats for a read command.
+
+    Returns:
+        dict: docs_examined, keys_examined and the winning plan's stage names
+    """
+    explained = {command_name: command[command_name]}
+    for arg in _EXPLAIN_ARGS:
+        if arg in command:
+            explained[arg] = command[arg]
+    if command_name == "aggregate":
+        explained["cursor"] = {}
+    result = db.get_client()[database_name].command(
+        {"explain": explained, "verbosity": "executionStats"}
+    )
+    stats = result.get("executionStats", {})
+    if not stats and result.get("stages"):
+        # Aggregations report stats inside their first ($cursor) stage
+        cursor_stage = result["stages"][0].get("$cursor", {})
+        stats = cursor_stage.get("executionStats", {})
+        result = cursor_stage
+    return {
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "plan": _plan_stages(result.get("queryPlanner", {}).get("winningPlan", {})),
+    }
+
+
+def _plan_stages(plan: dict) -> list:
+    # Flatten the winning plan into its stage names, outermost first
+    stages = []
+    while plan:
+        stages.append(plan.get("stage") or plan.get("queryPlan", {}).get("stage"))
+        plan = plan.get("inputStage") or plan.get("queryPlan", {}).get("inputStage")
+    return [stage for stage in stages if stage]
+
+
+def _ensure_capped_collection():
+    if _settings["collection_ready"]:
+        return
+    try:
+        db.get_db().create_collection(SLOW_QUERIES_COLLECTION, capped=True, size=_settings["capped_bytes"])
+    except CollectionInvalid:
+        # Already exists
+        pass
+    _settings["collection_ready"] = True
+
+
+def get_slow_queries(limit: int = 50, collection: str = None) -> list:
+    """
+    Most recent slow-query records, newest first.
+
+    Args:
+        limit (int): Maximum number of records to return
+        collection (str, optional): Only return records for this collection
+    """
+    query = {"collection": collection} if collection else {}
+    cursor = db.get_collection(SLOW_QUERIES_COLLECTION).find(query, {"_id": 0})
+    return list(cursor.sort("$natural", -1).limit(limit))
+
+
+listener = SlowQueryListener()
+
+
+def init_app(app):
+    """Apply the app's slow-query settings and register the listener on the clients."""
+    _settings["threshold_ms"] = app.config["SLOW_QUERY_THRESHOLD_MS"]
+    _settings["explain"] = app.config["SLOW_QUERY_EXPLAIN"]
+    _settings["capped_bytes"] = app.config["SLOW_QUERY_CAPPED_BYTES"]
+    db.add_event_listener(listener)
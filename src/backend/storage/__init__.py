@@ -0,0 +1,14 @@
+"""
+Storage backends behind db.get_collection().
+
+    mongo   pymongo against a real MongoDB deployment (the default)
+    memory  storage.memory, an in-process engine with the same collection API,
+            for hermetic tests and benchmarks
+
+Select one with the STORAGE_BACKEND setting or db.configure(backend=...).
+"""
+from storage.memory import AsyncMemoryCollection, MemoryClient, MemoryCollection, MemoryDatabase
+
+BACKENDS = ("mongo", "memory")
+
+__all__ = ["BACKENDS", "AsyncMemoryCollection", "MemoryClient", "MemoryCollection", "MemoryDatabase"]
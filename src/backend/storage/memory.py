@@ -0,0 +1,1408 @@
+"""
+In-memory storage engine with the subset of the pymongo Collection API the app uses.
+
+Documents live in per-collection dicts keyed by _id and are deep-copied on the
+way in and out, so callers see the same isolation they get from MongoDB.
+Supported:
+
+    filters   equality (including array membership), dotted paths, $eq $ne $gt
+              $gte $lt $lte $in $nin $exists $type (by alias) $regex/$options
+              $size $all $elemMatch $not $and $or $nor
+    updates   $set $unset $inc $mul $min $max $setOnInsert $push/$each
+              $addToSet/$each $pull, upserts
+    cursors   projection, sort, skip, limit
+    indexes   single and compound ascending/descending keys, unique; the first
+              key of an index is used to narrow equality and $in lookups
+    text      one text index per collection (weights supported) backed by an
+              inverted index; $text/$search with terms, "phrases" and -negation,
+              and {"$meta": "textScore"} in projections and sorts
+    geo       2dsphere indexes on GeoJSON points, bucketed into a degree grid;
+              $geoWithin ($geometry Polygon/MultiPolygon, $box, $polygon,
+              $centerSphere) and $near/$nearSphere with $geometry and
+              $minDistance/$maxDistance, nearest first. Polygon edges are
+              treated as straight lines in longitude/latitude, which only
+              differs from MongoDB's great-circle edges for very large shapes
+
+Results are pymongo's own result classes, so code written against MongoDB
+works unchanged. Every collection operation is published to the client's
+command listeners the way pymongo reports the command it would send (find,
+distinct, insert, update, findAndModify, ...; count_documents as aggregate,
+bulk_write as one command per run of writes of the same kind), so per-request
+budgets, metrics and the slow query log see the same operations as on MongoDB.
+"""
+import heapq
+import itertools
+import math
+import operator
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from bson import ObjectId
+from pymongo import ReturnDocument, monitoring
+from pymongo.errors import BulkWriteError, CollectionInvalid, DuplicateKeyError, OperationFailure
+from pymongo.results import BulkWriteResult, DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+_MISSING = object()
+
+
+def copy_doc(value):
+    """Deep copy for BSON-like values; scalars (str, ObjectId, datetime, ...) are immutable and shared."""
+    if isinstance(value, dict):
+        return {k: copy_doc(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [copy_doc(v) for v in value]
+    return value
+
+
+# ---------------------------------------------------------------------------
+# Field access
+# ---------------------------------------------------------------------------
+
+def get_path(doc, path):
+    """
+    Values at a dotted path. Arrays along the way fan out, like MongoDB, so
+    "items.name" on {"items": [{"name": "a"}, {"name": "b"}]} yields ["a", "b"].
+    Returns a list of candidate values (empty if the path is missing).
+    """
+    values = [doc]
+    for part in path.split("."):
+        next_values = []
+        for value in values:
+            if isinstance(value, dict):
+                if part in value:
+                    next_values.append(value[part])
+            elif isinstance(value, list):
+                if part.isdigit() and int(part) < len(value):
+                    next_values.append(value[int(part)])
+                else:
+                    next_values.extend(item[part] for item in value if isinstance(item, dict) and part in item)
+        values = next_values
+    return values
+
+
+def _set_path(doc, path, value):
+    parts = path.split(".")
+    target = doc
+    for part in parts[:-1]:
+        if isinstance(target, list):
+            target = target[int(part)]
+            continue
+        if part not in target or not isinstance(target[part], (dict, list)):
+            target[part] = {}
+        target = target[part]
+    if isinstance(target, list):
+        target[int(parts[-1])] = value
+    else:
+        target[parts[-1]] = value
+
+
+def _get_single(doc, path, default=_MISSING):
+    target = doc
+    for part in path.split("."):
+        if isinstance(target, dict) and part in target:
+            target = target[part]
+        elif isinstance(target, list) and part.isdigit() and int(part) < len(target):
+            target = target[int(part)]
+        else:
+            return default
+    return target
+
+
+def _unset_path(doc, path):
+    parts = path.split(".")
+    target = _get_single(doc, ".".join(parts[:-1])) if len(parts) > 1 else doc
+    if isinstance(target, dict):
+        target.pop(parts[-1], None)
+
+
+# ---------------------------------------------------------------------------
+# Ordering (MongoDB compares values of different types by type bracket)
+# ---------------------------------------------------------------------------
+
+def _type_rank(value):
+    if value is None or value is _MISSING:
+        return 1
+    if isinstance(value, bool):
+        return 8
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, str):
+        return 3
+    if isinstance(value, dict):
+        return 4
+    if isinstance(value, list):
+        return 5
+    if isinstance(value, ObjectId):
+        return 7
+    if isinstance(value, datetime):
+        return 9
+    return 10
+
+
+def sort_key(value):
+    rank = _type_rank(value)
+    if rank in (1,):
+        return (rank, 0)
+    if rank in (4, 5, 10):
+        return (rank, repr(value))
+    return (rank, value)
+
+
+def _comparable(a, b):
+    return _type_rank(a) == _type_rank(b) and _type_rank(a) not in (4, 5, 10)
+
+
+# ---------------------------------------------------------------------------
+# Query matching
+#
+# Filters are compiled once per query into nested closures; each predicate
+# takes the list of values found at a field path (see get_path).
+# ---------------------------------------------------------------------------
+
+_COMPARISONS = {"$gt": operator.gt, "$gte": operator.ge, "$lt": operator.lt, "$lte": operator.le}
+
+# $type aliases -> Python types (bool is checked before int, as it subclasses it)
+_BSON_TYPES = {
+    "double": float, "string": str, "object": dict, "array": list, "objectId": ObjectId,
+    "bool": bool, "date": datetime, "null": type(None), "int": int, "long": int, "number": (int, float),
+}
+
+
+def _regex(pattern, options=""):
+    if isinstance(pattern, re.Pattern):
+        return pattern
+    flags = 0
+    for option in options or "":
+        flags |= {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL, "x": re.VERBOSE}.get(option, 0)
+    return re.compile(pattern, flags)
+
+
+def _values_equal(value, expected):
+    if isinstance(expected, re.Pattern):
+        return isinstance(value, str) and expected.search(value) is not None
+    return value == expected and _type_rank(value) == _type_rank(expected)
+
+
+def _candidates(values):
+    # A field matches if it, or any element of an array it holds, matches
+    for value in values:
+        yield value
+        if isinstance(value, list):
+            yield from value
+
+
+def _compile_eq(expected):
+    if isinstance(expected, re.Pattern):
+        return _compile_regex(expected)
+    rank = _type_rank(expected)
+
+    def test(values):
+        if not values:
+            return expected is None
+        for value in values:
+            if value == expected and _type_rank(value) == rank:
+                return True
+            if isinstance(value, list) and any(v == expected and _type_rank(v) == rank for v in value):
+                return True
+        return False
+    return test
+
+
+def _compile_regex(pattern):
+    def test(values):
+        return any(isinstance(v, str) and pattern.search(v) for v in _candidates(values))
+    return test
+
+
+def _compile_comparison(compare, arg):
+    rank = _type_rank(arg)
+    if rank in (4, 5, 10):
+        return lambda values: False
+
+    def test(values):
+        for value in _candidates(values):
+            if _type_rank(value) == rank and compare(value, arg):
+                return True
+        return False
+    return test
+
+
+# ---------------------------------------------------------------------------
+# Geospatial
+# ---------------------------------------------------------------------------
+
+EARTH_RADIUS_METERS = 6378100.0
+
+
+def geo_point(value):
+    """(lng, lat) of a GeoJSON Point or legacy [lng, lat] pair, else None."""
+    if isinstance(value, dict) and value.get("type") == "Point":
+        value = value.get("coordinates")
+    if isinstance(value, (list, tuple)) and len(value) == 2 and all(isinstance(v, (int, float)) for v in value):
+        return float(value[0]), float(value[1])
+    return None
+
+
+def haversine(a, b) -> float:
+    """Great-circle distance in meters between two (lng, lat) points."""
+    lng1, lat1, lng2, lat2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * math.asin(min(1.0, math.sqrt(h)))
+
+
+def _in_ring(point, ring):
+    x, y = point
+    inside = False
+    for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+        if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+            inside = not inside
+    return inside
+
+
+def _in_polygon(point, rings):
+    # First ring is the shell, the rest are holes
+    return _in_ring(point, rings[0]) and not any(_in_ring(point, hole) for hole in rings[1:])
+
+
+def _bbox(points):
+    xs, ys = [p[0] for p in points], [p[1] for p in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _radius_bbox(center, meters):
+    dlat = math.degrees(meters / EARTH_RADIUS_METERS)
+    cos_lat = math.cos(math.radians(center[1]))
+    dlng = 180.0 if cos_lat < 1e-6 else min(180.0, dlat / cos_lat)
+    return center[0] - dlng, max(-90.0, center[1] - dlat), center[0] + dlng, min(90.0, center[1] + dlat)
+
+
+def geo_within(shape):
+    """(test(point), bounding box) for a $geoWithin argument."""
+    if "$geometry" in shape:
+        geometry = shape["$geometry"]
+        if geometry.get("type") == "Polygon":
+            polygons = [geometry["coordinates"]]
+        elif geometry.get("type") == "MultiPolygon":
+            polygons = geometry["coordinates"]
+        else:
+            raise OperationFailure("$geoWithin $geometry must be a Polygon or MultiPolygon", code=2)
+        polygons = [[[tuple(map(float, p)) for p in ring] for ring in polygon] for polygon in polygons]
+        return (lambda point: any(_in_polygon(point, rings) for rings in polygons),
+                _bbox([p for polygon in polygons for p in polygon[0]]))
+    if "$box" in shape:
+        (x1, y1), (x2, y2) = shape["$box"]
+        return (lambda point: x1 <= point[0] <= x2 and y1 <= point[1] <= y2), (x1, y1, x2, y2)
+    if "$polygon" in shape:
+        ring = [tuple(map(float, p)) for p in shape["$polygon"]]
+        return (lambda point: _in_ring(point, ring)), _bbox(ring)
+    if "$centerSphere" in shape:
+        center, radians = shape["$centerSphere"]
+        center, meters = tuple(center), radians * EARTH_RADIUS_METERS
+        return (lambda point: haversine(center, point) <= meters), _radius_bbox(center, meters)
+    raise NotImplementedError(f"$geoWithin shape {list(shape)} is not supported by the memory backend")
+
+
+def geo_near(arg, spec):
+    """(center, min meters, max meters or None) for a $near/$nearSphere condition."""
+    center = geo_point(arg.get("$geometry") if isinstance(arg, dict) else None)
+    if center is None:
+        raise NotImplementedError("The memory backend supports $near/$nearSphere with a GeoJSON $geometry only")
+    return (center, arg.get("$minDistance", spec.get("$minDistance", 0.0)),
+            arg.get("$maxDistance", spec.get("$maxDistance")))
+
+
+def _compile_geo(op, arg, spec):
+    if op == "$geoWithin":
+        inside, _ = geo_within(arg)
+    else:
+        center, nearest, farthest = geo_near(arg, spec)
+
+        def inside(point):
+            distance = haversine(center, point)
+            return distance >= nearest and (farthest is None or distance <= farthest)
+
+    def test(values):
+        for value in values:
+            point = geo_point(value)
+            if point is not None and inside(point):
+                return True
+        return False
+    return test
+
+
+def _compile_operator(op, arg, spec):
+    if op == "$eq":
+        return _compile_eq(arg)
+    if op == "$ne":
+        eq = _compile_eq(arg)
+        return lambda values: not eq(values)
+    if op in _COMPARISONS:
+        return _compile_comparison(_COMPARISONS[op], arg)
+    if op == "$in":
+        hashable = [v for v in arg if isinstance(v, (str, ObjectId)) and not isinstance(v, bool)]
+        if len(hashable) == len(arg):
+            members = set(arg)
+            return lambda values: any(isinstance(v, (str, ObjectId)) and v in members
+                                      for v in _candidates(values))
+        tests = [_compile_eq(v) for v in arg]
+        return lambda values: any(t(values) for t in tests)
+    if op == "$nin":
+        contains = _compile_operator("$in", arg, spec)
+        return lambda values: not contains(values)
+    if op == "$exists":
+        return lambda values: bool(values) == bool(arg)
+    if op == "$type":
+        aliases = arg if isinstance(arg, list) else [arg]
+        if any(alias not in _BSON_TYPES for alias in aliases):
+            raise NotImplementedError(f"$type {arg!r} is not supported by the memory backend")
+
+        def has_type(value, alias):
+            return (isinstance(value, _BSON_TYPES[alias])
+                    and (alias in ("bool", "array") or not isinstance(value, (bool, list))))
+        return lambda values: any(has_type(v, alias) for v in _candidates(values) for alias in aliases)
+    if op == "$regex":
+        return _compile_regex(_regex(arg, spec.get("$options")))
+    if op == "$options":
+        return lambda values: True
+    if op == "$size":
+        return lambda values: any(isinstance(v, list) and len(v) == arg for v in values)
+    if op == "$all":
+        tests = [_compile_eq(v) for v in arg]
+        return lambda values: all(t(values) for t in tests)
+    if op == "$elemMatch":
+        if all(key.startswith("$") for key in arg):
+            item_test = _compile_condition(arg)
+            return lambda values: any(item_test([item]) for v in values if isinstance(v, list) for item in v)
+        doc_test = compile_filter(arg)
+        return lambda values: any(isinstance(item, dict) and doc_test(item)
+                                  for v in values if isinstance(v, list) for item in v)
+    if op == "$not":
+        inner = _compile_condition(arg)
+        return lambda values: not inner(values)
+    if op in ("$geoWithin", "$near", "$nearSphere"):
+        return _compile_geo(op, arg, spec)
+    if op in ("$minDistance", "$maxDistance"):
+        return lambda values: True
+    raise NotImplementedError(f"Query operator {op} is not supported by the memory backend")
+
+
+def _compile_condition(condition):
+    if isinstance(condition, dict) and condition and all(key.startswith("$") for key in condition):
+        tests = [_compile_operator(op, arg, condition) for op, arg in condition.items()]
+        if len(tests) == 1:
+            return tests[0]
+        return lambda values: all(t(values) for t in tests)
+    return _compile_eq(condition)
+
+
+def _getter(path):
+    if "." not in path:
+        return lambda doc: [doc[path]] if path in doc else []
+    return lambda doc: get_path(doc, path)
+
+
+def _compile_clause(key, condition):
+    if key in ("$and", "$or", "$nor"):
+        subs = [compile_filter(sub) for sub in condition]
+        if key == "$and":
+            return lambda doc: all(s(doc) for s in subs)
+        if key == "$or":
+            return lambda doc: any(s(doc) for s in subs)
+        return lambda doc: not any(s(doc) for s in subs)
+    if key.startswith("$"):
+        raise NotImplementedError(f"Query operator {key} is not supported by the memory backend")
+    getter = _getter(key)
+    test = _compile_condition(condition)
+    return lambda doc: test(getter(doc))
+
+
+def compile_filter(query):
+    """Compile a MongoDB filter into a predicate taking a document."""
+    clauses = [_compile_clause(key, condition) for key, condition in (query or {}).items() if key != "$comment"]
+    if not clauses:
+        return lambda doc: True
+    if len(clauses) == 1:
+        return clauses[0]
+    return lambda doc: all(clause(doc) for clause in clauses)
+
+
+def match(doc, query) -> bool:
+    """True if `doc` matches the MongoDB filter `query`."""
+    return compile_filter(query)(doc)
+
+
+# ---------------------------------------------------------------------------
+# Projection and updates
+# ---------------------------------------------------------------------------
+
+def project(doc, projection):
+    if not projection:
+        return doc
+    if isinstance(projection, (list, tuple)):
+        projection = {field: 1 for field in projection}
+    include = {k: v for k, v in projection.items() if k != "_id" and v}
+    if include:
+        result = {}
+        if projection.get("_id", 1):
+            result["_id"] = doc.get("_id")
+        for path in include:
+            value = _get_single(doc, path)
+            if value is not _MISSING:
+                _set_path(result, path, value)
+        return result
+    result = copy_doc(doc)
+    for path, flag in projection.items():
+        if not flag:
+            _unset_path(result, path)
+    return result
+
+
+def _pull_matches(item, condition):
+    if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+        return _compile_condition(condition)([item])
+    if isinstance(condition, dict) and isinstance(item, dict):
+        return match(item, condition)
+    return _values_equal(item, condition)
+
+
+def apply_update(doc, update, is_insert=False):
+    """Apply update operators (or a replacement document) to `doc` in place."""
+    if not any(key.startswith("$") for key in update):
+        keep_id = doc.get("_id")
+        doc.clear()
+        doc.update(copy_doc(update))
+        if keep_id is not None:
+            doc["_id"] = keep_id
+        return
+    for op, fields in update.items():
+        for path, arg in fields.items():
+            current = _get_single(doc, path)
+            if op == "$set":
+                _set_path(doc, path, copy_doc(arg))
+            elif op == "$setOnInsert":
+                if is_insert:
+                    _set_path(doc, path, copy_doc(arg))
+            elif op == "$unset":
+                _unset_path(doc, path)
+            elif op == "$inc":
+                _set_path(doc, path, (0 if current in (_MISSING, None) else current) + arg)
+            elif op == "$mul":
+                _set_path(doc, path, (0 if current in (_MISSING, None) else current) * arg)
+            elif op == "$min":
+                if current is _MISSING or sort_key(arg) < sort_key(current):
+                    _set_path(doc, path, copy_doc(arg))
+            elif op == "$max":
+                if current is _MISSING or sort_key(arg) > sort_key(current):
+                    _set_path(doc, path, copy_doc(arg))
+            elif op in ("$push", "$addToSet"):
+                items = arg["$each"] if isinstance(arg, dict) and "$each" in arg else [arg]
+                array = [] if current in (_MISSING, None) else current
+                if not isinstance(array, list):
+                    raise ValueError(f"Cannot apply {op} to non-array field '{path}'")
+                for item in items:
+                    if op == "$push" or not any(_values_equal(existing, item) for existing in array):
+                        array.append(copy_doc(item))
+                _set_path(doc, path, array)
+            elif op == "$pull":
+                if isinstance(current, list):
+                    _set_path(doc, path, [item for item in current if not _pull_matches(item, arg)])
+            else:
+                raise NotImplementedError(f"Update operator {op} is not supported by the memory backend")
+
+
+def _upsert_seed(query):
+    # Equality conditions of the filter become fields of the inserted document
+    doc = {}
+    for key, condition in (query or {}).items():
+        if key.startswith("$"):
+            continue
+        if isinstance(condition, dict) and any(k.startswith("$") for k in condition):
+            if "$eq" in condition:
+                _set_path(doc, key, copy_doc(condition["$eq"]))
+            continue
+        _set_path(doc, key, copy_doc(condition))
+    return doc
+
+
+# ---------------------------------------------------------------------------
+# Indexes, cursors, collections
+# ---------------------------------------------------------------------------
+
+def _index_value(value):
+    # Hashable stand-in for an indexed value
+    if isinstance(value, (dict, list)):
+        return repr(value)
+    return value
+
+
+class MemoryIndex:
+    def __init__(self, name, keys, unique=False, sparse=False):
+        self.name = name
+        self.keys = keys
+        self.fields = [field for field, _ in keys]
+        self.unique = unique
+        self.sparse = sparse
+        # Value of the first key -> set of _ids
+        self.entries = {}
+        # Full key tuple -> _id, for unique indexes
+        self.unique_entries = {}
+
+    def _first_values(self, doc):
+        values = get_path(doc, self.fields[0])
+        flattened = list(_candidates(values)) if values else [None]
+        return {_index_value(v) for v in flattened}
+
+    def _unique_key(self, doc):
+        key = tuple(_index_value(_get_single(doc, field, None)) for field in self.fields)
+        if self.sparse and all(value is None for value in key):
+            return None
+        return key
+
+    def check(self, doc, ignore_id=None):
+        if not self.unique:
+            return
+        key = self._unique_key(doc)
+        if key is None:
+            return
+        owner = self.unique_entries.get(key)
+        if owner is not None and owner != ignore_id:
+            raise DuplicateKeyError(f"E11000 duplicate key error index: {self.name} dup key: {key}")
+
+    def add(self, doc):
+        for value in self._first_values(doc):
+            self.entries.setdefault(value, set()).add(doc["_id"])
+        if self.unique:
+            key = self._unique_key(doc)
+            if key is not None:
+                self.unique_entries[key] = doc["_id"]
+
+    def remove(self, doc):
+        for value in self._first_values(doc):
+            ids = self.entries.get(value)
+            if ids is not None:
+                ids.discard(doc["_id"])
+                if not ids:
+                    del self.entries[value]
+        if self.unique:
+            key = self._unique_key(doc)
+            if key is not None and self.unique_entries.get(key) == doc["_id"]:
+                del self.unique_entries[key]
+
+    def lookup(self, condition):
+        """Candidate _ids for a condition on the first key, or None if the index can't help."""
+        if isinstance(condition, dict) and any(k.startswith("$") for k in condition):
+            if set(condition) == {"$in"}:
+                ids = set()
+                for value in condition["$in"]:
+                    if isinstance(value, re.Pattern):
+                        return None
+                    ids |= self.entries.get(_index_value(value), set())
+                return ids
+            if set(condition) == {"$eq"}:
+                condition = condition["$eq"]
+            else:
+                return None
+        if isinstance(condition, (re.Pattern, dict, list)):
+            return None
+        return set(self.entries.get(_index_value(condition), set()))
+
+
+_STOP_WORDS = frozenset("a an and are as at be by for from in is it of on or the to with".split())
+_TOKEN = re.compile(r"[0-9a-z]+")
+
+
+def _stem(token):
+    # Just enough stemming that plurals match their singular
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    return [_stem(token) for token in _TOKEN.findall(str(text).lower()) if token not in _STOP_WORDS]
+
+
+def parse_text_search(search):
+    """Split a $search string into (terms, phrases, negated terms), like MongoDB."""
+    phrases = [phrase.lower() for phrase in re.findall(r'"([^"]+)"', search)]
+    terms, negated = [], []
+    for word in re.sub(r'"[^"]*"', " ", search).split():
+        if word.startswith("-"):
+            negated.extend(tokenize(word[1:]))
+        else:
+            terms.extend(tokenize(word))
+    return terms, phrases, negated
+
+
+class MemoryTextIndex:
+    """
+    Inverted index over the string fields of a text index. Scores follow
+    MongoDB's shape: per field, weight * (0.5 + 0.5 * term count / field tokens)
+    for each matched term.
+    """
+    unique = False
+
+    def __init__(self, name, keys, weights=None):
+        self.name = name
+        self.keys = keys
+        self.fields = [field for field, kind in keys if kind == "text"]
+        self.weights = {field: (weights or {}).get(field, 1) for field in self.fields}
+        # token -> set of _ids
+        self.postings = {}
+        # _id -> {field: (token counts, number of tokens)}
+        self.terms = {}
+
+    def _texts(self, doc):
+        return {field: " ".join(v for v in _candidates(get_path(doc, field)) if isinstance(v, str))
+                for field in self.fields}
+
+    def check(self, doc, ignore_id=None):
+        pass
+
+    def lookup(self, condition):
+        return None
+
+    def add(self, doc):
+        fields = {}
+        for field, text in self._texts(doc).items():
+            tokens = tokenize(text)
+            if not tokens:
+                continue
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+                self.postings.setdefault(token, set()).add(doc["_id"])
+            fields[field] = (counts, len(tokens))
+        self.terms[doc["_id"]] = fields
+
+    def remove(self, doc):
+        fields = self.terms.pop(doc["_id"], {})
+        for counts, _ in fields.values():
+            for token in counts:
+                ids = self.postings.get(token)
+                if ids is not None:
+                    ids.discard(doc["_id"])
+                    if not ids:
+                        del self.postings[token]
+
+    def search(self, search, docs):
+        """{_id: score} for documents matching the $search string."""
+        terms, phrases, negated = parse_text_search(search)
+        positive = set(terms)
+        for phrase in phrases:
+            positive.update(tokenize(phrase))
+        ids = set()
+        for token in positive:
+            ids |= self.postings.get(token, set())
+        scores = {}
+        for _id in ids:
+            fields = self.terms[_id]
+            if any(counts.get(token) for counts, _ in fields.values() for token in negated):
+                continue
+            if phrases:
+                text = " ".join(self._texts(docs[_id]).values()).lower()
+                if not all(phrase in text for phrase in phrases):
+                    continue
+            score = 0.0
+            for field, (counts, total) in fields.items():
+                for token in positive:
+                    if counts.get(token):
+                        score += self.weights[field] * (0.5 + 0.5 * counts[token] / total)
+            scores[_id] = score
+        return scores
+
+
+class MemoryGeoIndex:
+    """
+    2dsphere index over GeoJSON points, bucketed into CELL_DEGREES grid cells
+    so $geoWithin and bounded $near queries only look at nearby documents.
+    """
+    unique = False
+    CELL_DEGREES = 0.5
+    # Shapes covering more cells than this are cheaper to answer with a scan
+    MAX_CELLS = 4096
+
+    def __init__(self, name, keys):
+        self.name = name
+        self.keys = keys
+        self.fields = [field for field, _ in keys]
+        # (cell x, cell y) -> set of _ids
+        self.cells = {}
+
+    def _cell(self, point):
+        return int(math.floor(point[0] / self.CELL_DEGREES)), int(math.floor(point[1] / self.CELL_DEGREES))
+
+    def _doc_cells(self, doc):
+        points = (geo_point(value) for value in get_path(doc, self.fields[0]))
+        return {self._cell(point) for point in points if point is not None}
+
+    def check(self, doc, ignore_id=None):
+        for value in get_path(doc, self.fields[0]):
+            if value is not None and geo_point(value) is None:
+                raise OperationFailure(f"Can't extract geo keys from {value!r}", code=16755)
+
+    def add(self, doc):
+        for cell in self._doc_cells(doc):
+            self.cells.setdefault(cell, set()).add(doc["_id"])
+
+    def remove(self, doc):
+        for cell in self._doc_cells(doc):
+            ids = self.cells.get(cell)
+            if ids is not None:
+                ids.discard(doc["_id"])
+                if not ids:
+                    del self.cells[cell]
+
+    def lookup(self, condition):
+        if not isinstance(condition, dict):
+            return None
+        if "$geoWithin" in condition:
+            _, box = geo_within(condition["$geoWithin"])
+        else:
+            near = condition.get("$near", condition.get("$nearSphere"))
+            if near is None:
+                return None
+            center, _, farthest = geo_near(near, condition)
+            if farthest is None:
+                return None
+            box = _radius_bbox(center, farthest)
+        (x1, y1), (x2, y2) = self._cell(box[:2]), self._cell(box[2:])
+        if (x2 - x1 + 1) * (y2 - y1 + 1) > self.MAX_CELLS:
+            return None
+        ids = set()
+        for x in range(x1, x2 + 1):
+            for y in range(y1, y2 + 1):
+                ids |= self.cells.get((x, y), set())
+        return ids
+
+
+def _normalize_keys(keys, direction=1):
+    if isinstance(keys, str):
+        return [(keys, direction)]
+    if isinstance(keys, dict):
+        return list(keys.items())
+    return [(k, d) if isinstance(k, str) else tuple(k) for k, d in keys]
+
+
+def _normalize_sort(key_or_list, direction=None):
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction if direction is not None else 1)]
+    if isinstance(key_or_list, dict):
+        return list(key_or_list.items())
+    return list(key_or_list)
+
+
+# ---------------------------------------------------------------------------
+# Command events
+# ---------------------------------------------------------------------------
+
+_CONNECTION_ID = ("memory", 0)
+_request_ids = itertools.count(1)
+
+
+class MemoryCommandEvent:
+    """Stand-in for pymongo's CommandStarted/Succeeded/FailedEvent with the attributes listeners read."""
+
+    def __init__(self, command_name, command, database_name, request_id):
+        self.command_name = command_name
+        self.command = command
+        self.database_name = database_name
+        self.request_id = request_id
+        self.operation_id = request_id
+        self.connection_id = _CONNECTION_ID
+        self.duration_micros = 0
+        self.reply = None
+        self.failure = None
+
+
+def _bulk_runs(requests, ordered):
+    """Split bulk requests into the commands pymongo sends: runs of one kind, grouped by kind when unordered."""
+    kinds = {"InsertOne": "insert", "DeleteOne": "delete", "DeleteMany": "delete"}
+    runs = []
+    for i, request in enumerate(requests):
+        command_name = kinds.get(type(request).__name__, "update")
+        run = next((r for r in runs if r[0] == command_name), None) if not ordered else (
+            runs[-1] if runs and runs[-1][0] == command_name else None)
+        if run is None:
+            run = (command_name, [])
+            runs.append(run)
+        run[1].append((i, request))
+    return runs
+
+
+class MemoryCursor:
+    def __init__(self, collection, query, projection):
+        self._collection = collection
+        self._query = query
+        self._projection = projection
+        self._sort = None
+        self._skip = 0
+        self._limit = 0
+        self._results = None
+
+    def sort(self, key_or_list, direction=None):
+        self._sort = _normalize_sort(key_or_list, direction)
+        return self
+
+    def skip(self, count):
+        self._skip = count
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    @staticmethod
+    def _sort_spec(field, direction, scores):
+        """(key function, descending) for one sort field; {"$meta": "textScore"} sorts by score."""
+        if isinstance(direction, dict):
+            return (lambda d: scores.get(d["_id"], 0.0)), True
+        return (lambda d: sort_key(_get_single(d, field, None))), direction < 0
+
+    def _materialize(self):
+        if self._results is None:
+            options = {"projection": self._projection, "sort": self._sort, "skip": self._skip, "limit": self._limit}
+            with self._collection._command("find", filter=self._query,
+                                           **{k: v for k, v in options.items() if v}) as reply:
+                reply["cursor"] = {"firstBatch": self._find()}
+        return self._results
+
+    def _find(self):
+        scores = {}
+        docs = self._collection._matching(self._query, scores)
+        if self._limit and self._sort and len(self._sort) == 1 and self._sort[0][0] != "$natural":
+            # Top-k: no need to sort everything for a small page
+            key, descending = self._sort_spec(*self._sort[0], scores)
+            pick = heapq.nlargest if descending else heapq.nsmallest
+            docs = pick(self._skip + abs(self._limit), docs, key=key)
+            self._sort = None
+        for field, direction in reversed(self._sort or []):
+            if field == "$natural":
+                if direction < 0:
+                    docs.reverse()
+                continue
+            key, descending = self._sort_spec(field, direction, scores)
+            docs.sort(key=key, reverse=descending)
+        docs = docs[self._skip:]
+        if self._limit:
+            docs = docs[:abs(self._limit)]
+        projection = self._projection
+        meta = {}
+        if isinstance(projection, dict):
+            meta = {field: spec for field, spec in projection.items() if isinstance(spec, dict)}
+            projection = {field: spec for field, spec in projection.items() if field not in meta}
+        self._results = []
+        for doc in docs:
+            result = project(copy_doc(doc), projection)
+            for field in meta:
+                result[field] = scores.get(doc["_id"], 0.0)
+            self._results.append(result)
+        return self._results
+
+    def __iter__(self):
+        return iter(self._materialize())
+
+    def to_list(self, length=None):
+        results = self._materialize()
+        return list(results if length is None else results[:length])
+
+    def close(self):
+        pass
+
+
+class MemoryCollection:
+    def __init__(self, database, name):
+        self.database = database
+        self.name = name
+        self.full_name = f"{database.name}.{name}"
+        self._docs = {}
+        self._indexes = {}
+        self._lock = threading.RLock()
+        self.options = {}
+
+    # -- internals ---------------------------------------------------------
+
+    @contextmanager
+    def _command(self, command_name, **fields):
+        """
+        Publish the operation in the with-block to the command listeners as the
+        command pymongo would send; the block fills in the reply dict it's given.
+        """
+        listeners = self.database.command_listeners()
+        reply = {"ok": 1.0}
+        if not listeners:
+            yield reply
+            return
+        event = MemoryCommandEvent(command_name, {command_name: self.name, **fields},
+                                   self.database.name, next(_request_ids))
+        for listener in listeners:
+            listener.started(event)
+        started = time.perf_counter()
+        try:
+            yield reply
+        except Exception as e:
+            event.duration_micros = int((time.perf_counter() - started) * 1e6)
+            event.failure = {"ok": 0.0, "errmsg": str(e)}
+            for listener in listeners:
+                listener.failed(event)
+            raise
+        event.duration_micros = int((time.perf_counter() - started) * 1e6)
+        event.reply = reply
+        for listener in listeners:
+            listener.succeeded(event)
+
+    def _text_index(self):
+        for index in self._indexes.values():
+            if isinstance(index, MemoryTextIndex):
+                return index
+        raise OperationFailure("text index required for $text query", code=27)
+
+    def _matching(self, query, scores=None):
+        with self._lock:
+            if query and "$text" in query:
+                query = dict(query)
+                text_scores = self._text_index().search(query.pop("$text")["$search"], self._docs)
+                if scores is not None:
+                    scores.update(text_scores)
+                candidate_ids = set(text_scores)
+                narrowed = self._index_candidates(query)
+                if narrowed is not None:
+                    candidate_ids &= narrowed
+            else:
+                candidate_ids = self._index_candidates(query)
+            if candidate_ids is None:
+                docs = list(self._docs.values())
+            else:
+                docs = [self._docs[_id] for _id in self._docs if _id in candidate_ids]
+            predicate = compile_filter(query)
+            docs = [doc for doc in docs if predicate(doc)]
+            near = self._near(query)
+            if near is not None:
+                # $near returns nearest first
+                field, center = near
+                docs.sort(key=lambda doc: min(haversine(center, point) for point in
+                                              map(geo_point, get_path(doc, field)) if point is not None))
+            return docs
+
+    def _near(self, query):
+        """(field, center) of a $near/$nearSphere condition in the query, if any."""
+        for field, condition in (query or {}).items():
+            if isinstance(condition, dict) and ("$near" in condition or "$nearSphere" in condition):
+                if not any(isinstance(index, MemoryGeoIndex) and index.fields[0] == field
+                           for index in self._indexes.values()):
+                    raise OperationFailure("unable to find index for $geoNear query", code=291)
+                center, _, _ = geo_near(condition.get("$near", condition.get("$nearSphere")), condition)
+                return field, center
+        return None
+
+    def _index_candidates(self, query):
+        if not query:
+            return None
+        if "_id" in query:
+            condition = query["_id"]
+            if isinstance(condition, dict) and set(condition) == {"$in"}:
+                return set(condition["$in"])
+            if not isinstance(condition, dict):
+                return {condition}
+        best = None
+        for index in self._indexes.values():
+            field = index.fields[0]
+            if field in query:
+                ids = index.lookup(query[field])
+                if ids is not None and (best is None or len(ids) < len(best)):
+                    best = ids
+        return best
+
+    def _insert(self, doc):
+        doc = copy_doc(doc)
+        if "_id" not in doc:
+            doc["_id"] = ObjectId()
+        if doc["_id"] in self._docs:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.full_name} dup key: _id")
+        for index in self._indexes.values():
+            index.check(doc)
+        self._docs[doc["_id"]] = doc
+        for index in self._indexes.values():
+            index.add(doc)
+        return doc["_id"]
+
+    def _replace_stored(self, old, new):
+        for index in self._indexes.values():
+            index.check(new, ignore_id=old["_id"])
+        for index in self._indexes.values():
+            index.remove(old)
+        self._docs[new["_id"]] = new
+        for index in self._indexes.values():
+            index.add(new)
+
+    def _update(self, query, update, many, upsert, array_filters=None):
+        with self._lock:
+            docs = self._matching(query)
+            if not many:
+                docs = docs[:1]
+            modified = 0
+            for doc in docs:
+                new = copy_doc(doc)
+                apply_update(new, update)
+                if new != doc:
+                    self._replace_stored(doc, new)
+                    modified += 1
+            raw = {"n": len(docs), "nModified": modified, "ok": 1.0}
+            if not docs and upsert:
+                seed = _upsert_seed(query)
+                apply_update(seed, update, is_insert=True)
+                raw["upserted"] = self._insert(seed)
+                raw["n"] = 1
+            return raw
+
+    # -- writes ------------------------------------------------------------
+
+    def insert_one(self, document, **kwargs):
+        with self._command("insert", documents=[document]) as reply, self._lock:
+            inserted_id = self._insert(document)
+            reply["n"] = 1
+        document.setdefault("_id", inserted_id)
+        return InsertOneResult(inserted_id, True)
+
+    def insert_many(self, documents, ordered=True, **kwargs):
+        documents = list(documents)
+        inserted, errors = [], []
+        with self._command("insert", documents=documents, ordered=ordered) as reply, self._lock:
+            for i, document in enumerate(documents):
+                try:
+                    inserted_id = self._insert(document)
+                except DuplicateKeyError as e:
+                    errors.append({"index": i, "code": 11000, "errmsg": str(e), "op": document})
+                    if ordered:
+                        break
+                    continue
+                document.setdefault("_id", inserted_id)
+                inserted.append(inserted_id)
+            reply["n"] = len(inserted)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(inserted), "writeConcernErrors": [],
+                                  "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": []})
+        return InsertManyResult(inserted, True)
+
+    def _update_command(self, filter, update, many, upsert):
+        updates = [{"q": filter, "u": update, "multi": many, "upsert": upsert}]
+        with self._command("update", updates=updates) as reply:
+            raw = self._update(filter, update, many, upsert)
+            reply["n"] = raw["n"]
+        return UpdateResult(raw, True)
+
+    def update_one(self, filter, update, upsert=False, **kwargs):
+        return self._update_command(filter, update, False, upsert)
+
+    def update_many(self, filter, update, upsert=False, **kwargs):
+        return self._update_command(filter, update, True, upsert)
+
+    def replace_one(self, filter, replacement, upsert=False, **kwargs):
+        return self._update_command(filter, replacement, False, upsert)
+
+    def _delete(self, query, many):
+        with self._lock:
+            docs = self._matching(query)
+            if not many:
+                docs = docs[:1]
+            for doc in docs:
+                del self._docs[doc["_id"]]
+                for index in self._indexes.values():
+                    index.remove(doc)
+            return {"n": len(docs), "ok": 1.0}
+
+    def _delete_command(self, filter, many):
+        with self._command("delete", deletes=[{"q": filter, "limit": 0 if many else 1}]) as reply:
+            raw = self._delete(filter, many)
+            reply["n"] = raw["n"]
+        return DeleteResult(raw, True)
+
+    def delete_one(self, filter, **kwargs):
+        return self._delete_command(filter, False)
+
+    def delete_many(self, filter, **kwargs):
+        return self._delete_command(filter, True)
+
+    def find_one_and_update(self, filter, update, projection=None, sort=None, upsert=False,
+                            return_document=ReturnDocument.BEFORE, **kwargs):
+        with self._command("findAndModify", query=filter, update=update, upsert=upsert), self._lock:
+            docs = self._matching(filter)
+            if sort:
+                for field, direction in reversed(_normalize_sort(sort)):
+                    docs.sort(key=lambda d: sort_key(_get_single(d, field, None)), reverse=direction < 0)
+            if not docs:
+                if not upsert:
+                    return None
+                raw = self._update(filter, update, False, True)
+                if return_document == ReturnDocument.BEFORE:
+                    return None
+                return project(copy_doc(self._docs[raw["upserted"]]), projection)
+            before = docs[0]
+            after = copy_doc(before)
+            apply_update(after, update)
+            self._replace_stored(before, after)
+            result = after if return_document == ReturnDocument.AFTER else before
+            return project(copy_doc(result), projection)
+
+    def find_one_and_delete(self, filter, projection=None, **kwargs):
+        with self._command("findAndModify", query=filter, remove=True), self._lock:
+            docs = self._matching(filter)
+            if not docs:
+                return None
+            self._delete({"_id": docs[0]["_id"]}, False)
+            return project(docs[0], projection)
+
+    def bulk_write(self, requests, ordered=True, **kwargs):
+        """Apply pymongo InsertOne/UpdateOne/UpdateMany/ReplaceOne/DeleteOne/DeleteMany requests."""
+        totals = {"nInserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "nUpserted": 0,
+                  "upserted": [], "writeErrors": [], "writeConcernErrors": []}
+        for command_name, run in _bulk_runs(list(requests), ordered):
+            with self._command(command_name, ordered=ordered, n=len(run)) as reply:
+                self._bulk_run(run, ordered, totals)
+                reply["n"] = len(run)
+            if ordered and totals["writeErrors"]:
+                break
+        if totals["writeErrors"]:
+            totals["writeErrors"].sort(key=lambda error: error["index"])
+            raise BulkWriteError(totals)
+        return BulkWriteResult(totals, True)
+
+    def _bulk_run(self, run, ordered, totals):
+        for i, request in run:
+            kind = type(request).__name__
+            doc = getattr(request, "_doc", None)
+            filter_ = getattr(request, "_filter", None)
+            upsert = bool(getattr(request, "_upsert", False))
+            try:
+                if kind == "InsertOne":
+                    with self._lock:
+                        doc.setdefault("_id", self._insert(doc))
+                    totals["nInserted"] += 1
+                    continue
+                if kind in ("DeleteOne", "DeleteMany"):
+                    totals["nRemoved"] += self._delete(filter_, kind == "DeleteMany")["n"]
+                    continue
+                raw = self._update(filter_, doc, kind == "UpdateMany", upsert)
+            except DuplicateKeyError as e:
+                totals["writeErrors"].append({"index": i, "code": 11000, "errmsg": str(e)})
+                if ordered:
+                    return
+                continue
+            if "upserted" in raw:
+                totals["nUpserted"] += 1
+                totals["upserted"].append({"index": i, "_id": raw["upserted"]})
+            else:
+                totals["nMatched"] += raw["n"]
+                totals["nModified"] += raw["nModified"]
+
+    # -- reads -------------------------------------------------------------
+
+    def find(self, filter=None, projection=None, sort=None, skip=0, limit=0, **kwargs):
+        cursor = MemoryCursor(self, filter or {}, projection)
+        if sort:
+            cursor.sort(sort)
+        return cursor.skip(skip).limit(limit)
+
+    def find_one(self, filter=None, projection=None, **kwargs):
+        if filter is not None and not isinstance(filter, dict):
+            filter = {"_id": filter}
+        for doc in self.find(filter, projection, **kwargs).limit(1):
+            return doc
+        return None
+
+    def count_documents(self, filter, **kwargs):
+        # pymongo runs count_documents as an aggregation
+        pipeline = [{"$match": filter}, {"$group": {"_id": 1, "n": {"$sum": 1}}}]
+        with self._command("aggregate", pipeline=pipeline) as reply:
+            docs = self._matching(filter)
+            skip = kwargs.get("skip", 0)
+            limit = kwargs.get("limit", 0)
+            docs = docs[skip:]
+            count = len(docs[:limit] if limit else docs)
+            reply["cursor"] = {"firstBatch": [{"_id": 1, "n": count}]}
+        return count
+
+    def estimated_document_count(self, **kwargs):
+        with self._command("count") as reply:
+            reply["n"] = len(self._docs)
+        return reply["n"]
+
+    def distinct(self, key, filter=None, **kwargs):
+        with self._command("distinct", key=key, query=filter or {}) as reply:
+            values = []
+            for doc in self._matching(filter or {}):
+                for value in _candidates(get_path(doc, key)):
+                    if not isinstance(value, list) and not any(_values_equal(value, v) for v in values):
+                        values.append(value)
+            reply["values"] = values
+        return values
+
+    # -- indexes and admin -------------------------------------------------
+
+    def create_index(self, keys, unique=False, name=None, sparse=False, **kwargs):
+        keys = _normalize_keys(keys)
+        name = name or "_".join(f"{field}_{direction}" for field, direction in keys)
+        with self._command("createIndexes", indexes=[{"key": keys, "name": name}]), self._lock:
+            if name in self._indexes:
+                return name
+            if any(kind == "text" for _, kind in keys):
+                if any(isinstance(existing, MemoryTextIndex) for existing in self._indexes.values()):
+                    raise OperationFailure("only one text index per collection is allowed", code=85)
+                index = MemoryTextIndex(name, keys, kwargs.get("weights"))
+            elif any(kind == "2dsphere" for _, kind in keys):
+                index = MemoryGeoIndex(name, keys)
+            else:
+                index = MemoryIndex(name, keys, unique=unique, sparse=sparse)
+            for doc in self._docs.values():
+                index.check(doc)
+                index.add(doc)
+            self._indexes[name] = index
+        return name
+
+    def create_indexes(self, indexes, **kwargs):
+        return [self.create_index(model.document["key"], **{k: v for k, v in model.document.items()
+                                                            if k not in ("key",)}) for model in indexes]
+
+    def index_information(self):
+        info = {"_id_": {"key": [("_id", 1)]}}
+        for name, index in self._indexes.items():
+            info[name] = {"key": index.keys, "unique": index.unique}
+        return info
+
+    def drop_index(self, name):
+        self._indexes.pop(name, None)
+
+    def drop(self, **kwargs):
+        self.database.drop_collection(self.name)
+
+    def with_options(self, **kwargs):
+        return self
+
+
+class MemoryDatabase:
+    def __init__(self, name, event_listeners=None):
+        self.name = name
+        self._collections = {}
+        self._lock = threading.Lock()
+        self._event_listeners = event_listeners if event_listeners is not None else []
+
+    def command_listeners(self):
+        return [listener for listener in self._event_listeners if isinstance(listener, monitoring.CommandListener)]
+
+    def __getitem__(self, name) -> MemoryCollection:
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                collection = self._collections[name] = MemoryCollection(self, name)
+            return collection
+
+    def get_collection(self, name, **kwargs):
+        return self[name]
+
+    def create_collection(self, name, **options):
+        with self._lock:
+            if name in self._collections:
+                raise CollectionInvalid(f"collection {name} already exists")
+        collection = self[name]
+        collection.options = options
+        return collection
+
+    def list_collection_names(self, **kwargs):
+        return list(self._collections)
+
+    def drop_collection(self, name, **kwargs):
+        with self._lock:
+            self._collections.pop(name, None)
+
+    def command(self, command, *args, **kwargs):
+        name = command if isinstance(command, str) else next(iter(command))
+        if name == "ping":
+            return {"ok": 1.0}
+        # As mongod answers commands it doesn't know
+        raise OperationFailure(f"no such command: '{name}' (memory backend)", code=59)
+
+
+class MemoryClient:
+    """
+    Holds the in-memory databases for the process.
+
+    event_listeners is kept by reference, so listeners added to that list later
+    still receive the command events.
+    """
+
+    def __init__(self, event_listeners=None):
+        self._databases = {}
+        self._lock = threading.Lock()
+        self._event_listeners = event_listeners if event_listeners is not None else []
+
+    def __getitem__(self, name) -> MemoryDatabase:
+        with self._lock:
+            database = self._databases.get(name)
+            if database is None:
+                database = self._databases[name] = MemoryDatabase(name, self._event_listeners)
+            return database
+
+    def drop_database(self, name):
+        with self._lock:
+            self._databases.pop(name, None)
+
+    def close(self):
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Async facade, for the Async*API classes
+# ---------------------------------------------------------------------------
+
+class AsyncMemoryCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def sort(self, *args, **kwargs):
+        self._cursor.sort(*args, **kwargs)
+        return self
+
+    def skip(self, count):
+        self._cursor.skip(count)
+        return self
+
+    def limit(self, count):
+        self._cursor.limit(count)
+        return self
+
+    async def to_list(self, length=None):
+        return self._cursor.to_list(length)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self._cursor:
+            yield doc
+
+
+class AsyncMemoryCollection:
+    """Wraps a MemoryCollection so its methods can be awaited like AsyncCollection's."""
+
+    def __init__(self, collection: MemoryCollection):
+        self._collection = collection
+        self.name = collection.name
+
+    def find(self, *args, **kwargs):
+        return AsyncMemoryCursor(self._collection.find(*args, **kwargs))
+
+    def __getattr__(self, attr):
+        method = getattr(self._collection, attr)
+        if not callable(method):
+            return method
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
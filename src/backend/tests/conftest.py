@@ -0,0 +1,52 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+import db  # noqa: E402
+import indexes  # noqa: E402
+import query_cache  # noqa: E402
+import write_spool  # noqa: E402
+from benchmarks import datagen  # noqa: E402
+
+# Small enough to seed in well under a second, large enough that every route has data
+SEED_SIZES = {"properties": 10, "companies": 10, "transactions": 300, "months": 6}
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = create_app("testing")
+    with app.app_context():
+        db.reset_memory()
+        datagen.generate(db.get_db(), overrides=SEED_SIZES)
+        db.get_db()["accounts"].insert_one({"name": "Operating", "account_type": "checking",
+                                            "account_number": "0001", "status": "active", "balance": 100.0})
+        indexes.ensure_indexes()
+        yield app
+
+
+@pytest.fixture
+def client(app):
+    query_cache.clear()
+    return app.test_client()
+
+
+@pytest.fixture
+def database(app):
+    return db.get_db()
+
+
+@pytest.fixture
+def spool(tmp_path, monkeypatch, database):
+    monkeypatch.setitem(write_spool._settings, "enabled", True)
+    monkeypatch.setitem(write_spool._settings, "dir", str(tmp_path))
+    # The replay thread only runs when the tests call replay()
+    monkeypatch.setitem(write_spool._settings, "replay_seconds", 3600)
+    monkeypatch.setattr(write_spool, "_state", dict(write_spool._state, down_since=None, replayed=0,
+                                                    skipped=0, rejected=0, last_rejected=None))
+    monkeypatch.setattr(write_spool, "_journal", {"file": None, "path": None, "pending": 0})
+    yield tmp_path
+    if write_spool._journal["file"] is not None:
+        write_spool._journal["file"].close()
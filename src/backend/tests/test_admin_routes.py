@@ -0,0 +1,30 @@
+import pytest
+
+ADMIN_ENDPOINTS = [
+    ("get", "/api/admin/slow-queries"),
+    ("get", "/api/admin/write-coalescer"),
+    ("get", "/api/admin/write-spool"),
+    ("post", "/api/admin/write-spool/replay"),
+    ("get", "/api/admin/query-cache"),
+    ("post", "/api/admin/query-cache/clear"),
+    ("get", "/api/admin/profiles"),
+    ("get", "/api/admin/profiles/missing.json"),
+]
+
+
+@pytest.mark.parametrize("method,path", ADMIN_ENDPOINTS)
+@pytest.mark.parametrize("headers", [{}, {"X-Admin-Token": "wrong"}])
+def test_admin_endpoints_require_the_token(client, method, path, headers):
+    response = getattr(client, method)(path, headers=headers)
+    assert response.status_code == 403
+
+
+def test_admin_endpoints_answer_with_the_token(app, client):
+    response = client.get("/api/admin/query-cache", headers={"X-Admin-Token": app.config["ADMIN_TOKEN"]})
+    assert response.status_code == 200
+
+
+def test_admin_endpoints_are_closed_without_a_configured_token(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, "ADMIN_TOKEN", None)
+    response = client.get("/api/admin/query-cache", headers={"X-Admin-Token": ""})
+    assert response.status_code == 403
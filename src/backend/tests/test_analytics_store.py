@@ -0,0 +1,112 @@
+from collections import defaultdict
+
+import pytest
+from bson import ObjectId
+
+import analytics_store
+from analytics_store import TransactionStore
+
+
+@pytest.fixture
+def transactions(app, database):
+    # A private copy, so other tests' writes to transactions don't move the totals
+    collection = database["analytics_store_transactions"]
+    collection.delete_many({})
+    collection.insert_many(list(database["transactions"].find({})))
+    yield collection
+    collection.delete_many({})
+
+
+def _aggregate(collection, *fields):
+    """The reference totals: a plain pass over the collection, grouped like $group would."""
+    groups = defaultdict(lambda: {"amount_cents": 0, "count": 0})
+    for doc in collection.find({}):
+        key = tuple(doc["transaction_date"].strftime("%Y-%m") if field == "month" else doc.get(field)
+                    for field in fields)
+        groups[key]["amount_cents"] += round(float(doc["amount"]) * 100)
+        groups[key]["count"] += 1
+    return {key: (total["amount_cents"], total["count"]) for key, total in groups.items()}
+
+
+def _totals(store, by):
+    fields = [analytics_store.SOURCE_FIELDS.get(key, key) for key in by]
+    return {tuple(row[field] for field in fields): (round(row["amount"] * 100), row["count"])
+            for row in store.group_by(by)}
+
+
+@pytest.mark.parametrize("by, fields", [
+    (["property"], ["property_id"]),
+    (["company", "month"], ["company_id", "month"]),
+])
+def test_group_by_matches_the_collection(transactions, by, fields):
+    store = analytics_store.build(transactions)
+
+    assert _totals(store, by) == _aggregate(transactions, *fields)
+
+
+def test_group_by_filters(transactions):
+    store = analytics_store.build(transactions)
+    property_id = transactions.find_one({})["property_id"]
+    days = sorted(t["transaction_date"] for t in transactions.find({}))
+    start, end = days[len(days) // 4], days[len(days) // 2]
+
+    [row] = store.group_by([], property_id=property_id, start_date=start, end_date=end)
+
+    expected = [t for t in transactions.find({"property_id": property_id})
+                if start <= t["transaction_date"] <= end]
+    assert row["count"] == len(expected)
+    assert round(row["amount"] * 100) == sum(round(float(t["amount"]) * 100) for t in expected)
+
+
+def test_snapshot_reopens_memory_mapped_with_the_same_results(transactions, tmp_path):
+    store = analytics_store.build(transactions)
+    version = store.save(str(tmp_path))
+
+    opened = TransactionStore.open(str(tmp_path))
+
+    assert opened.snapshot == version
+    assert opened.stats()["segments"][0]["memory_mapped"] is True
+    assert opened.stats()["live_rows"] == store.stats()["live_rows"]
+    for by in (["property"], ["company", "month"], ["merchandise_type", "year"]):
+        assert opened.group_by(by) == store.group_by(by)
+    # Nothing new since the snapshot, so a refresh adds no rows
+    assert opened.refresh(transactions) == 0
+
+
+def test_open_without_a_snapshot_returns_none(tmp_path):
+    assert TransactionStore.open(str(tmp_path)) is None
+
+
+@pytest.mark.parametrize("from_snapshot", [False, True])
+def test_tombstones_hide_deleted_rows_after_refresh(transactions, tmp_path, from_snapshot):
+    store = analytics_store.build(transactions)
+    if from_snapshot:
+        store.save(str(tmp_path))
+        store = TransactionStore.open(str(tmp_path))
+    doc = transactions.find_one({})
+    added = dict(doc, _id=ObjectId(), amount=1000.25)
+    transactions.insert_one(added)
+    assert store.refresh(transactions) == 1
+    live_rows = store.stats()["live_rows"]
+
+    for deleted in (doc, added):
+        transactions.delete_one({"_id": deleted["_id"]})
+        assert store.delete(deleted["_id"]) is True
+    # The refresh re-reads recent _ids; the deleted ones are gone from the collection
+    store.refresh(transactions)
+
+    assert store.stats()["live_rows"] == live_rows - 2
+    assert _totals(store, ["property"]) == _aggregate(transactions, "property_id")
+    assert store.delete(doc["_id"]) is False
+
+
+def test_upsert_replaces_the_row_without_double_counting(transactions):
+    store = analytics_store.build(transactions)
+    doc = transactions.find_one({})
+    transactions.update_one({"_id": doc["_id"]}, {"$set": {"amount": 4321.5}})
+
+    store.upsert(transactions.find_one({"_id": doc["_id"]}))
+    store.refresh(transactions)
+
+    assert store.stats()["live_rows"] == transactions.count_documents({})
+    assert _totals(store, ["property"]) == _aggregate(transactions, "property_id")
@@ -0,0 +1,27 @@
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_CHILD = """
+import json, sys
+from app import create_app
+app = create_app("testing")
+print(json.dumps(sorted(name for name in ("numpy", "analytics_store", "decline") if name in sys.modules)))
+"""
+
+
+def test_create_app_leaves_numpy_modules_unimported():
+    # A fresh interpreter: the test session has long since imported everything
+    out = subprocess.run([sys.executable, "-c", _CHILD], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    assert json.loads(out.stdout.strip().splitlines()[-1]) == []
+
+
+def test_analytics_routes_import_the_store_on_first_use(client):
+    response = client.get("/api/analytics/group-by?by=property")
+
+    assert response.status_code == 200
+    assert response.get_json()
+    assert "analytics_store" in sys.modules
@@ -0,0 +1,56 @@
+import threading
+
+import autocomplete
+
+
+class _Collection:
+    """Stands in for a collection; on_find runs in the middle of the scan."""
+
+    def __init__(self, names, on_find=None):
+        self.docs = [{"_id": str(i), "name": name} for i, name in enumerate(names)]
+        self.on_find = on_find
+        self.finds = 0
+
+    def find(self, query, projection):
+        self.finds += 1
+        docs = list(self.docs)
+        if self.on_find is not None:
+            self.on_find()
+        return iter(docs)
+
+
+def _names(index, prefix):
+    return [match["name"] for match in index.search(prefix)]
+
+
+def test_writes_recorded_during_a_load_survive_the_swap():
+    index = autocomplete.PrefixIndex()
+    collection = _Collection(["Lone Star Petroleum", "Permian Holdings"])
+    index.load(collection)
+
+    def write_meanwhile():
+        collection.docs.append({"_id": "9", "name": "Pecos Energy"})
+        index.record(index.upsert, "9", "Pecos Energy")
+        index.record(index.delete, "1")
+
+    collection.on_find = write_meanwhile
+    index.load(collection)
+    assert _names(index, "pe") == ["Pecos Energy", "Lone Star Petroleum"]
+
+
+def test_stale_index_reloads_once_in_the_background():
+    index = autocomplete.PrefixIndex()
+    index.load(_Collection(["Lone Star Petroleum"]))
+    release = threading.Event()
+    collection = _Collection(["Lone Star Petroleum", "Pecos Energy"], on_find=release.wait)
+
+    for _ in range(5):
+        index.reload_in_background(collection)
+        # The old lists keep answering while the reload is blocked
+        assert _names(index, "pe") == ["Lone Star Petroleum"]
+    release.set()
+    reloads = [thread for thread in threading.enumerate() if thread.name == "autocomplete-reload"]
+    for thread in reloads:
+        thread.join(1)
+    assert collection.finds == 1
+    assert _names(index, "pe") == ["Pecos Energy", "Lone Star Petroleum"]
@@ -0,0 +1,122 @@
+import pytest
+from bson import ObjectId
+
+from api_clients import transactions_api
+
+
+@pytest.fixture
+def transaction_ids(database):
+    return [str(doc["_id"]) for doc in database["transactions"].find({}, {"_id": 1}).limit(3)]
+
+
+@pytest.fixture
+def entry_ids(client):
+    ids = []
+    for title in ("Bulk A", "Bulk B", "Bulk C"):
+        response = client.post("/api/entries", json={"title": title, "transaction_ids": [], "entry_date": "2024-01-31",
+                                                      "entry_type": "monthly", "status": "submitted"})
+        ids.append(response.get_json()["_id"])
+    return ids
+
+
+def _results(response):
+    body = response.get_json()
+    return [item["result"] for item in body["results"]], body["counts"]
+
+
+def test_invalid_items_reject_the_whole_transaction_update(client, database, transaction_ids):
+    before = database["transactions"].find_one({"_id": ObjectId(transaction_ids[0])})
+    response = client.post("/api/transactions/bulk-update", json={"updates": [
+        {"_id": transaction_ids[0], "amount": 1.0},
+        {"_id": "not-an-id", "amount": 2.0},
+        {"_id": transaction_ids[1], "amount": "lots"},
+        {"_id": transaction_ids[2]},
+    ]})
+    assert response.status_code == 400
+    errors = response.get_json()["errors"]
+    assert [error["index"] for error in errors] == [1, 2, 3]
+    assert errors[1]["id"] == transaction_ids[1] and "amount" in errors[1]["error"]
+    assert database["transactions"].find_one({"_id": ObjectId(transaction_ids[0])}) == before
+
+
+def test_transaction_update_reports_each_item(client, database, transaction_ids):
+    unchanged = database["transactions"].find_one({"_id": ObjectId(transaction_ids[1])})["amount"]
+    missing = str(ObjectId())
+    response = client.post("/api/transactions/bulk-update", json={"updates": [
+        {"_id": transaction_ids[0], "amount": 4321.0},
+        {"_id": missing, "amount": 1.0},
+        {"_id": transaction_ids[1], "amount": unchanged},
+    ]})
+    assert response.status_code == 200
+    results, counts = _results(response)
+    assert results == ["updated", "not_found", "unchanged"]
+    assert counts == {"updated": 1, "not_found": 1, "unchanged": 1}
+    assert response.get_json()["results"][1]["id"] == missing
+
+
+def test_transaction_delete_reports_each_item(client, database, transaction_ids):
+    missing = str(ObjectId())
+    response = client.post("/api/transactions/bulk-delete", json={"ids": [transaction_ids[0], missing]})
+    assert response.status_code == 200
+    assert _results(response) == (["deleted", "not_found"], {"deleted": 1, "not_found": 1})
+    assert database["transactions"].find_one({"_id": ObjectId(transaction_ids[0])}) is None
+
+    response = client.post("/api/transactions/bulk-delete", json={"ids": [transaction_ids[1], "bad", 7]})
+    assert response.status_code == 400
+    assert [error["index"] for error in response.get_json()["errors"]] == [1, 2]
+    assert database["transactions"].find_one({"_id": ObjectId(transaction_ids[1])})
+
+
+@pytest.mark.parametrize("body", [{}, {"ids": []}, {"ids": "abc"}])
+def test_bulk_delete_needs_a_list(client, body):
+    assert client.post("/api/transactions/bulk-delete", json=body).status_code == 400
+
+
+def test_bulk_size_is_capped(client):
+    ids = [str(ObjectId()) for _ in range(transactions_api.MAX_BULK_SIZE + 1)]
+    response = client.post("/api/transactions/bulk-delete", json={"ids": ids})
+    assert response.status_code == 400
+    assert "At most" in response.get_json()["error"]
+
+
+def test_entry_update_rejects_invalid_items(client, database, entry_ids):
+    response = client.post("/api/entries/bulk-update", json={"updates": [
+        {"_id": entry_ids[0], "status": "approved"},
+        {"_id": entry_ids[1], "status": "celebrated"},
+        {"_id": entry_ids[2], "transaction_count": 5},
+        {"_id": entry_ids[2], "transaction_ids": []},
+    ]})
+    assert response.status_code == 400
+    assert [error["index"] for error in response.get_json()["errors"]] == [1, 2, 3]
+    assert database["entries"].find_one({"_id": ObjectId(entry_ids[0])})["status"] == "submitted"
+
+
+def test_entry_update_and_delete_report_each_item(client, database, entry_ids):
+    missing = str(ObjectId())
+    response = client.post("/api/entries/bulk-update", json={"updates": [
+        {"_id": entry_ids[0], "status": "approved"},
+        {"_id": missing, "status": "approved"},
+        {"_id": entry_ids[1], "status": "submitted"},
+    ]})
+    assert response.status_code == 200
+    assert _results(response)[0] == ["updated", "not_found", "unchanged"]
+
+    response = client.post("/api/entries/bulk-delete", json={"ids": [entry_ids[2], missing, entry_ids[2]]})
+    assert response.status_code == 200
+    assert _results(response) == (["deleted", "not_found", "deleted"], {"deleted": 2, "not_found": 1})
+    assert database["entries"].find_one({"_id": ObjectId(entry_ids[2])}) is None
+
+
+def test_status_transition_reports_skipped_items(client, entry_ids):
+    client.post("/api/entries/bulk-update", json={"updates": [{"_id": entry_ids[1], "status": "draft"}]})
+    missing = str(ObjectId())
+    response = client.post("/api/entries/bulk-status", json={
+        "ids": [entry_ids[0], entry_ids[1], missing], "status": "approved", "from_status": "submitted"})
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [item["result"] for item in results] == ["transitioned", "skipped", "not_found"]
+    assert results[1]["current_status"] == "draft"
+
+    response = client.post("/api/entries/bulk-status", json={"ids": [entry_ids[0], "bad"], "status": "approved"})
+    assert response.status_code == 400
+    assert response.get_json()["errors"][0]["index"] == 1
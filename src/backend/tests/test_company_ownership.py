@@ -0,0 +1,62 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+import aio
+from api_clients.async_api import AsyncCompanyOwnershipAPI
+from api_clients.company_ownership_api import CompanyOwnershipAPI
+
+CREATE = {
+    "sync": CompanyOwnershipAPI.create_company_ownership,
+    "async": lambda data: aio.run(AsyncCompanyOwnershipAPI.create_company_ownership(data)),
+}
+
+
+@pytest.fixture
+def ownership(database):
+    return {
+        "company_id": str(database["companies"].find_one()["_id"]),
+        "property_id": str(database["properties"].find_one()["_id"]),
+        "interest_type": "royalty",
+        "percentage": 12.5,
+        "is_current_owner": False,
+        "date_from": "2020-01-01",
+        "date_to": "2021-06-30",
+    }
+
+
+@pytest.mark.parametrize("create", CREATE.values(), ids=CREATE.keys())
+def test_sync_and_async_create_store_the_same_document(database, ownership, create):
+    ownership_id = create(dict(ownership))
+
+    stored = database["company_ownership"].find_one({"_id": ObjectId(ownership_id)})
+    assert stored["date_from"] == datetime(2020, 1, 1)
+    assert stored["date_to"] == datetime(2021, 6, 30)
+    assert isinstance(stored["created_at"], datetime)
+    assert {k: stored[k] for k in ("company_id", "property_id", "interest_type", "percentage")} == \
+        {k: ownership[k] for k in ("company_id", "property_id", "interest_type", "percentage")}
+    database["company_ownership"].delete_one({"_id": stored["_id"]})
+
+
+@pytest.mark.parametrize("create", CREATE.values(), ids=CREATE.keys())
+@pytest.mark.parametrize("change, error", [
+    ({"company_id": str(ObjectId())}, "Company with ID"),
+    ({"property_id": str(ObjectId())}, "Property with ID"),
+    ({"percentage": 120}, "between 0 and 100"),
+    ({"date_to": None}, "date_to is mandatory"),
+])
+def test_sync_and_async_create_reject_the_same_input(database, ownership, create, change, error):
+    count = database["company_ownership"].count_documents({})
+
+    with pytest.raises(ValueError, match=error):
+        create(dict(ownership, **change))
+    assert database["company_ownership"].count_documents({}) == count
+
+
+def test_created_at_is_kept_when_given(ownership):
+    created_at = datetime(2019, 5, 1)
+
+    document = CompanyOwnershipAPI.ownership_document(dict(ownership, created_at=created_at), True, True)
+
+    assert document["created_at"] == created_at
@@ -0,0 +1,32 @@
+import pytest
+
+import dates
+
+
+@pytest.mark.parametrize("value", ["2023-03-01T00:00:00Z", "2023-03-01T01:00:00+01:00", "2023-03-01"])
+def test_to_datetime_returns_naive_utc(value):
+    parsed = dates.to_datetime(value)
+    assert parsed.tzinfo is None
+    assert (parsed.year, parsed.month, parsed.day, parsed.hour) == (2023, 3, 1, 0)
+
+
+@pytest.mark.parametrize("query", ["", "&interval=monthly"])
+def test_production_accepts_timezone_aware_bounds(client, database, query):
+    bucket = database["production"].find_one({})
+    month = bucket["month"].strftime("%Y-%m-%d")
+    response = client.get(f"/api/production/{bucket['property_id']}?start_date={month}T00:00:00Z"
+                          f"&end_date={month}T23:59:59%2B00:00{query}")
+    assert response.status_code == 200
+    assert response.get_json()
+
+
+def test_production_rejects_malformed_bounds(client, database):
+    bucket = database["production"].find_one({})
+    response = client.get(f"/api/production/{bucket['property_id']}?start_date=March")
+    assert response.status_code == 400
+
+
+def test_entries_date_range_accepts_timezone_aware_bounds(client):
+    response = client.get("/api/entries?start_date=2000-01-01T00:00:00Z&end_date=2100-01-01T00:00:00%2B00:00")
+    assert response.status_code == 200
+    assert isinstance(response.get_json(), list)
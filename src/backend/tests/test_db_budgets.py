@@ -0,0 +1,127 @@
+"""
+Run every route that declares a @db_budget against the memory backend.
+
+TestingConfig turns on DB_BUDGET_STRICT, so a request over its budget (or
+repeating one query shape past DB_N_PLUS_ONE_THRESHOLD) raises
+DbBudgetExceeded; the X-DB-Operations header is checked as well so a failure
+names the count.
+"""
+import pytest
+import query_budget
+
+
+def _ids(database):
+    entry = database["entries"].find_one({"transaction_count": {"$gt": 0}})
+    membership = database["entry_memberships"].find_one({"entry_id": entry["_id"]})
+    transactions = [doc["_id"] for doc in database["transactions"].find({}, {"_id": 1}).limit(20)]
+    return {
+        "account": database["accounts"].find_one()["_id"],
+        "company": database["companies"].find_one()["_id"],
+        "property": database["properties"].find_one()["_id"],
+        "ownership": database["company_ownership"].find_one()["_id"],
+        "entry": entry["_id"],
+        "member": membership["transaction_id"],
+        "transactions": transactions,
+        "entries": [doc["_id"] for doc in database["entries"].find({}, {"_id": 1}).limit(5)],
+    }
+
+
+def _requests(ids):
+    """(endpoint, method, url, json) for each budgeted route."""
+    transactions = [str(oid) for oid in ids["transactions"]]
+    entries = [str(oid) for oid in ids["entries"]]
+    requests = [
+        ("companies.get_company", "GET", f"/api/companies/{ids['company']}", None),
+        ("properties.get_property", "GET", f"/api/properties/{ids['property']}", None),
+        ("company_ownership.get_company_ownership", "GET",
+         f"/api/company-ownership/{ids['ownership']}?expand=property,company", None),
+        ("company_ownership.create_company_ownership", "POST", "/api/company-ownership", {
+            "company_id": str(ids["company"]), "property_id": str(ids["property"]), "interest_type": "royalty",
+            "percentage": 1.5, "is_current_owner": True, "date_from": "2024-01-01",
+        }),
+        ("dashboard.get_dashboard", "GET", "/api/dashboard", None),
+        ("entries.get_entry", "GET", f"/api/entries/{ids['entry']}?include_transactions=true&expand=property,company",
+         None),
+        ("entries.get_entry_transactions", "GET", f"/api/entries/{ids['entry']}/transactions?limit=50", None),
+        ("entries.check_membership", "GET", f"/api/entries/{ids['entry']}/transactions/{ids['member']}", None),
+        ("entries.bulk_update_entries", "POST", "/api/entries/bulk-update",
+         {"updates": [{"_id": oid, "description": "budget test"} for oid in entries]}),
+        ("entries.transition_entries_status", "POST", "/api/entries/bulk-status",
+         {"ids": entries, "status": "approved"}),
+        ("transactions.get_transaction", "GET", f"/api/transactions/{transactions[0]}?expand=property,company", None),
+        ("transactions.bulk_update_transactions", "POST", "/api/transactions/bulk-update",
+         {"updates": [{"_id": oid, "amount": 12.5, "merchandise_type": "natural_gas"} for oid in transactions]}),
+        ("batch.batch_get_transactions", "POST", "/api/transactions/batch-get", {"ids": transactions}),
+        ("batch.batch_get_entries", "POST", "/api/entries/batch-get", {"ids": entries}),
+        ("accounts.get_account", "GET", f"/api/accounts/{ids['account']}", None),
+    ]
+    return requests
+
+
+def _budgeted_endpoints(app):
+    return {endpoint for endpoint, view in app.view_functions.items() if getattr(view, "_db_budget", None)}
+
+
+def test_every_budgeted_route_is_exercised(app, database):
+    covered = {endpoint for endpoint, *_ in _requests(_ids(database))}
+    # batch_get is one view registered per collection; two of them stand for the rest
+    batch = {endpoint for endpoint in _budgeted_endpoints(app) if endpoint.startswith("batch.")}
+    missing = _budgeted_endpoints(app) - covered - batch
+    assert not missing, f"add a request for {sorted(missing)}"
+
+
+def test_routes_stay_within_their_budgets(app, client, database):
+    for endpoint, method, url, body in _requests(_ids(database)):
+        response = client.open(url, method=method, json=body)
+        assert response.status_code < 500, f"{endpoint}: {response.get_json()}"
+        max_ops, max_docs = app.view_functions[endpoint]._db_budget
+        ops = int(response.headers["X-DB-Operations"])
+        assert ops > 0, f"{endpoint}: no database operations were counted"
+        if max_ops is not None:
+            assert ops <= max_ops, f"{endpoint}: {ops} operations (budget {max_ops})"
+        if max_docs is not None:
+            assert int(response.headers["X-DB-Docs-Read"]) <= max_docs
+
+
+def test_over_budget_request_fails_in_strict_mode(app, database):
+    company = database["companies"].find_one()["_id"]
+    view = app.view_functions["companies.get_company"]
+    original = view._db_budget
+    view._db_budget = (0, None)
+    try:
+        with pytest.raises(query_budget.DbBudgetExceeded, match="budget 0"):
+            app.test_client().get(f"/api/companies/{company}")
+    finally:
+        view._db_budget = original
+
+
+def test_repeated_query_shape_is_reported_as_n_plus_one(app, database):
+    ids = [doc["_id"] for doc in database["transactions"].find({}, {"_id": 1}).limit(10)]
+    with app.test_request_context():
+        query_budget._begin_request()
+        try:
+            for oid in ids:
+                database["transactions"].find_one({"_id": oid})
+            usage = query_budget.current_usage()
+            problems = query_budget._violations(usage, None, app.config["DB_N_PLUS_ONE_THRESHOLD"])
+        finally:
+            query_budget._teardown()
+    assert usage.ops == len(ids)
+    assert usage.docs_read == len(ids)
+    assert any("possible N+1" in problem for problem in problems)
+
+
+@pytest.mark.parametrize("ordered, expected", [(True, 3), (False, 2)])
+def test_bulk_write_counts_one_command_per_run(app, database, ordered, expected):
+    from pymongo import InsertOne, UpdateOne
+    collection = database["budget_bulk"]
+    requests = [InsertOne({"n": 1}), UpdateOne({"n": 1}, {"$set": {"n": 2}}), InsertOne({"n": 3})]
+    with app.test_request_context():
+        query_budget._begin_request()
+        try:
+            collection.bulk_write(requests, ordered=ordered)
+            ops = query_budget.current_usage().ops
+        finally:
+            query_budget._teardown()
+    collection.drop()
+    assert ops == expected
@@ -0,0 +1,69 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+import decline
+
+QI, DI = 800.0, 0.08
+MONTHS = 24
+
+
+def _history(b, noise=0.0, seed=7):
+    """Two ramp-up months, then an Arps curve peaking at column 2, with one month missing."""
+    rates = decline.rate(QI, DI, b, np.arange(MONTHS))
+    if noise:
+        rates = rates * np.exp(np.random.default_rng(seed).normal(0, noise, MONTHS))
+    row = np.concatenate([[QI / 4, QI / 2], rates])
+    row[9] = np.nan
+    return row
+
+
+@pytest.mark.parametrize("b, model", [(0.0, "exponential"), (0.5, "hyperbolic"), (1.0, "harmonic")])
+def test_fit_matrix_recovers_known_arps_parameters(b, model):
+    fit = decline.fit_matrix(np.vstack([_history(b)]))
+
+    assert decline.MODELS[fit["model"][0]] == model
+    assert fit["qi"][0] == pytest.approx(QI)
+    assert fit["di"][0] == pytest.approx(DI)
+    assert fit["b"][0] == pytest.approx(b)
+    assert fit["peak"][0] == 2
+    assert fit["points"][0] == MONTHS - 1
+    assert fit["rmse"][0] == pytest.approx(0, abs=1e-9)
+
+
+def test_fit_matrix_fits_each_row_independently():
+    rows = np.vstack([_history(0.0), _history(0.5, noise=0.02), _history(1.0, noise=0.02)])
+
+    fit = decline.fit_matrix(rows)
+
+    assert (fit["model"] >= 0).all()
+    assert fit["b"][0] == 0.0
+    for row in (1, 2):
+        assert fit["qi"][row] == pytest.approx(QI, rel=0.05)
+        assert fit["di"][row] == pytest.approx(DI, rel=0.15)
+        assert fit["rmse"][row] < 0.05
+
+
+def test_fit_matrix_rejects_too_few_points_and_rising_rates():
+    sparse = np.full(MONTHS, np.nan)
+    sparse[:decline.MIN_POINTS - 1] = [500, 400]
+    rising = np.linspace(100, 900, MONTHS)
+    rising[-1] = 1000
+
+    fit = decline.fit_matrix(np.vstack([sparse, rising, np.full(MONTHS, np.nan)]))
+
+    assert fit["model"].tolist() == [-1, -1, -1]
+
+
+def test_forecast_continues_the_fitted_curve():
+    [params] = decline.fit_histories({"p": {datetime(2020, month, 1): float(q)
+                                            for month, q in enumerate(decline.rate(QI, DI, 0.5, range(12)), 1)}}).values()
+
+    forecast = decline.forecast(params, 3)
+
+    assert params["last_month"] == datetime(2020, 12, 1)
+    assert [month["month"] for month in forecast] == [datetime(2021, m, 1) for m in (1, 2, 3)]
+    expected = decline.rate(QI, DI, 0.5, [12, 13, 14])
+    assert [month["rate"] for month in forecast] == pytest.approx(expected, rel=1e-6)
+    assert forecast[0]["oil"] == pytest.approx(expected[0] * 31, rel=1e-6)
@@ -0,0 +1,81 @@
+import pytest
+from bson import ObjectId
+from pymongo.errors import ServerSelectionTimeoutError
+
+import entry_totals
+import write_spool
+from api_clients import transactions_api
+
+
+@pytest.fixture
+def make_entry(client):
+    def make(title="Totals"):
+        response = client.post("/api/entries", json={"title": title, "transaction_ids": [], "entry_date": "2024-01-31",
+                                                     "entry_type": "monthly", "status": "draft"})
+        assert response.status_code == 201
+        return response.get_json()["_id"]
+    return make
+
+
+@pytest.fixture
+def transaction_data(database):
+    transaction = database["transactions"].find_one({})
+    return {"property_id": transaction["property_id"], "company_id": transaction["company_id"],
+            "transaction_date": "2024-01-15", "merchandise_type": "crude_oil", "barrels_of_oil": 10}
+
+
+def _entry(database, entry_id):
+    return database["entries"].find_one({"_id": ObjectId(entry_id)})
+
+
+def _assert_totals(database, entry_id, count, amount):
+    entry = _entry(database, entry_id)
+    assert entry["transaction_count"] == count
+    assert entry["totals"]["amount"] == pytest.approx(amount)
+    assert entry_totals.verify(database, entry_ids=[ObjectId(entry_id)])["drifted"] == []
+
+
+def test_totals_follow_create_update_move_and_delete(client, database, make_entry, transaction_data):
+    source, target = make_entry("Source"), make_entry("Target")
+    response = client.post(f"/api/entries/{source}/transactions", json=dict(transaction_data, amount=100))
+    assert response.status_code == 201
+    transaction_id = response.get_json()["_id"]
+    _assert_totals(database, source, 1, 100)
+
+    assert client.put(f"/api/transactions/{transaction_id}", json={"amount": 250}).status_code == 200
+    _assert_totals(database, source, 1, 250)
+
+    assert client.post(f"/api/entries/{target}/transactions/{transaction_id}/move").status_code == 200
+    _assert_totals(database, source, 0, 0)
+    _assert_totals(database, target, 1, 250)
+
+    assert client.delete(f"/api/transactions/{transaction_id}").status_code == 200
+    _assert_totals(database, target, 0, 0)
+
+
+def test_adding_an_unknown_transaction_is_rejected(client, database, make_entry):
+    entry_id = make_entry()
+    response = client.post(f"/api/entries/{entry_id}/transactions/{ObjectId()}")
+    assert response.status_code == 400
+    _assert_totals(database, entry_id, 0, 0)
+
+
+def test_totals_count_a_create_that_was_spooled(client, database, make_entry, transaction_data, spool,
+                                                 monkeypatch):
+    def down(doc):
+        raise ServerSelectionTimeoutError("simulated outage")
+    insert = transactions_api._insert
+    monkeypatch.setattr(transactions_api, "_insert", down)
+
+    entry_id = make_entry()
+    response = client.post(f"/api/entries/{entry_id}/transactions", json=dict(transaction_data, amount=75))
+    assert response.status_code == 201
+    transaction_id = ObjectId(response.get_json()["_id"])
+    assert database["transactions"].find_one({"_id": transaction_id}) is None
+    entry = _entry(database, entry_id)
+    assert (entry["transaction_count"], entry["totals"]["amount"]) == (1, 75)
+
+    monkeypatch.setattr(transactions_api, "_insert", insert)
+    write_spool.replay()
+    assert database["transactions"].find_one({"_id": transaction_id})
+    _assert_totals(database, entry_id, 1, 75)
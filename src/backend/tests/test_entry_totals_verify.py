@@ -0,0 +1,35 @@
+from bson import ObjectId
+
+import entry_totals
+from api_clients.entries_api import EntriesAPI
+
+
+def _entry_with_members(database):
+    transaction_ids = [str(doc["_id"]) for doc in database["transactions"].find({}, {"_id": 1}).limit(4)]
+    return ObjectId(EntriesAPI.create_entry({"title": "Drift", "transaction_ids": transaction_ids,
+                                             "entry_date": "2024-02-29", "entry_type": "monthly",
+                                             "status": "draft"}))
+
+
+def test_verify_cli_finds_and_repairs_drift(database, capsys):
+    entry_id = _entry_with_members(database)
+    expected = database["entries"].find_one({"_id": entry_id})
+    database["entries"].update_one({"_id": entry_id}, {"$inc": {"totals.amount": 1000, "transaction_count": 1}})
+
+    report = entry_totals.main(["verify"])
+    assert str(entry_id) in report["drifted"] and report["repaired"] == 0
+    assert str(entry_id) in capsys.readouterr().out
+
+    report = entry_totals.main(["verify", "--repair"])
+    assert str(entry_id) in report["drifted"] and report["repaired"] >= 1
+    repaired = database["entries"].find_one({"_id": entry_id})
+    assert repaired["transaction_count"] == expected["transaction_count"]
+    assert abs(repaired["totals"]["amount"] - expected["totals"]["amount"]) < entry_totals.TOLERANCE
+
+    assert str(entry_id) not in entry_totals.main(["verify"])["drifted"]
+
+
+def test_rounding_noise_isnt_drift(database):
+    entry_id = _entry_with_members(database)
+    database["entries"].update_one({"_id": entry_id}, {"$inc": {"totals.amount": entry_totals.TOLERANCE / 10}})
+    assert entry_totals.verify(database, entry_ids=[entry_id])["drifted"] == []
@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+import decline
+from api_clients.forecast_api import ForecastAPI, forecasts_collection
+from api_clients.production_api import ProductionAPI
+
+FIRST_DAY = datetime(2030, 1, 1)
+
+
+@pytest.fixture
+def property_id(app, database):
+    """A property whose only volume data is the declining production ingested here."""
+    property_id = ObjectId()
+    database["properties"].insert_one({"_id": property_id, "name": "Forecast Test Lease"})
+    property_id = str(property_id)
+    _ingest(property_id, [FIRST_DAY + timedelta(days=day) for day in range(0, 365, 5)])
+    yield property_id
+    database["production"].delete_many({"property_id": property_id})
+    forecasts_collection.delete_many({"property_id": property_id})
+    database["properties"].delete_one({"_id": ObjectId(property_id)})
+
+
+def _ingest(property_id, days):
+    readings = [{"property_id": property_id, "date": day.strftime("%Y-%m-%d"),
+                 "oil": float(decline.rate(600, 0.1, 0, (day - FIRST_DAY).days / 30.4))}
+                for day in days]
+    return ProductionAPI.ingest_volumes(readings)
+
+
+def _cached(property_id):
+    return forecasts_collection.find_one({"property_id": property_id}, {"_id": 0})
+
+
+def test_get_forecast_fits_and_caches(property_id):
+    forecast = ForecastAPI.get_forecast(property_id, months=6)
+
+    assert forecast["source"] == "production"
+    assert forecast["model"] == "exponential"
+    assert forecast["di"] == pytest.approx(0.1, rel=0.1)
+    assert len(forecast["forecast"]) == 6
+    assert forecast["forecast"][0]["month"] == datetime(2031, 1, 1)
+    assert _cached(property_id)["stale"] is False
+
+
+def test_production_ingest_marks_the_forecast_stale(property_id):
+    ForecastAPI.get_forecast(property_id)
+    fitted_at = _cached(property_id)["fitted_at"]
+
+    _ingest(property_id, [datetime(2031, 1, 3)])
+
+    cached = _cached(property_id)
+    assert cached["stale"] is True
+    assert cached["stale_since"] >= fitted_at
+    assert property_id in [f["property_id"] for f in ForecastAPI.get_forecasts(stale=True)]
+
+    # The next read refits with the new month included
+    forecast = ForecastAPI.get_forecast(property_id)
+    assert forecast["stale"] is False
+    assert forecast["last_month"] == datetime(2031, 1, 1)
+
+
+def test_deleting_production_marks_the_forecast_stale(property_id):
+    ForecastAPI.get_forecast(property_id)
+
+    ProductionAPI.delete_volumes(property_id)
+
+    assert _cached(property_id)["stale"] is True
+
+
+def test_fresh_forecasts_are_skipped_unless_stale(property_id):
+    ForecastAPI.fit_forecasts([property_id], stale_only=False)
+
+    assert ForecastAPI.fit_forecasts([property_id]) == {"fitted": 0, "not_fittable": 0,
+                                                        "invalidated_during_fit": 0}
+    _ingest(property_id, [datetime(2030, 6, 2)])
+    assert ForecastAPI.fit_forecasts([property_id])["fitted"] == 1
+
+
+def test_a_write_during_the_fit_keeps_the_forecast_stale(property_id, monkeypatch):
+    ForecastAPI.get_forecast(property_id)
+    _ingest(property_id, [datetime(2031, 1, 3)])
+    fit_histories = decline.fit_histories
+
+    def ingest_while_fitting(*args, **kwargs):
+        _ingest(property_id, [datetime(2031, 1, 4)])
+        return fit_histories(*args, **kwargs)
+
+    monkeypatch.setattr(decline, "fit_histories", ingest_while_fitting)
+    summary = ForecastAPI.fit_forecasts([property_id])
+
+    assert summary["invalidated_during_fit"] == 1
+    assert _cached(property_id)["stale"] is True
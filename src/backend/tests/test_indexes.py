@@ -0,0 +1,22 @@
+import pytest
+
+import indexes
+
+
+def test_missing_text_index_is_reported_with_the_fix(database):
+    collection = database["unindexed"]
+    collection.insert_one({"title": "Lease"})
+    with pytest.raises(indexes.MissingIndexError, match="python -m indexes"):
+        with indexes.required("unindexed", "search"):
+            list(collection.find({"$text": {"$search": "lease"}}))
+
+
+def test_other_failures_pass_through(database):
+    with pytest.raises(ValueError):
+        with indexes.required("unindexed", "search"):
+            raise ValueError("not an index problem")
+
+
+def test_search_runs_on_the_startup_indexes(client):
+    response = client.get("/api/search?q=oil")
+    assert response.status_code == 200
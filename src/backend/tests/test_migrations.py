@@ -0,0 +1,59 @@
+import pytest
+from bson import ObjectId
+
+import migrations
+
+
+def _legacy_entry(database, transaction_ids):
+    # As entries were stored before entry_memberships: the members in an array, no totals
+    return database["entries"].insert_one({"title": "Legacy", "entry_type": "monthly", "status": "draft",
+                                           "transaction_ids": transaction_ids}).inserted_id
+
+
+def test_entry_memberships_moves_the_array_into_memberships(database):
+    transactions = list(database["transactions"].find({}, {"amount": 1}).limit(3))
+    entry_id = _legacy_entry(database, [doc["_id"] for doc in transactions])
+
+    report = migrations.run("entry_memberships")
+    assert report["entries"] >= 1
+
+    entry = database["entries"].find_one({"_id": entry_id})
+    assert "transaction_ids" not in entry
+    assert entry["transaction_count"] == 3
+    assert abs(entry["totals"]["amount"] - sum(float(doc["amount"]) for doc in transactions)) < 0.01
+    members = {doc["transaction_id"] for doc in database["entry_memberships"].find({"entry_id": entry_id})}
+    assert members == {doc["_id"] for doc in transactions}
+
+
+def test_entry_memberships_can_run_twice(database):
+    transaction_ids = [doc["_id"] for doc in database["transactions"].find({}, {"_id": 1}).limit(2)]
+    entry_id = _legacy_entry(database, transaction_ids)
+    # Interrupted after writing one membership, before unsetting the array
+    database["entry_memberships"].insert_one({"entry_id": entry_id, "transaction_id": transaction_ids[0]})
+
+    migrations.run("entry_memberships")
+    first = database["entries"].find_one({"_id": entry_id})
+    assert migrations.run("entry_memberships") == {"entries": 0, "memberships": 0}
+    assert database["entries"].find_one({"_id": entry_id}) == first
+    assert database["entry_memberships"].count_documents({"entry_id": entry_id}) == 2
+
+
+def test_property_areas_fills_in_missing_and_stale_areas(database):
+    properties = database["properties"]
+    missing = properties.insert_one({"name": "No Area", "address": {"state": "texas",
+                                                                   "county": "Midland County"}}).inserted_id
+    stale = properties.insert_one({"name": "Moved", "address": {"state": "NM", "county": "Lea"},
+                                   "area": {"state": "TX", "county": "lea"}}).inserted_id
+
+    report = migrations.run("property_areas")
+
+    assert report["properties"] >= 2
+    assert properties.find_one({"_id": missing})["area"] == {"state": "TX", "county": "midland"}
+    assert properties.find_one({"_id": stale})["area"] == {"state": "NM", "county": "lea"}
+    assert migrations.run("property_areas") == {"properties": 0}
+    properties.delete_many({"_id": {"$in": [missing, stale]}})
+
+
+def test_unknown_migration_is_rejected():
+    with pytest.raises(ValueError, match="Unknown migration"):
+        migrations.run(str(ObjectId()))
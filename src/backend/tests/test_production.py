@@ -0,0 +1,83 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+
+@pytest.fixture
+def property_id(app, database):
+    """A property with no production yet, so bucket counts start from zero."""
+    property_id = ObjectId()
+    database["properties"].insert_one({"_id": property_id, "name": "Production Test Lease"})
+    yield str(property_id)
+    database["production"].delete_many({"property_id": str(property_id)})
+    database["properties"].delete_one({"_id": property_id})
+
+
+def _ingest(client, readings):
+    return client.post("/api/production", json={"readings": readings})
+
+
+def test_readings_across_a_month_boundary_write_two_buckets(client, database, property_id):
+    response = _ingest(client, [
+        {"property_id": property_id, "date": "2030-01-30", "oil": 10.0},
+        {"property_id": property_id, "date": "2030-01-31", "oil": 11.0, "gas": 3.0},
+        {"property_id": property_id, "date": "2030-02-01", "oil": 12.0},
+    ])
+
+    assert response.status_code == 201
+    assert response.get_json() == {"readings": 3, "buckets": 2, "buckets_created": 2}
+    buckets = {b["month"]: b["days"] for b in database["production"].find({"property_id": property_id})}
+    assert buckets == {
+        datetime(2030, 1, 1): {"30": {"oil": 10.0}, "31": {"oil": 11.0, "gas": 3.0}},
+        datetime(2030, 2, 1): {"01": {"oil": 12.0}},
+    }
+    monthly = client.get(f"/api/production/{property_id}?interval=monthly").get_json()
+    assert [(m["oil"], m["days_reported"]) for m in monthly] == [(21.0, 2), (12.0, 1)]
+
+
+def test_reingesting_a_day_overwrites_instead_of_adding(client, database, property_id):
+    _ingest(client, [{"property_id": property_id, "date": "2030-03-05", "oil": 10.0, "water": 2.0},
+                     {"property_id": property_id, "date": "2030-03-06", "oil": 9.0}])
+
+    response = _ingest(client, [{"property_id": property_id, "date": "2030-03-05", "oil": 15.0}])
+
+    assert response.get_json() == {"readings": 1, "buckets": 1, "buckets_created": 0}
+    assert database["production"].count_documents({"property_id": property_id}) == 1
+    daily = client.get(f"/api/production/{property_id}").get_json()
+    # Only the volumes in the new reading change; the day's water and the next day stay
+    assert [(d["oil"], d["water"]) for d in daily] == [(15.0, 2.0), (9.0, 0.0)]
+    monthly = client.get(f"/api/production/{property_id}?interval=monthly").get_json()
+    assert monthly[0]["oil"] == 24.0
+
+
+def test_the_same_day_twice_in_one_request_keeps_the_last_reading(client, database, property_id):
+    response = _ingest(client, [{"property_id": property_id, "date": "2030-04-01", "oil": 1.0},
+                                {"property_id": property_id, "date": "2030-04-01T00:00:00Z", "oil": 2.0}])
+
+    assert response.get_json()["buckets"] == 1
+    assert database["production"].find_one({"property_id": property_id})["days"] == {"01": {"oil": 2.0}}
+
+
+@pytest.mark.parametrize("reading, error", [
+    ({"date": "2030-01-01", "oil": 1.0}, "mandatory"),
+    ({"date": "2030-01-01"}, "at least one of"),
+    ({"date": "2030-01-01", "oil": -1.0}, "cannot be negative"),
+    ({"date": "January", "oil": 1.0}, "date"),
+])
+def test_invalid_readings_are_rejected_without_writing(client, database, property_id, reading, error):
+    if error != "mandatory":
+        reading = dict(reading, property_id=property_id)
+
+    response = _ingest(client, [reading])
+
+    assert response.status_code == 400
+    assert error in response.get_json()["error"]
+    assert database["production"].count_documents({"property_id": property_id}) == 0
+
+
+def test_unknown_property_is_rejected(client):
+    response = _ingest(client, [{"property_id": str(ObjectId()), "date": "2030-01-01", "oil": 1.0}])
+
+    assert response.status_code == 400
+    assert "Properties not found" in response.get_json()["error"]
@@ -0,0 +1,76 @@
+import time
+
+import pytest
+
+import query_cache
+from api_clients.transactions_api import TransactionsAPI
+
+GENERATION = ("transactions",)
+
+
+@pytest.fixture
+def property_id(app, database):
+    query_cache.clear()
+    return database["transactions"].find_one({})["property_id"]
+
+
+def _stats():
+    stats = query_cache.stats()
+    return stats["hits"], stats["misses"]
+
+
+def _read(property_id):
+    return {str(t["_id"]): t for t in TransactionsAPI.get_transactions_by_property(property_id)}
+
+
+def _create(property_id, database):
+    company_id = database["transactions"].find_one({})["company_id"]
+    return TransactionsAPI.create_transaction({"property_id": property_id, "company_id": company_id,
+                                               "transaction_date": "2024-03-01", "amount": 12.5})
+
+
+@pytest.mark.parametrize("write", ["create", "update", "delete"])
+def test_a_write_drops_the_cached_reads_of_its_collection(property_id, database, write):
+    transaction_id = _create(property_id, database)
+    before = _read(property_id)
+    hits, misses = _stats()
+    assert _read(property_id) == before
+    assert _stats() == (hits + 1, misses)
+
+    generation = query_cache._cache.generation(GENERATION)
+    if write == "create":
+        transaction_id = _create(property_id, database)
+    elif write == "update":
+        TransactionsAPI.update_transaction(transaction_id, {"amount": 99.0})
+    else:
+        TransactionsAPI.delete_transaction(transaction_id)
+    assert query_cache._cache.generation(GENERATION) != generation
+
+    hits, misses = _stats()
+    after = _read(property_id)
+    assert _stats() == (hits, misses + 1)
+    if write == "create":
+        assert transaction_id in after and transaction_id not in before
+    elif write == "update":
+        assert after[transaction_id]["amount"] == 99.0
+    else:
+        assert transaction_id not in after
+
+
+def test_entries_expire_after_the_ttl(property_id, monkeypatch):
+    monkeypatch.setitem(query_cache._settings, "ttl_seconds", 0.05)
+    _read(property_id)
+    _read(property_id)
+    expirations = query_cache.stats()["expirations"]
+    hits, misses = _stats()
+    time.sleep(0.06)
+    _read(property_id)
+    assert _stats() == (hits, misses + 1)
+    assert query_cache.stats()["expirations"] == expirations + 1
+
+
+def test_a_read_overlapping_a_write_isnt_stored(property_id):
+    generation = query_cache._cache.generation(GENERATION)
+    query_cache.invalidate("transactions")
+    query_cache._cache.put("stale", ["result"], GENERATION, generation)
+    assert query_cache._cache.get("stale") is None
@@ -0,0 +1,24 @@
+import asyncio
+import threading
+
+import aio
+import request_profiler
+
+
+async def _wait_on_loop():
+    await asyncio.sleep(0.05)
+
+
+def test_sampler_follows_the_handler_onto_the_aio_loop():
+    sampler = request_profiler.StackSampler(threading.get_ident(), 0.002)
+    sampler.start()
+    try:
+        aio.run(_wait_on_loop())
+    finally:
+        sampler.stop()
+    assert sampler.loop_samples > 0
+    loop_stacks = [stack for stack in sampler.stacks if ";aio-loop;" in stack]
+    assert loop_stacks
+    # The handler's own frames come first, then the loop thread's
+    assert all(stack.index("aio.py:run") < stack.index(";aio-loop;") for stack in loop_stacks)
+    assert not aio.is_waiting(threading.get_ident())
@@ -0,0 +1,120 @@
+import threading
+
+import pytest
+from flask import Flask, jsonify
+
+import single_flight
+from api_clients.transactions_api import TransactionsAPI
+
+
+class _CountingEvent(threading.Event):
+    def __init__(self):
+        super().__init__()
+        self.waiters = 0
+
+    def wait(self, timeout=None):
+        self.waiters += 1
+        return super().wait(timeout)
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """The in-flight calls created while the test runs; their done events count waiting followers."""
+    created = []
+
+    class Call(single_flight._Call):
+        def __init__(self):
+            super().__init__()
+            self.done = _CountingEvent()
+            created.append(self)
+
+    monkeypatch.setitem(single_flight._settings, "enabled", True)
+    monkeypatch.setattr(single_flight, "_Call", Call)
+    return created
+
+
+def _wait_for_follower(calls):
+    """Called from inside the leader's view: block until the other request waits on its call."""
+    for _ in range(500):
+        if calls and calls[0].done.waiters:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("the second request never joined the call in flight")
+
+
+def _concurrently(app, url, count=2):
+    responses = [None] * count
+
+    def get(i):
+        responses[i] = app.test_client().get(url)
+
+    threads = [threading.Thread(target=get, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    return responses
+
+
+def test_identical_concurrent_requests_make_one_backend_call(app, calls, monkeypatch):
+    backend_calls = []
+    get_all_transactions = TransactionsAPI.get_all_transactions
+
+    def slow_get_all_transactions():
+        backend_calls.append(threading.get_ident())
+        _wait_for_follower(calls)
+        return get_all_transactions()
+
+    monkeypatch.setattr(TransactionsAPI, "get_all_transactions", staticmethod(slow_get_all_transactions))
+
+    first, second = _concurrently(app, "/api/transactions?expand=property")
+
+    assert len(backend_calls) == 1
+    assert len(calls) == 1
+    assert first.status_code == second.status_code == 200
+    assert first.get_data() == second.get_data()
+    assert len(first.get_json()) > 0
+
+
+def test_followers_get_the_leaders_headers(calls):
+    coalesced = Flask(__name__)
+
+    @coalesced.route("/report")
+    @single_flight.coalesce
+    def report():
+        _wait_for_follower(calls)
+        return jsonify({"total": 1}), 200, {"ETag": '"v1"', "Cache-Control": "max-age=30",
+                                             "X-Report-Version": "7"}
+
+    responses = _concurrently(coalesced, "/report")
+
+    assert len(calls) == 1
+    for response in responses:
+        assert response.status_code == 200
+        assert response.headers["ETag"] == '"v1"'
+        assert response.headers["Cache-Control"] == "max-age=30"
+        assert response.headers["X-Report-Version"] == "7"
+        assert response.mimetype == "application/json"
+        assert response.headers["Content-Length"] == str(len(response.get_data()))
+
+
+def test_calls_after_forget_do_not_join_the_detached_one(calls):
+    group = single_flight._group
+    key = ("GET", "/api/transactions", ())
+    started = threading.Event()
+    release = threading.Event()
+
+    def leader():
+        started.set()
+        release.wait(10)
+        return "old"
+
+    thread = threading.Thread(target=group.do, args=(key, leader))
+    thread.start()
+    started.wait(10)
+    group.forget()
+
+    assert group.do(key, lambda: "new") == ("new", False)
+    release.set()
+    thread.join(10)
+    assert len(group) == 0
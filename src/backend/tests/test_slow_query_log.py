@@ -0,0 +1,19 @@
+import time
+
+import slow_query_log
+
+
+def test_slow_query_is_recorded_on_the_memory_backend(database, monkeypatch):
+    monkeypatch.setitem(slow_query_log._settings, "threshold_ms", 0.0)
+    database["properties"].find_one({"name": "Nowhere"})
+
+    deadline = time.monotonic() + 2
+    records = []
+    while not records and time.monotonic() < deadline:
+        records = slow_query_log.get_slow_queries(collection="properties")
+        time.sleep(0.01)
+    assert records
+    record = records[0]
+    assert record["command"] == "find"
+    assert record["shape"] == {"name": "?"}
+    assert record["plan"] is None
@@ -0,0 +1,67 @@
+import threading
+import time
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+import write_coalescer
+
+
+def _submit_concurrently(coalescer, docs):
+    results = [None] * len(docs)
+
+    def submit(i):
+        try:
+            results[i] = coalescer.submit(docs[i], timeout=5)
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(len(docs))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_inserts_share_one_insert_many(database):
+    coalescer = write_coalescer.WriteCoalescer("coalesced", max_batch=100, max_delay_ms=300)
+    docs = [{"n": i} for i in range(8)]
+    results = _submit_concurrently(coalescer, docs)
+    assert results == [doc["_id"] for doc in docs]
+    stats = coalescer.stats()
+    assert (stats["flushes"], stats["largest_batch"], stats["errors"]) == (1, 8, 0)
+    assert database["coalesced"].count_documents({"_id": {"$in": results}}) == 8
+    coalescer.close()
+
+
+def test_duplicate_key_fails_only_its_own_request(database):
+    taken = database["coalesced_dup"].insert_one({"n": -1}).inserted_id
+    coalescer = write_coalescer.WriteCoalescer("coalesced_dup", max_batch=100, max_delay_ms=300)
+    docs = [{"n": 0}, {"_id": taken, "n": 1}, {"n": 2}]
+    results = _submit_concurrently(coalescer, docs)
+    assert isinstance(results[1], DuplicateKeyError)
+    assert results[0] == docs[0]["_id"] and results[2] == docs[2]["_id"]
+    assert coalescer.stats()["flushes"] == 1
+    coalescer.close()
+
+
+def test_queued_inserts_are_flushed_on_shutdown(database, monkeypatch):
+    monkeypatch.setattr(write_coalescer, "_coalescers", {})
+    # Long enough that only the shutdown can flush it within the test
+    monkeypatch.setitem(write_coalescer._settings, "max_delay_ms", 60_000)
+    coalescer = write_coalescer.get_coalescer("coalesced_exit")
+    doc = {"_id": ObjectId()}
+    waiter = threading.Thread(target=coalescer.submit, args=(doc, 5))
+    waiter.start()
+    while not coalescer.stats()["pending"]:
+        time.sleep(0.001)
+
+    started = time.perf_counter()
+    write_coalescer.shutdown()
+    waiter.join(1)
+    assert time.perf_counter() - started < 1 and not waiter.is_alive()
+    assert database["coalesced_exit"].find_one({"_id": doc["_id"]})
+    # Later inserts don't wait for a flusher that's gone
+    assert coalescer.submit({"n": 1}, timeout=1)
@@ -0,0 +1,101 @@
+import os
+from datetime import datetime, timedelta
+
+from bson import ObjectId, json_util
+from pymongo.errors import ServerSelectionTimeoutError
+
+import write_spool
+
+
+def _down(*args):
+    raise ServerSelectionTimeoutError("simulated outage")
+
+
+def _orphan(directory, records, name="spool-999999.jsonl"):
+    # A journal left by a process that exited: nobody holds its lock
+    path = os.path.join(directory, name)
+    with open(path, "wb") as f:
+        for record in records:
+            line = record if isinstance(record, bytes) else json_util.dumps(record).encode()
+            f.write(line + b"\n")
+    return path
+
+
+def test_writes_made_during_an_outage_are_replayed_in_order(spool, database):
+    collection = database["spool_outage"]
+    doc = {"name": "first"}
+    _id, spooled = write_spool.insert("spool_outage", doc, _down)
+    assert spooled and write_spool.spooling()
+    # Later writes queue behind the journal even though the write would work
+    _, spooled = write_spool.update("spool_outage", {"_id": _id}, {"name": "renamed"},
+                                    lambda: collection.update_one({"_id": _id}, {"$set": {"name": "x"}}).modified_count)
+    assert spooled
+    assert collection.find_one({"_id": _id}) is None
+
+    stats = write_spool.replay()
+    assert stats["pending"] == 0 and not stats["spooling"] and stats["replayed"] == 2
+    assert collection.find_one({"_id": _id})["name"] == "renamed"
+    assert os.path.getsize(write_spool._journal["path"]) == 0
+
+
+def test_replaying_an_insert_that_already_landed_skips_it(spool, database):
+    collection = database["spool_duplicates"]
+    _id = ObjectId()
+    collection.insert_one({"_id": _id, "name": "landed"})
+    path = _orphan(spool, [
+        {"key": str(_id), "op": "insert", "collection": "spool_duplicates", "doc": {"_id": _id, "name": "landed"}},
+        {"key": "u1", "op": "update", "collection": "spool_duplicates", "filter": {"_id": _id},
+         "update": {"$set": {"name": "after"}}},
+    ])
+    stats = write_spool.replay()
+    assert stats["already_applied"] == 1 and stats["rejected"] == 0
+    assert collection.find_one({"_id": _id})["name"] == "after"
+    assert not os.path.exists(path)
+
+
+def test_replay_resumes_from_the_saved_offset(spool, database):
+    collection = database["spool_offset"]
+    records = [{"key": str(i), "op": "insert", "collection": "spool_offset", "doc": {"_id": i}} for i in range(3)]
+    path = _orphan(spool, records)
+    with open(path, "rb") as f:
+        first_line = len(f.readline())
+    # The first record was applied (and then lost) before the process died
+    write_spool._write_offset(path, first_line)
+    write_spool.replay()
+    assert sorted(doc["_id"] for doc in collection.find()) == [1, 2]
+
+
+def test_adopted_journal_doesnt_overwrite_newer_writes(spool, database):
+    collection = database["spool_adopted"]
+    journaled_at = datetime.now() - timedelta(minutes=5)
+    stale, fresh = ObjectId(), ObjectId()
+    collection.insert_many([
+        {"_id": stale, "name": "live", "updated_at": datetime.now()},
+        {"_id": fresh, "name": "old", "updated_at": journaled_at - timedelta(minutes=5)},
+    ])
+    _orphan(spool, [
+        {"key": key, "op": "update", "collection": "spool_adopted", "filter": {"_id": _id},
+         "update": {"$set": {"name": "spooled", "updated_at": journaled_at}}}
+        for key, _id in (("a", stale), ("b", fresh))
+    ])
+    write_spool.replay()
+    assert collection.find_one({"_id": stale})["name"] == "live"
+    assert collection.find_one({"_id": fresh})["name"] == "spooled"
+
+
+def test_bad_records_are_set_aside_and_replay_moves_on(spool, database):
+    collection = database["spool_rejects"]
+    path = _orphan(spool, [
+        {"key": "0", "op": "insert", "collection": "spool_rejects", "doc": {"_id": 0}},
+        b"{not json",
+        {"key": "1", "op": "update", "collection": "spool_rejects", "filter": {"_id": {"$bogus": 1}},
+         "update": {"$set": {"name": "x"}}},
+        {"key": "2", "op": "insert", "collection": "spool_rejects", "doc": {"_id": 2}},
+    ])
+    stats = write_spool.replay()
+    assert sorted(doc["_id"] for doc in collection.find()) == [0, 2]
+    assert stats["rejected"] == 2
+    assert stats["last_rejected"]["key"] == "1"
+    with open(path + ".rejected", "rb") as f:
+        assert len(f.readlines()) == 2
+    assert not os.path.exists(path)
@@ -36,10 +36,72 @@ def get_all_documents(collection):
 
 # Update
 def update_document(collection, query, data):
-    result = collection.update_one(query, {"$set": data})
+    """Update one document: `data` is either fields to $set or an update with operators ($addToSet, $pull, ...)."""
+    update = data if data and all(key.startswith("$") for key in data) else {"$set": data}
+    result = collection.update_one(query, update)
     return result.modified_count
 
 # Delete
 def delete_document(collection, query):
     result = collection.delete_one(query)
-    return result.deleted_count
\ No newline at end of file
+    return result.deleted_count
+
+# Bulk
+class BulkValidationError(ValueError):
+    """A batch failed validation as a whole; `errors` holds {"index", "id", "error"} per rejected item."""
+
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} item(s) failed validation; nothing was written")
+        self.errors = errors
+
+def validate_batch(items, validate, max_size):
+    """
+    Run validate(item) over every item before anything is written.
+
+    Raises:
+        ValueError: If items isn't a non-empty list of at most max_size
+        BulkValidationError: Listing every item validate() rejected with a ValueError
+    """
+    if not isinstance(items, list) or not items:
+        raise ValueError("Expected a non-empty list")
+    if len(items) > max_size:
+        raise ValueError(f"At most {max_size} items can be processed at once")
+    errors = []
+    for index, item in enumerate(items):
+        try:
+            validate(item)
+        except ValueError as e:
+            errors.append({"index": index, "id": item.get("_id") if isinstance(item, dict) else item, "error": str(e)})
+    if errors:
+        raise BulkValidationError(errors)
+
+def validate_object_id(value):
+    if not isinstance(value, (str, ObjectId)) or not ObjectId.is_valid(value):
+        raise ValueError(f"Invalid ID: {value!r}")
+
+def bulk_report(ids, outcomes):
+    """Per-item results in request order plus a count of each result; an outcome is a result name or a dict."""
+    results = []
+    counts = {}
+    for _id, outcome in zip(ids, outcomes):
+        outcome = outcome if isinstance(outcome, dict) else {"result": outcome}
+        results.append(dict(id=str(_id), **outcome))
+        counts[outcome["result"]] = counts.get(outcome["result"], 0) + 1
+    return {"results": results, "counts": counts}
+
+# Async variants, for use with AsyncLazyCollection on the aio loop
+async def async_create_document(collection, data):
+    result = await collection.insert_one(data)
+    return result.inserted_id
+
+async def async_get_document(collection, query):
+    """Get a single document from an async collection and convert ObjectIds to strings."""
+    doc = await collection.find_one(query)
+    if doc:
+        return convert_objectid_to_str(doc)
+    return doc
+
+async def async_get_all_documents(collection, query=None):
+    """Get all matching documents from an async collection and convert ObjectIds to strings."""
+    documents = await collection.find(query or {}).to_list(None)
+    return [convert_objectid_to_str(doc) for doc in documents]
@@ -0,0 +1,257 @@
+"""
+Group commit for high-rate inserts.
+
+Feeds that push transactions one at a time make every POST /api/transactions
+pay its own insert_one round trip. With WRITE_COALESCING_ENABLED, creates are
+queued instead and a flusher thread per collection writes them with one
+unordered insert_many as soon as WRITE_COALESCE_MAX_BATCH documents are
+waiting or WRITE_COALESCE_MAX_DELAY_MS has passed since the first one
+arrived. Each caller blocks until its own document's batch has committed, so
+a 201 still means the document is stored, and gets back its own _id or its
+own write error (a duplicate key fails only that document).
+
+_ids are assigned before queueing, so a caller knows its id even if it times
+out waiting for the flush. At interpreter exit shutdown() flushes whatever is
+still queued instead of letting the daemon flusher threads drop it; inserts
+submitted after that are written straight away.
+
+Flushes are exported at /api/metrics (write_coalescer_*) and summarized by
+stats() at /api/admin/write-coalescer.
+"""
+import atexit
+import threading
+import time
+from typing import Dict
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, DuplicateKeyError, WriteError
+import db
+from config import Config
+from metrics import registry
+
+DUPLICATE_KEY = 11000
+BATCH_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_settings = {
+    "enabled": Config.WRITE_COALESCING_ENABLED,
+    "max_batch": Config.WRITE_COALESCE_MAX_BATCH,
+    "max_delay_ms": Config.WRITE_COALESCE_MAX_DELAY_MS,
+    "timeout_seconds": Config.WRITE_COALESCE_TIMEOUT_SECONDS,
+}
+_coalescers = {}
+_coalescers_lock = threading.Lock()
+
+flushes_total = registry.counter(
+    "write_coalescer_flushes_total", "Coalesced insert_many flushes", ("collection", "outcome"))
+documents_total = registry.counter(
+    "write_coalescer_documents_total", "Documents written through the coalescer", ("collection", "outcome"))
+batch_size = registry.histogram(
+    "write_coalescer_batch_size", "Documents per flush", ("collection",), BATCH_BUCKETS)
+flush_duration_seconds = registry.histogram(
+    "write_coalescer_flush_duration_seconds", "insert_many duration per flush", ("collection",))
+queue_wait_seconds = registry.histogram(
+    "write_coalescer_queue_wait_seconds", "Time from submit to the start of the document's flush", ("collection",))
+pending_documents = registry.gauge(
+    "write_coalescer_pending_documents", "Documents waiting for a flush", ("collection",))
+
+
+class _PendingWrite:
+    __slots__ = ("doc", "queued_at", "done", "error")
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.queued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.error = None
+
+
+def _write_error(error: Dict) -> Exception:
+    if error.get("code") == DUPLICATE_KEY:
+        return DuplicateKeyError(error.get("errmsg", "duplicate key"), DUPLICATE_KEY, error)
+    return WriteError(error.get("errmsg", "write failed"), error.get("code"), error)
+
+
+class WriteCoalescer:
+    """Queues inserts into one collection and flushes them in batches from a background thread."""
+
+    def __init__(self, collection_name: str, max_batch: int, max_delay_ms: float):
+        self.collection_name = collection_name
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000.0
+        self._pending = []
+        self._cond = threading.Condition()
+        self._thread = None
+        self._closed = False
+        self._stats = {"flushes": 0, "documents": 0, "errors": 0, "largest_batch": 0, "flush_seconds": 0.0}
+
+    def submit(self, doc: Dict, timeout: float = None) -> ObjectId:
+        """
+        Queue a document and wait until the batch holding it commits.
+
+        Args:
+            doc (Dict): The document; an _id is assigned if it has none
+            timeout (float, optional): Seconds to wait for the flush
+
+        Returns:
+            ObjectId: The document's _id
+
+        Raises:
+            TimeoutError: If the batch didn't commit within the timeout (the write may still land)
+            PyMongoError: The document's own write error
+        """
+        doc.setdefault("_id", ObjectId())
+        pending = _PendingWrite(doc)
+        with self._cond:
+            closed = self._closed
+        if closed:
+            self._flush([pending])
+            if pending.error is not None:
+                raise pending.error
+            return doc["_id"]
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=f"write-coalescer-{self.collection_name}",
+                                                daemon=True)
+                self._thread.start()
+            self._pending.append(pending)
+            pending_documents.set(self.collection_name, value=len(self._pending))
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch:
+                self._cond.notify()
+        if not pending.done.wait(timeout):
+            raise TimeoutError(f"Write to {self.collection_name} was not committed within {timeout}s")
+        if pending.error is not None:
+            raise pending.error
+        return doc["_id"]
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._pending:
+                if self._closed:
+                    return None
+                self._cond.wait()
+            # Give concurrent writers up to max_delay after the first document to join it
+            deadline = self._pending[0].queued_at + self.max_delay
+            while len(self._pending) < self.max_batch and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            pending_documents.set(self.collection_name, value=len(self._pending))
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._flush(batch)
+
+    def close(self, timeout: float = None):
+        """Flush everything queued now, without waiting out max_delay, and stop the flusher thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        with self._cond:
+            if thread is not None and thread.is_alive():
+                return  # still flushing; it drains the queue before it stops
+            leftover, self._pending = self._pending, []
+        if leftover:
+            self._flush(leftover)
+
+    def _flush(self, batch):
+        name = self.collection_name
+        started = time.perf_counter()
+        for pending in batch:
+            queue_wait_seconds.observe(name, value=started - pending.queued_at)
+        errors = {}
+        try:
+            db.get_collection(name).insert_many([pending.doc for pending in batch], ordered=False)
+        except BulkWriteError as e:
+            errors = {error["index"]: _write_error(error) for error in e.details.get("writeErrors", [])}
+        except Exception as e:
+            errors = dict.fromkeys(range(len(batch)), e)
+        elapsed = time.perf_counter() - started
+
+        for index, pending in enumerate(batch):
+            pending.error = errors.get(index)
+            pending.done.set()
+
+        outcome = "error" if errors else "ok"
+        flushes_total.inc(name, outcome)
+        documents_total.inc(name, "ok", amount=len(batch) - len(errors))
+        if errors:
+            documents_total.inc(name, "error", amount=len(errors))
+        batch_size.observe(name, value=len(batch))
+        flush_duration_seconds.observe(name, value=elapsed)
+        with self._cond:
+            self._stats["flushes"] += 1
+            self._stats["documents"] += len(batch)
+            self._stats["errors"] += len(errors)
+            self._stats["largest_batch"] = max(self._stats["largest_batch"], len(batch))
+            self._stats["flush_seconds"] += elapsed
+
+    def stats(self) -> Dict:
+        with self._cond:
+            stats = dict(self._stats, pending=len(self._pending))
+        flushes = stats.pop("flushes")
+        flush_seconds = stats.pop("flush_seconds")
+        return dict(
+            stats,
+            flushes=flushes,
+            mean_batch=round(stats["documents"] / flushes, 2) if flushes else 0.0,
+            mean_flush_ms=round(flush_seconds / flushes * 1000, 3) if flushes else 0.0,
+        )
+
+
+def enabled() -> bool:
+    return _settings["enabled"]
+
+
+def get_coalescer(collection_name: str) -> WriteCoalescer:
+    """Return the process-wide coalescer for a collection, creating it on first use."""
+    coalescer = _coalescers.get(collection_name)
+    if coalescer is None:
+        with _coalescers_lock:
+            coalescer = _coalescers.get(collection_name)
+            if coalescer is None:
+                coalescer = WriteCoalescer(collection_name, _settings["max_batch"], _settings["max_delay_ms"])
+                _coalescers[collection_name] = coalescer
+    return coalescer
+
+
+def insert(collection_name: str, doc: Dict) -> ObjectId:
+    """Insert a document through the collection's coalescer; returns its _id once committed."""
+    return get_coalescer(collection_name).submit(doc, _settings["timeout_seconds"])
+
+
+def shutdown(timeout: float = None):
+    """Flush every coalescer's queued inserts and stop their threads (runs at interpreter exit)."""
+    with _coalescers_lock:
+        coalescers = list(_coalescers.values())
+    for coalescer in coalescers:
+        coalescer.close(timeout if timeout is not None else _settings["timeout_seconds"])
+
+
+atexit.register(shutdown)
+
+
+def stats() -> Dict:
+    """Settings plus per-collection flush statistics."""
+    with _coalescers_lock:
+        coalescers = dict(_coalescers)
+    return {
+        "enabled": _settings["enabled"],
+        "max_batch": _settings["max_batch"],
+        "max_delay_ms": _settings["max_delay_ms"],
+        "collections": {name: coalescer.stats() for name, coalescer in coalescers.items()},
+    }
+
+
+def init_app(app):
+    _settings["enabled"] = app.config["WRITE_COALESCING_ENABLED"]
+    _settings["max_batch"] = app.config["WRITE_COALESCE_MAX_BATCH"]
+    _settings["max_delay_ms"] = app.config["WRITE_COALESCE_MAX_DELAY_MS"]
+    _settings["timeout_seconds"] = app.config["WRITE_COALESCE_TIMEOUT_SECONDS"]
@@ -0,0 +1,444 @@
+"""
+Durable local spool for writes made while the database is unreachable.
+
+With WRITE_SPOOL_ENABLED, a transaction create or update that fails with a
+connection error (ConnectionFailure: unreachable, server selection or network
+timeout; how soon "slow" counts as down is set by serverSelectionTimeoutMS /
+socketTimeoutMS in MONGO_URI) is appended to a journal on local disk instead,
+and the request succeeds with 202 Accepted. Until the journal is drained every
+later write is journaled too, so writes reach the database in the order they
+were accepted.
+
+Each process appends to its own file in WRITE_SPOOL_DIR, one JSON record per
+line, fsynced before the caller is answered:
+
+    {"key": "<idempotency key>", "op": "insert", "collection": "transactions", "doc": {...}}
+    {"key": "<idempotency key>", "op": "update", "collection": "transactions", "filter": {...}, "update": {...}}
+
+A replay thread pings the database every WRITE_SPOOL_REPLAY_SECONDS and, once
+it answers, applies the journal in order with ordered bulk writes of up to
+WRITE_SPOOL_REPLAY_BATCH records, saving the byte offset it reached after each
+batch. Nothing is applied twice:
+
+- inserts carry their _id (assigned before journaling, and the insert's
+  idempotency key), so a replayed insert that already landed fails with a
+  duplicate key and is skipped;
+- updates are $set updates, which leave the same document when applied again,
+  so re-running the tail of a batch after a crash before its offset was saved
+  is harmless.
+
+A record the database rejects for any other reason, or a line that can't be
+parsed, goes to <file>.rejected and replay moves on; rejections are counted in
+write_spool_records_total and the last one is shown at /api/admin/write-spool.
+
+Journals left by processes that exited are adopted and replayed by whichever
+process locks them first. By then other processes may have written the same
+documents, so every update stamps `updated_at` (live or journaled) and a
+replayed update only applies to a document whose `updated_at` isn't newer
+than its own: an old $set can't overwrite a later write. Stamps come from the
+local clock, which is shared by the processes using one WRITE_SPOOL_DIR.
+"""
+import fcntl
+import glob
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+from bson import json_util, ObjectId
+from flask import g, has_request_context
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, ConnectionFailure
+import db
+from config import Config
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY = 11000
+# Set by every update; a replayed update skips documents written after it
+STAMP_FIELD = "updated_at"
+# Errors that mean "the database can't be reached", not "the write is invalid"
+UNAVAILABLE = (ConnectionFailure,)
+
+_settings = {
+    "enabled": Config.WRITE_SPOOL_ENABLED,
+    "dir": Config.WRITE_SPOOL_DIR,
+    "replay_seconds": Config.WRITE_SPOOL_REPLAY_SECONDS,
+    "replay_batch": Config.WRITE_SPOOL_REPLAY_BATCH,
+}
+_state = {"down_since": None, "last_error": None, "replayed": 0, "skipped": 0, "rejected": 0,
+          "last_rejected": None}
+# collection -> callbacks run with the records of each replayed batch
+_replay_hooks: Dict[str, List[Callable]] = {}
+_lock = threading.RLock()
+# One replay at a time (the replay thread or POST /api/admin/write-spool/replay)
+_replay_lock = threading.Lock()
+_journal = {"file": None, "path": None, "pending": 0}
+_replayer = {"thread": None, "wake": threading.Event()}
+
+records_total = registry.counter(
+    "write_spool_records_total", "Spooled writes by outcome", ("collection", "op", "outcome"))
+pending_records = registry.gauge(
+    "write_spool_pending_records", "Journaled writes of this process not yet replayed", ())
+
+
+def enabled() -> bool:
+    return _settings["enabled"]
+
+
+def spooling() -> bool:
+    """Whether writes must go to the journal: the database is down or earlier writes are still waiting."""
+    return _settings["enabled"] and (_state["down_since"] is not None or _journal["pending"] > 0)
+
+
+def spooled() -> bool:
+    """Whether the current request journaled a write (so it should answer 202 Accepted)."""
+    return has_request_context() and g.get("write_spooled", False)
+
+
+def register_replay_hook(collection_name: str, callback: Callable[[List[Dict]], None]):
+    """Run callback(records) after each replayed batch of writes to the collection (e.g. to refresh caches)."""
+    _replay_hooks.setdefault(collection_name, []).append(callback)
+
+
+def _journal_path() -> str:
+    return os.path.join(_settings["dir"], f"spool-{os.getpid()}.jsonl")
+
+
+def _open_journal():
+    # The file stays open and flock'ed for the life of the process, which marks it as owned
+    if _journal["file"] is None or _journal["path"] != _journal_path():
+        os.makedirs(_settings["dir"], exist_ok=True)
+        path = _journal_path()
+        journal = open(path, "ab")
+        fcntl.flock(journal, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        _journal.update(file=journal, path=path)
+    return _journal["file"]
+
+
+def _append(record: Dict):
+    line = json_util.dumps(record, json_options=json_util.RELAXED_JSON_OPTIONS).encode() + b"\n"
+    with _lock:
+        journal = _open_journal()
+        journal.write(line)
+        journal.flush()
+        os.fsync(journal.fileno())
+        _journal["pending"] += 1
+        pending_records.set(value=_journal["pending"])
+    records_total.inc(record["collection"], record["op"], "spooled")
+    if has_request_context():
+        g.write_spooled = True
+    _start_replayer()
+
+
+def mark_down(error: Exception):
+    """Record that the database is unreachable; writes are journaled until a replay succeeds."""
+    with _lock:
+        if _state["down_since"] is None:
+            _state["down_since"] = time.time()
+            logger.warning("Database unreachable, spooling writes to %s: %s", _settings["dir"], error)
+        _state["last_error"] = str(error)
+
+
+def stamp(fields: Dict) -> Dict:
+    """Set the write stamp on the fields of an update, in place."""
+    fields[STAMP_FIELD] = datetime.now()
+    return fields
+
+
+def spool_insert(collection_name: str, doc: Dict) -> ObjectId:
+    """Journal an insert; its _id (assigned here if missing) is its idempotency key."""
+    doc.setdefault("_id", ObjectId())
+    _append({"key": str(doc["_id"]), "op": "insert", "collection": collection_name, "doc": doc})
+    return doc["_id"]
+
+
+def spool_update(collection_name: str, filter: Dict, fields: Dict) -> str:
+    """Journal a $set of fields on the documents matching filter; returns its idempotency key."""
+    key = uuid.uuid4().hex
+    _append({"key": key, "op": "update", "collection": collection_name, "filter": filter, "update": {"$set": fields}})
+    return key
+
+
+def insert(collection_name: str, doc: Dict, write: Callable[[Dict], ObjectId]) -> Tuple[ObjectId, bool]:
+    """
+    Insert with write(doc), or journal the document if the database is unreachable.
+
+    Returns:
+        Tuple[ObjectId, bool]: The document's _id and whether it was journaled
+    """
+    if not _settings["enabled"]:
+        return write(doc), False
+    doc.setdefault("_id", ObjectId())
+    if not spooling():
+        try:
+            return write(doc), False
+        except UNAVAILABLE as e:
+            mark_down(e)
+    return spool_insert(collection_name, doc), True
+
+
+def update(collection_name: str, filter: Dict, fields: Dict, write: Callable[[], int]) -> Tuple[int, bool]:
+    """
+    Update with write(), or journal a $set of fields if the database is unreachable.
+
+    Field updates get the write stamp (STAMP_FIELD) either way.
+
+    Returns:
+        Tuple[int, bool]: write()'s result (1 when journaled: accepted, not yet applied) and whether it was journaled
+
+    Raises:
+        ValueError: If fields holds update operators (only $set replays idempotently)
+    """
+    operators = any(key.startswith("$") for key in fields)
+    if not operators:
+        stamp(fields)
+    if not _settings["enabled"]:
+        return write(), False
+    if operators:
+        raise ValueError("Only field updates can be spooled")
+    if not spooling():
+        try:
+            return write(), False
+        except UNAVAILABLE as e:
+            mark_down(e)
+    spool_update(collection_name, filter, fields)
+    return 1, True
+
+
+# -- replay -----------------------------------------------------------------
+
+def _read_offset(path: str) -> int:
+    try:
+        with open(path + ".offset") as f:
+            return int(f.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def _write_offset(path: str, offset: int):
+    with open(path + ".offset.tmp", "w") as f:
+        f.write(str(offset))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".offset.tmp", path + ".offset")
+
+
+def _parse(line: bytes) -> Dict:
+    try:
+        record = json_util.loads(line)
+        if record["op"] not in ("insert", "update") or not isinstance(record["collection"], str):
+            raise ValueError(f"unknown op {record['op']!r}")
+        return record
+    except Exception as e:
+        # Returned on its own, so replay can reject it and move past it
+        return {"op": "corrupt", "collection": None, "key": None, "line": line.decode(errors="replace"),
+                "error": f"unreadable record: {e}"}
+
+
+def _read_batch(path: str, offset: int, limit: int):
+    """
+    Up to `limit` consecutive records of one collection from offset; returns (records, end offsets).
+
+    A line that can't be parsed comes back alone as a "corrupt" record.
+    """
+    records, ends = [], []
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # a record still being written
+            record = _parse(line)
+            if records and (record["op"] == "corrupt" or record["collection"] != records[0]["collection"]):
+                break
+            offset += len(line)
+            records.append(record)
+            ends.append(offset)
+            if len(records) >= limit or record["op"] == "corrupt":
+                break
+    return records, ends
+
+
+def _operation(record: Dict):
+    if record["op"] == "insert":
+        return InsertOne(record["doc"])
+    at = record["update"].get("$set", {}).get(STAMP_FIELD)
+    if at is None:
+        # Journaled before updates were stamped
+        return UpdateOne(record["filter"], record["update"])
+    not_newer = {"$or": [{STAMP_FIELD: {"$exists": False}}, {STAMP_FIELD: {"$lte": at}}]}
+    return UpdateOne({"$and": [record["filter"], not_newer]}, record["update"])
+
+
+def _reject(path: str, record: Dict, error):
+    with open(path + ".rejected", "ab") as f:
+        f.write(json_util.dumps(dict(record, error=str(error)), json_options=json_util.RELAXED_JSON_OPTIONS)
+                .encode() + b"\n")
+    # Kept out of the replay hooks
+    record["rejected"] = True
+    with _lock:
+        _state["rejected"] += 1
+        _state["last_rejected"] = {"at": time.time(), "journal": os.path.basename(path), "key": record.get("key"),
+                                   "collection": record["collection"], "op": record["op"], "error": str(error)}
+    records_total.inc(record["collection"] or "unknown", record["op"], "rejected")
+    logger.error("Rejected spooled %s %s on %s: %s", record["op"], record.get("key"), record["collection"], error)
+
+
+def _apply(path: str, records: List[Dict]) -> int:
+    """
+    Apply records in order; returns how many were dealt with (applied, skipped or rejected).
+
+    Raises:
+        ConnectionFailure: If the database went away again
+    """
+    if records[0]["op"] == "corrupt":
+        _reject(path, records[0], records[0]["error"])
+        return 1
+    collection = db.get_collection(records[0]["collection"])
+    try:
+        collection.bulk_write([_operation(record) for record in records], ordered=True)
+        return len(records)
+    except UNAVAILABLE:
+        raise
+    except BulkWriteError as e:
+        # An ordered bulk write stops at its first error; everything before it was applied
+        error = e.details["writeErrors"][0]
+        index = error["index"]
+        record = records[index]
+        if error.get("code") == DUPLICATE_KEY and record["op"] == "insert":
+            _state["skipped"] += 1
+            records_total.inc(record["collection"], record["op"], "already_applied")
+        else:
+            _reject(path, record, error.get("errmsg"))
+        return index + 1
+    except Exception as e:
+        # Not tied to one record (a malformed record, or an error for the whole
+        # command); replaying is idempotent, so retry one record at a time to
+        # reject only the bad one
+        if len(records) == 1:
+            _reject(path, records[0], e)
+            return 1
+        for record in records:
+            _apply(path, [record])
+        return len(records)
+
+
+def _replay_file(path: str) -> bool:
+    """Replay one journal from its saved offset; returns True if it was drained."""
+    offset = _read_offset(path)
+    while True:
+        records, ends = _read_batch(path, offset, _settings["replay_batch"])
+        if not records:
+            return True
+        done = _apply(path, records)
+        offset = ends[done - 1]
+        _write_offset(path, offset)
+        applied = [record for record in records[:done] if not record.get("rejected")]
+        if applied:
+            _state["replayed"] += len(applied)
+            records_total.inc(records[0]["collection"], "replay", "applied", amount=len(applied))
+            for hook in _replay_hooks.get(records[0]["collection"], []):
+                try:
+                    hook(applied)
+                except Exception:
+                    logger.exception("Write spool replay hook failed")
+        if path == _journal["path"]:
+            with _lock:
+                _journal["pending"] -= done
+                pending_records.set(value=_journal["pending"])
+
+
+def _remove(path: str):
+    for suffix in ("", ".offset"):
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            pass
+
+
+def replay() -> Dict:
+    """
+    Replay this process's journal and any orphaned ones if the database answers.
+
+    Returns:
+        Dict: stats() after the attempt
+    """
+    with _replay_lock:
+        return _replay()
+
+
+def _replay() -> Dict:
+    try:
+        db.get_db().command("ping")
+        for path in sorted(glob.glob(os.path.join(_settings["dir"], "spool-*.jsonl"))):
+            if path == _journal["path"]:
+                # Hold the append lock only for the final check, so writers aren't blocked during replay
+                _replay_file(path)
+                with _lock:
+                    if _replay_file(path):
+                        _journal["file"].truncate(0)
+                        _journal["pending"] = 0
+                        pending_records.set(value=0)
+                        _write_offset(path, 0)
+                continue
+            with open(path, "rb") as orphan:
+                try:
+                    fcntl.flock(orphan, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # owned by a live process
+                if _replay_file(path):
+                    _remove(path)
+        with _lock:
+            if _state["down_since"] is not None:
+                logger.warning("Database reachable again after %.0fs", time.time() - _state["down_since"])
+            _state["down_since"] = None
+    except UNAVAILABLE as e:
+        mark_down(e)
+    return stats()
+
+
+def _run_replayer():
+    while True:
+        _replayer["wake"].wait(_settings["replay_seconds"])
+        _replayer["wake"].clear()
+        try:
+            replay()
+        except Exception:
+            logger.exception("Write spool replay failed")
+
+
+def _start_replayer():
+    with _lock:
+        if _replayer["thread"] is None or not _replayer["thread"].is_alive():
+            _replayer["thread"] = threading.Thread(target=_run_replayer, name="write-spool-replay", daemon=True)
+            _replayer["thread"].start()
+
+
+def stats() -> Dict:
+    with _lock:
+        return {
+            "enabled": _settings["enabled"],
+            "spooling": spooling(),
+            "down_since": _state["down_since"],
+            "last_error": _state["last_error"],
+            "pending": _journal["pending"],
+            "journals": len(glob.glob(os.path.join(_settings["dir"], "spool-*.jsonl"))),
+            "replayed": _state["replayed"],
+            "already_applied": _state["skipped"],
+            "rejected": _state["rejected"],
+            "last_rejected": _state["last_rejected"],
+        }
+
+
+def init_app(app):
+    _settings["enabled"] = app.config["WRITE_SPOOL_ENABLED"]
+    _settings["dir"] = app.config["WRITE_SPOOL_DIR"]
+    _settings["replay_seconds"] = app.config["WRITE_SPOOL_REPLAY_SECONDS"]
+    _settings["replay_batch"] = app.config["WRITE_SPOOL_REPLAY_BATCH"]
+    if _settings["enabled"]:
+        # Picks up journals left by earlier processes
+        _start_replayer()
+        _replayer["wake"].set()
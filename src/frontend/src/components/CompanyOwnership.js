@@ -55,13 +55,15 @@ function CompanyOwnership() {
 
   useEffect(() => {
     fetchOwnerships();
-    fetchCompanies();
-    fetchProperties();
   }, []);
 
   const fetchOwnerships = async () => {
     try {
-      const response = await axios.get(`${API_BASE_URL}/company-ownership`);
+      // Names come embedded, so the full company and property lists are
+      // only needed by the form pickers
+      const response = await axios.get(
+        `${API_BASE_URL}/company-ownership?expand=property,company`
+      );
       setOwnerships(response.data);
     } catch (error) {
       setError("Failed to fetch company ownership relationships");
@@ -90,6 +92,8 @@ function CompanyOwnership() {
   };
 
   const handleOpen = (ownership = null) => {
+    if (!companies.length) fetchCompanies();
+    if (!properties.length) fetchProperties();
     if (ownership) {
       setEditMode(true);
       setSelectedOwnership(ownership);
@@ -233,16 +237,6 @@ function CompanyOwnership() {
     });
   };
 
-  const getCompanyName = (companyId) => {
-    const company = companies.find((c) => c._id === companyId);
-    return company ? company.name : companyId;
-  };
-
-  const getPropertyName = (propertyId) => {
-    const property = properties.find((p) => p._id === propertyId);
-    return property ? property.name : propertyId;
-  };
-
   return (
     <Box sx={{ p: 3 }}>
       <Box
@@ -293,8 +287,12 @@ function CompanyOwnership() {
           <TableBody>
             {ownerships.map((ownership) => (
               <TableRow key={ownership._id}>
-                <TableCell>{getCompanyName(ownership.company_id)}</TableCell>
-                <TableCell>{getPropertyName(ownership.property_id)}</TableCell>
+                <TableCell>
+                  {ownership.company_name || ownership.company_id}
+                </TableCell>
+                <TableCell>
+                  {ownership.property_name || ownership.property_id}
+                </TableCell>
                 <TableCell>{ownership.percentage}%</TableCell>
                 <TableCell>{ownership.interest_type}</TableCell>
                 <TableCell>
@@ -39,28 +39,17 @@ function Dashboard() {
   const fetchDashboardData = async () => {
     setLoading(true);
     try {
-      // Fetch counts
-      const [companiesRes, transactionsRes, ownershipsRes, entriesRes] =
-        await Promise.all([
-          axios.get(`${API_BASE_URL}/companies`),
-          axios.get(`${API_BASE_URL}/transactions`),
-          axios.get(`${API_BASE_URL}/company-ownership`),
-          axios.get(`${API_BASE_URL}/entries`),
-        ]);
-
-      // Get recent transactions
-      const recentTransactionsRes = await axios.get(
-        `${API_BASE_URL}/transactions?limit=5`
-      );
+      // Counts and recent transactions come from a single request
+      const response = await axios.get(`${API_BASE_URL}/dashboard`);
 
       setStats({
-        companies: companiesRes.data.length,
-        transactions: transactionsRes.data.length,
-        companyOwnerships: ownershipsRes.data.length,
-        entries: entriesRes.data.length,
+        companies: response.data.companies,
+        transactions: response.data.transactions,
+        companyOwnerships: response.data.company_ownerships,
+        entries: response.data.entries,
       });
 
-      setRecentTransactions(recentTransactionsRes.data);
+      setRecentTransactions(response.data.recent_transactions);
       setLoading(false);
     } catch (error) {
       console.error("Error fetching dashboard data:", error);
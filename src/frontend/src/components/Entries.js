@@ -37,8 +37,6 @@ const API_BASE_URL = "http://localhost:5001/api";
 function Entries() {
   const navigate = useNavigate();
   const [entries, setEntries] = useState([]);
-  const [companies, setCompanies] = useState([]);
-  const [properties, setProperties] = useState([]);
   const [showModal, setShowModal] = useState(false);
   const [showViewModal, setShowViewModal] = useState(false);
   const [selectedEntry, setSelectedEntry] = useState(null);
@@ -55,8 +53,6 @@ function Entries() {
 
   useEffect(() => {
     fetchEntries();
-    fetchCompanies();
-    fetchProperties();
   }, []);
 
   const fetchEntries = async () => {
@@ -69,24 +65,6 @@ function Entries() {
     }
   };
 
-  const fetchCompanies = async () => {
-    try {
-      const response = await axios.get(`${API_BASE_URL}/companies`);
-      setCompanies(response.data);
-    } catch (error) {
-      console.error("Error fetching companies:", error);
-    }
-  };
-
-  const fetchProperties = async () => {
-    try {
-      const response = await axios.get(`${API_BASE_URL}/properties`);
-      setProperties(response.data);
-    } catch (error) {
-      console.error("Error fetching properties:", error);
-    }
-  };
-
   const handleOpen = (entry = null) => {
     if (entry) {
       setEditMode(true);
@@ -115,7 +93,7 @@ function Entries() {
   const handleView = async (entry) => {
     try {
       const response = await axios.get(
-        `${API_BASE_URL}/entries/${entry._id}?include_transactions=true`
+        `${API_BASE_URL}/entries/${entry._id}?include_transactions=true&expand=property,company`
       );
       navigate(`/entries/${entry._id}/transactions`, {
         state: { entry: response.data },
@@ -181,16 +159,6 @@ function Entries() {
     });
   };
 
-  const getCompanyName = (companyId) => {
-    const company = companies.find((c) => c._id === companyId);
-    return company ? company.name : "Unknown Company";
-  };
-
-  const getPropertyName = (propertyId) => {
-    const property = properties.find((p) => p._id === propertyId);
-    return property ? property.name : "Unknown Property";
-  };
-
   return (
     <Box sx={{ p: 3 }}>
       <Box
@@ -232,6 +200,8 @@ function Entries() {
               <TableCell>Type</TableCell>
               <TableCell>Status</TableCell>
               <TableCell>Transactions</TableCell>
+              <TableCell>Amount</TableCell>
+              <TableCell>Barrels</TableCell>
               <TableCell>Actions</TableCell>
             </TableRow>
           </TableHead>
@@ -246,7 +216,9 @@ function Entries() {
                 </TableCell>
                 <TableCell>{entry.entry_type}</TableCell>
                 <TableCell>{entry.status}</TableCell>
-                <TableCell>{entry.transaction_ids?.length || 0}</TableCell>
+                <TableCell>{entry.transaction_count || 0}</TableCell>
+                <TableCell>${(entry.totals?.amount || 0).toFixed(2)}</TableCell>
+                <TableCell>{(entry.totals?.barrels_of_oil || 0).toFixed(2)}</TableCell>
                 <TableCell>
                   <IconButton
                     color="primary"
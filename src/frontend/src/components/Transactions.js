@@ -56,14 +56,14 @@ function Transactions() {
     if (entryId) {
       fetchEntryTransactions();
     }
-    fetchProperties();
-    fetchCompanies();
   }, [entryId]);
 
   const fetchEntryTransactions = async () => {
     try {
+      // Names come embedded, so the full property and company lists are
+      // only needed by the form pickers
       const response = await axios.get(
-        `${API_BASE_URL}/entries/${entryId}?include_transactions=true`
+        `${API_BASE_URL}/entries/${entryId}?include_transactions=true&expand=property,company`
       );
       setEntry(response.data);
       setTransactions(response.data.transactions || []);
@@ -92,6 +92,8 @@ function Transactions() {
   };
 
   const handleOpen = (transaction = null) => {
+    if (!properties.length) fetchProperties();
+    if (!companies.length) fetchCompanies();
     if (transaction) {
       setEditMode(true);
       setSelectedTransaction(transaction);
@@ -141,15 +143,13 @@ function Transactions() {
         );
         setSuccess("Transaction updated successfully");
       } else {
-        const response = await axios.post(
-          `${API_BASE_URL}/transactions`,
+        // Creating inside an entry adds it to the entry in the same request
+        await axios.post(
+          entryId
+            ? `${API_BASE_URL}/entries/${entryId}/transactions`
+            : `${API_BASE_URL}/transactions`,
           formData
         );
-        if (entryId) {
-          await axios.put(`${API_BASE_URL}/entries/${entryId}`, {
-            transaction_ids: [...entry.transaction_ids, response.data._id],
-          });
-        }
         setSuccess("Transaction created successfully");
       }
       fetchEntryTransactions();
@@ -163,14 +163,8 @@ function Transactions() {
   const handleDelete = async (transactionId) => {
     if (window.confirm("Are you sure you want to delete this transaction?")) {
       try {
+        // The server also removes it from its entry
         await axios.delete(`${API_BASE_URL}/transactions/${transactionId}`);
-        if (entryId) {
-          await axios.put(`${API_BASE_URL}/entries/${entryId}`, {
-            transaction_ids: entry.transaction_ids.filter(
-              (id) => id !== transactionId
-            ),
-          });
-        }
         setSuccess("Transaction deleted successfully");
         fetchEntryTransactions();
       } catch (error) {
@@ -187,16 +181,6 @@ function Transactions() {
     });
   };
 
-  const getPropertyName = (propertyId) => {
-    const property = properties.find((p) => p._id === propertyId);
-    return property ? property.name : propertyId;
-  };
-
-  const getCompanyName = (companyId) => {
-    const company = companies.find((c) => c._id === companyId);
-    return company ? company.name : companyId;
-  };
-
   return (
     <Box sx={{ p: 3 }}>
       <Box
@@ -253,9 +237,11 @@ function Transactions() {
                     : "-"}
                 </TableCell>
                 <TableCell>
-                  {getPropertyName(transaction.property_id)}
+                  {transaction.property_name || transaction.property_id}
+                </TableCell>
+                <TableCell>
+                  {transaction.company_name || transaction.company_id}
                 </TableCell>
-                <TableCell>{getCompanyName(transaction.company_id)}</TableCell>
                 <TableCell>${transaction.amount}</TableCell>
                 <TableCell>{transaction.description}</TableCell>
                 <TableCell>